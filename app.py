@@ -3,7 +3,7 @@ from flask_cors import CORS  # Import Flask-CORS
 from routes.bitcoinRPC import bitcoin_rpc_bp
 from routes.bitcoreLib import bitcore_lib_bp
 from routes.main import main_bp
-from routes.rc001 import rc001_bp
+from routes.rc001 import rc001_bp, rc001_content_bp
 from routes.prices import prices_bp
 from routes.task import start_scheduler
 
@@ -16,6 +16,7 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 app.register_blueprint(bitcoin_rpc_bp, url_prefix='/api')
 app.register_blueprint(bitcore_lib_bp, url_prefix='/bitcore_lib')
 app.register_blueprint(rc001_bp, url_prefix='/rc001')
+app.register_blueprint(rc001_content_bp)
 app.register_blueprint(prices_bp, url_prefix='/prices')
 app.register_blueprint(main_bp)
 
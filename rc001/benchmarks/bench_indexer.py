@@ -0,0 +1,135 @@
+"""End-to-end benchmark: BlockchainScanner against a local fake node.
+
+Indexes a synthetic (or recorded) chain from genesis to tip in a throwaway working
+directory and reports blocks/s plus the time spent in each pipeline stage, for raw
+and verbose block fetching. Stage times overlap: rpc and decode run in the prefetch
+threads while commit runs in the scanner thread, and parse is part of commit.
+
+Run from the rc001 directory:
+    python benchmarks/bench_indexer.py --blocks 2000 --mints 4 --burst-every 100
+    python benchmarks/bench_indexer.py --replay doge.jsonl.gz --mode raw --min-blocks-per-second 200
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Optional, List, Dict, Any
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_node import FakeNode, serve, load_blocks, save_blocks  # noqa: E402
+from synthetic_blocks import generate_chain  # noqa: E402
+
+STAGES = ('rpc', 'decode', 'parse', 'commit')
+
+def write_rpc_config(path: str, coin_ticker: str, port: int) -> None:
+    with open(path, 'w') as f:
+        f.write(f"[{coin_ticker}]\nrpcuser = bench\nrpcpassword = bench\nrpchost = 127.0.0.1\nrpcport = {port}\n")
+
+def run_scan(work_dir: str, coin_ticker: str, first_height: int, raw_mode: bool) -> Dict[str, Any]:
+    """Index the fake node's chain into a fresh database under work_dir and collect the results"""
+    run_dir = os.path.join(work_dir, 'raw' if raw_mode else 'verbose')
+    os.makedirs(run_dir)
+    os.chdir(run_dir)
+    # Imported late so the indexer's log file lands in the working directory, not the source tree
+    import rc001indexer
+    from metrics import metrics
+
+    rc001indexer.RAW_BLOCK_MODE = raw_mode
+    rc001indexer.DEFAULT_BLOCK_HEIGHTS = {
+        coin_ticker: {"start_block_height": first_height, "last_block_height": first_height - 1},
+    }
+    metrics.reset()
+    scanner = rc001indexer.BlockchainScanner()
+    try:
+        block_heights = scanner.load_last_block_heights()
+        started = time.perf_counter()
+        scanner.scan_coin(coin_ticker, block_heights)
+        elapsed = time.perf_counter() - started
+    finally:
+        scanner.writer.close()
+    candidates = metrics.get('rc001_candidates_total', coin=coin_ticker)
+    deploys = metrics.get('rc001_deploys_total', coin=coin_ticker)
+    mints = metrics.get('rc001_mints_total', coin=coin_ticker)
+    return {
+        'mode': 'raw' if raw_mode else 'verbose',
+        'elapsed': elapsed,
+        'blocks': metrics.get('rc001_blocks_total', coin=coin_ticker),
+        'transactions': metrics.get('rc001_transactions_total', coin=coin_ticker),
+        'deploys': deploys,
+        'mints': mints,
+        'rejected': candidates - deploys - mints,
+        'stages': {stage: metrics.histogram('rc001_stage_seconds', coin=coin_ticker, stage=stage) for stage in STAGES},
+    }
+
+def report(result: Dict[str, Any]) -> None:
+    elapsed = result['elapsed']
+    print(f"\n{result['mode']} blocks: {result['blocks']:.0f} blocks, {result['transactions']:.0f} txs in {elapsed:.2f}s")
+    print(f"  {result['blocks'] / elapsed:10.1f} blocks/s  {result['transactions'] / elapsed:10.0f} txs/s")
+    print(f"  deploys {result['deploys']:.0f}, mints {result['mints']:.0f}, rejected {result['rejected']:.0f}")
+    for stage, (total, count) in result['stages'].items():
+        if count:
+            print(f"  {stage:<8}{total:9.3f}s  {count:7d} calls  {total / count * 1000:9.3f} ms/call")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark BlockchainScanner against a fake JSON-RPC node")
+    parser.add_argument('--coin', default='DOGE')
+    parser.add_argument('--replay', help="recorded blocks from fake_node.py record, instead of a synthetic chain")
+    parser.add_argument('--blocks', type=int, default=1000, help="synthetic chain length")
+    parser.add_argument('--plain', type=int, default=50, help="plain transactions per block")
+    parser.add_argument('--mints', type=int, default=2, help="valid mints per block")
+    parser.add_argument('--invalid', type=int, default=1, help="invalid mints per block")
+    parser.add_argument('--collections', type=int, default=3)
+    parser.add_argument('--burst-every', type=int, default=0, help="every Nth block carries --burst-size extra mints")
+    parser.add_argument('--burst-size', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="also write the synthetic chain here for later --replay")
+    parser.add_argument('--mode', choices=('raw', 'verbose', 'both'), default='both')
+    parser.add_argument('--min-blocks-per-second', type=float,
+                        help="exit with status 1 when raw mode (or the only mode run) is slower than this")
+    parser.add_argument('--verbose', action='store_true', help="keep the indexer's log output")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        blocks = load_blocks(args.replay)
+    else:
+        started = time.perf_counter()
+        blocks = generate_chain(args.blocks, args.coin, args.plain, args.mints, args.invalid, args.collections,
+                                args.burst_every, args.burst_size, args.seed)
+        print(f"Generated {len(blocks)} blocks in {time.perf_counter() - started:.2f}s")
+        if args.save:
+            save_blocks(blocks, args.save)
+    if not blocks:
+        parser.error("no blocks to index")
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    server = serve(FakeNode(blocks, args.coin))
+    cwd = os.getcwd()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='rc001-bench-') as work_dir:
+            os.makedirs(os.path.join(work_dir, 'config'))
+            write_rpc_config(os.path.join(work_dir, 'config', 'rpc.conf'), args.coin, server.server_port)
+            modes = {'raw': [True], 'verbose': [False], 'both': [True, False]}[args.mode]
+            for raw_mode in modes:
+                results.append(run_scan(work_dir, args.coin, blocks[0]['height'], raw_mode))
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+
+    for result in results:
+        report(result)
+    if args.min_blocks_per_second is not None:
+        blocks_per_second = results[0]['blocks'] / results[0]['elapsed']
+        if blocks_per_second < args.min_blocks_per_second:
+            print(f"\nFAIL: {blocks_per_second:.1f} blocks/s is below {args.min_blocks_per_second}")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
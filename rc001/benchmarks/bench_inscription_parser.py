@@ -0,0 +1,91 @@
+"""Micro-benchmark: native scriptSig push decoding vs. the old ASM string path.
+
+Run from the rc001 directory: python benchmarks/bench_inscription_parser.py
+"""
+import base64
+import binascii
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from script_parser import extract_inscription, script_to_asm  # noqa: E402
+
+def push(data: bytes) -> bytes:
+    """Minimal push of data"""
+    if len(data) < 0x4c:
+        return bytes([len(data)]) + data
+    if len(data) <= 0xff:
+        return b'\x4c' + bytes([len(data)]) + data
+    return b'\x4d' + struct.pack('<H', len(data)) + data
+
+def push_number(n: int) -> bytes:
+    """Push of a small script number"""
+    if n == 0:
+        return b'\x00'
+    if n <= 16:
+        return bytes([0x50 + n])
+    return push(n.to_bytes((n.bit_length() + 8) // 8, 'little'))
+
+def inscription_script(content_type: bytes, body: bytes, chunk_size: int = 240) -> bytes:
+    """Build an ord inscription scriptSig followed by a dummy signature and redeem script"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    script = push(b'ord') + push_number(len(chunks)) + push(content_type)
+    for i, chunk in enumerate(chunks):
+        script += push_number(len(chunks) - 1 - i) + push(chunk)
+    return script + push(os.urandom(71) + b'\x01') + push(b'\x21' + os.urandom(33) + b'\xac')
+
+def legacy_extract(asm: str):
+    """The ASM token walk and hex -> base64 -> text round trip the indexer used before"""
+    asm_data = asm.split()
+    if not asm_data or asm_data[0] != '6582895':
+        return None
+    index = 1
+    if index >= len(asm_data) or not asm_data[index].lstrip('-').isdigit():
+        return None
+    index += 1
+    mime_type = binascii.unhexlify(asm_data[index]).decode('ascii')
+    index += 1
+    data_string = ""
+    while index < len(asm_data):
+        if asm_data[index].lstrip('-').isdigit():
+            index += 1
+            data_string += asm_data[index]
+            index += 1
+        else:
+            break
+    if 'text/html' not in mime_type.lower():
+        return None
+    html_data_base64 = base64.b64encode(binascii.unhexlify(data_string)).decode('utf-8')
+    return base64.b64decode(html_data_base64).decode('utf-8')
+
+def native_extract(script_hex: str):
+    """The byte-level push decoder path"""
+    body, content_type = extract_inscription(bytes.fromhex(script_hex))
+    if not body or not content_type or b'text/html' not in content_type.lower():
+        return None
+    return str(body, 'utf-8')
+
+def main() -> None:
+    mint = (b'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="p" content="rc001">'
+            b'<meta name="op" content="mint"><meta name="sn" content="010203"><title>Collection</title></head>'
+            b'<body><script src="/content/' + b'a' * 64 + b'i0"></script></body></html>')
+    cases = {
+        'rc001 mint (%d bytes)' % len(mint): mint,
+        'html page (20000 bytes)': b'<html><body>' + b'x' * 19975 + b'</body></html>',
+    }
+    for name, body in cases.items():
+        script = inscription_script(b'text/html;charset=utf-8', body)
+        script_hex = script.hex()
+        asm = script_to_asm(script)
+        assert legacy_extract(asm) == native_extract(script_hex) == body.decode('utf-8')
+        number = 20000 if len(body) < 1000 else 2000
+        legacy = min(timeit.repeat(lambda: legacy_extract(asm), number=number, repeat=5)) / number
+        native = min(timeit.repeat(lambda: native_extract(script_hex), number=number, repeat=5)) / number
+        print(f"{name:28} legacy {legacy * 1e6:9.2f} us  native {native * 1e6:9.2f} us  "
+              f"speedup {legacy / native:5.1f}x")
+
+if __name__ == '__main__':
+    main()
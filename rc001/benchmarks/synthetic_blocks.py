@@ -0,0 +1,171 @@
+"""Synthetic Dogecoin-style blocks for indexer benchmarks.
+
+Blocks carry AuxPoW headers and a configurable mix of plain transactions, rc001
+deploys, valid mints, invalid mints (bad SN, missing payment, wrong parent,
+duplicate SN) and occasional burst blocks with hundreds of mints.
+"""
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+from typing import List, Dict, Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from raw_block import NETWORKS, base58check_encode  # noqa: E402
+from bench_inscription_parser import push, push_number  # noqa: E402
+
+HTML_CONTENT_TYPE = b'text/html;charset=utf-8'
+AUXPOW_VERSION = 0x00620104
+MINT_PRICE = 100000
+COINBASE_VALUE = 10000 * 100000000
+
+def varint(n: int) -> bytes:
+    if n < 0xfd:
+        return bytes([n])
+    if n <= 0xffff:
+        return b'\xfd' + struct.pack('<H', n)
+    return b'\xfe' + struct.pack('<I', n)
+
+def p2pkh_script(pubkey_hash: bytes) -> bytes:
+    return b'\x76\xa9\x14' + pubkey_hash + b'\x88\xac'
+
+class ChainBuilder:
+    """Build serialized transactions and blocks from a seeded random source"""
+
+    def __init__(self, coin_ticker: str = 'DOGE', seed: int = 0):
+        self.coin_ticker = coin_ticker
+        self.network = NETWORKS[coin_ticker]
+        self.random = random.Random(seed)
+
+    def randbytes(self, n: int) -> bytes:
+        return self.random.randbytes(n)
+
+    def transaction(self, inputs: List[tuple], outputs: List[tuple]) -> bytes:
+        """Legacy transaction from (prev txid, vout, scriptSig) inputs and (value, script) outputs"""
+        body = varint(len(inputs)) + b''.join(
+            prev + struct.pack('<I', index) + varint(len(script)) + script + b'\xff\xff\xff\xff'
+            for prev, index, script in inputs)
+        body += varint(len(outputs)) + b''.join(
+            struct.pack('<q', value) + varint(len(script)) + script for value, script in outputs)
+        return struct.pack('<i', 1) + body + b'\x00\x00\x00\x00'
+
+    def coinbase(self, height: int) -> bytes:
+        script = push_number(height + 17) + self.randbytes(4)
+        return self.transaction([(b'\x00' * 32, 0xffffffff, script)],
+                                [(COINBASE_VALUE, p2pkh_script(self.randbytes(20)))])
+
+    def plain(self) -> bytes:
+        script_sig = push(self.randbytes(71) + b'\x01') + push(b'\x02' + self.randbytes(32))
+        return self.transaction([(self.randbytes(32), 1, script_sig)],
+                                [(12345678, p2pkh_script(self.randbytes(20))),
+                                 (87654321, p2pkh_script(self.randbytes(20)))])
+
+    def inscription(self, body: bytes, payments: List[tuple]) -> bytes:
+        """Inscription reveal whose first output receives the inscription, followed by ``payments``"""
+        chunks = [body[i:i + 240] for i in range(0, len(body), 240)]
+        script_sig = push(b'ord') + push_number(len(chunks)) + push(HTML_CONTENT_TYPE)
+        for i, chunk in enumerate(chunks):
+            script_sig += push_number(len(chunks) - 1 - i) + push(chunk)
+        script_sig += push(self.randbytes(71) + b'\x01') + push(b'\x21' + self.randbytes(33) + b'\xac')
+        outputs = [(100000, p2pkh_script(self.randbytes(20)))] + payments
+        return self.transaction([(self.randbytes(32), 0, script_sig)], outputs)
+
+    def header(self, previous_hash: bytes) -> bytes:
+        header = struct.pack('<i', AUXPOW_VERSION if self.network['auxpow'] else 4)
+        header += previous_hash + self.randbytes(32) + struct.pack('<III', 1700000000, 0x1e0ffff0, 0)
+        if not self.network['auxpow']:
+            return header
+        parent_coinbase = self.transaction([(b'\x00' * 32, 0xffffffff, self.randbytes(40))],
+                                           [(COINBASE_VALUE, p2pkh_script(self.randbytes(20)))])
+        return (header + parent_coinbase + self.randbytes(32)
+                + varint(3) + self.randbytes(96) + b'\x00\x00\x00\x00'
+                + varint(2) + self.randbytes(64) + b'\x02\x00\x00\x00'
+                + self.randbytes(80))
+
+    def block(self, previous_hash_hex: str, transactions: List[bytes]) -> tuple:
+        """(serialized block, block hash hex)"""
+        header = self.header(bytes.fromhex(previous_hash_hex)[::-1])
+        block_hash = hashlib.sha256(hashlib.sha256(header[:80]).digest()).digest()[::-1].hex()
+        return header + varint(len(transactions)) + b''.join(transactions), block_hash
+
+def deploy_html(title: str, mint_address: str, parent_inscription_id: str) -> bytes:
+    json_data = json.dumps({
+        "sn": [{"range": "000001-999999"}],
+        "mint_address": mint_address,
+        "mint_price": MINT_PRICE,
+        "parent_inscription_id": parent_inscription_id,
+        "emblem_inscription_id": parent_inscription_id,
+        "website": "https://example.com",
+    })
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="p" content="rc001">'
+            f'<meta name="op" content="deploy"><title>{title}</title></head><body>'
+            f'<script type="application/json" id="json-data">{json_data}</script></body></html>').encode()
+
+def mint_html(title: str, sn: str, parent_inscription_id: str) -> bytes:
+    """The same page /rc001/mint generates"""
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" '
+            f'content="width=device-width, initial-scale=1.0"><meta name="p" content="rc001">'
+            f'<meta name="op" content="mint"><meta name="sn" content="{sn}"><title>{title}</title></head>'
+            f'<body><script src="/content/{parent_inscription_id}"></script></body></html>').encode()
+
+def generate_chain(n_blocks: int, coin_ticker: str = 'DOGE', plain_per_block: int = 50, valid_mints: int = 2,
+                   invalid_mints: int = 1, collections: int = 1, burst_every: int = 0, burst_size: int = 300,
+                   seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate a chain from genesis as [{'height', 'hash', 'raw'}] with the serialized block in hex.
+
+    Collections are deployed in block 1; from block 2 on every block carries ``valid_mints``
+    paid mints and ``invalid_mints`` rejected ones, and every ``burst_every``-th block carries
+    ``burst_size`` extra valid mints.
+    """
+    builder = ChainBuilder(coin_ticker, seed)
+    network = NETWORKS[coin_ticker]
+    deployed = []
+    for i in range(collections):
+        mint_hash = builder.randbytes(20)
+        parent = builder.randbytes(32).hex() + 'i0'
+        deployed.append({
+            'title': f'Bench{i}',
+            'mint_hash': mint_hash,
+            'mint_address': base58check_encode(network['pubkeyhash'], mint_hash),
+            'parent': parent,
+            'next_sn': 1,
+        })
+    invalid_kinds = ('sn', 'payment', 'parent', 'duplicate')
+    invalid_count = 0
+    blocks = []
+    previous_hash = '00' * 32
+    for height in range(n_blocks):
+        transactions = [builder.coinbase(height)]
+        transactions += [builder.plain() for _ in range(plain_per_block)]
+        if height == 1:
+            for collection in deployed:
+                html = deploy_html(collection['title'], collection['mint_address'], collection['parent'])
+                transactions.append(builder.inscription(html, []))
+        elif height > 1:
+            mints = valid_mints + (burst_size if burst_every and height % burst_every == 0 else 0)
+            for i in range(mints + invalid_mints):
+                collection = deployed[builder.random.randrange(len(deployed))]
+                sn = f"{collection['next_sn']:06d}"
+                parent = collection['parent']
+                payments = [(MINT_PRICE, p2pkh_script(collection['mint_hash']))]
+                if i < mints:
+                    collection['next_sn'] += 1
+                else:
+                    kind = invalid_kinds[invalid_count % len(invalid_kinds)]
+                    invalid_count += 1
+                    if kind == 'sn':
+                        sn = '9999999'
+                    elif kind == 'payment':
+                        payments = []
+                    elif kind == 'parent':
+                        parent = builder.randbytes(32).hex() + 'i0'
+                    elif collection['next_sn'] > 1:
+                        sn = f"{collection['next_sn'] - 1:06d}"
+                transactions.append(builder.inscription(mint_html(collection['title'], sn, parent), payments))
+        raw, block_hash = builder.block(previous_hash, transactions)
+        blocks.append({'height': height, 'hash': block_hash, 'raw': raw.hex()})
+        previous_hash = block_hash
+    return blocks
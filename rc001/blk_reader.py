@@ -0,0 +1,197 @@
+import glob
+import mmap
+import os
+import re
+from typing import Optional, Tuple, List, Dict, Iterator
+
+from raw_block import NETWORKS, BLOCK_HEADER_SIZE, double_sha256
+
+BLOCK_FILE_PATTERN = 'blk*.dat'
+# Competing branches are compared over at most this many blocks when picking the main chain
+FORK_LOOKAHEAD = 100
+NULL_HASH = b'\x00' * 32
+
+class MissingBlockError(Exception):
+    """The block files end before the requested height or skip a block of the chain"""
+
+class BlockFileReader:
+    """Read blocks straight from a node's ``blocks/blk*.dat`` files.
+
+    Each file is a sequence of ``<magic> <size> <block>`` records, written in arrival
+    order rather than height order. The reader memory-maps every file, indexes records
+    by the previous-block hash in their header and then walks the hash chain up from the
+    genesis block, so blocks come out in height order. AuxPoW data sits after the 80-byte
+    header and does not affect the block hash, so merge-mined coins need no special care
+    here. Where stale blocks left a fork, the branch that extends furthest wins.
+    """
+
+    def __init__(self, blocks_dir: str, coin_ticker: str):
+        network = NETWORKS.get(coin_ticker)
+        if not network or 'magic' not in network:
+            raise ValueError(f"No block file parameters for coin {coin_ticker}")
+        self.blocks_dir = blocks_dir
+        self.coin_ticker = coin_ticker
+        self.magic = network['magic']
+        self._files: List[mmap.mmap] = []
+        self._paths: List[str] = []
+        # Truncated parent hash -> packed (file index, offset) of each block naming it as parent
+        self._children: Dict[int, int] = {}
+        self._extra_children: Dict[int, List[int]] = {}
+        self.block_count = 0
+
+    def __enter__(self) -> 'BlockFileReader':
+        self.index()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for mapped in self._files:
+            mapped.close()
+        self._files = []
+        self._paths = []
+
+    @staticmethod
+    def _key(block_hash: bytes) -> int:
+        return int.from_bytes(block_hash[:8], 'little')
+
+    @staticmethod
+    def _file_number(path: str) -> int:
+        match = re.search(r'(\d+)', os.path.basename(path))
+        return int(match.group(1)) if match else -1
+
+    def index(self) -> None:
+        """Map every block file and index the records by parent hash"""
+        xor_path = os.path.join(self.blocks_dir, 'xor.dat')
+        if os.path.exists(xor_path):
+            with open(xor_path, 'rb') as f:
+                if any(f.read()):
+                    raise ValueError(f"Block files in {self.blocks_dir} are obfuscated, restart the node with -blocksxor=0")
+        paths = sorted(glob.glob(os.path.join(self.blocks_dir, BLOCK_FILE_PATTERN)), key=self._file_number)
+        if not paths:
+            raise FileNotFoundError(f"No {BLOCK_FILE_PATTERN} files found in {self.blocks_dir}")
+        for path in paths:
+            if os.path.getsize(path) == 0:
+                continue
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            file_index = len(self._files)
+            self._files.append(mapped)
+            self._paths.append(path)
+            self._index_file(file_index, mapped)
+
+    def _index_file(self, file_index: int, mapped: mmap.mmap) -> None:
+        magic = self.magic
+        end = len(mapped)
+        pos = 0
+        while pos + 8 + BLOCK_HEADER_SIZE <= end:
+            if mapped[pos:pos + 4] != magic:
+                if not any(mapped[pos:pos + 8]):
+                    break  # Zero-filled space the node preallocated for future blocks
+                pos = mapped.find(magic, pos + 1)
+                if pos == -1:
+                    break
+                continue
+            size = int.from_bytes(mapped[pos + 4:pos + 8], 'little')
+            start = pos + 8
+            if start + size > end:
+                break  # Record still being written
+            key = self._key(mapped[start + 4:start + 36])
+            location = file_index << 40 | start
+            if key in self._children:
+                self._extra_children.setdefault(key, []).append(location)
+            else:
+                self._children[key] = location
+            self.block_count += 1
+            pos = start + size
+
+    def _read(self, location: int) -> bytes:
+        """Serialized block stored at a packed location"""
+        mapped = self._files[location >> 40]
+        start = location & ((1 << 40) - 1)
+        size = int.from_bytes(mapped[start - 4:start], 'little')
+        return mapped[start:start + size]
+
+    def _header(self, location: int) -> bytes:
+        mapped = self._files[location >> 40]
+        start = location & ((1 << 40) - 1)
+        return mapped[start:start + BLOCK_HEADER_SIZE]
+
+    def _child_locations(self, block_hash: bytes) -> List[int]:
+        """Locations of every stored block whose parent is ``block_hash``"""
+        key = self._key(block_hash)
+        if key not in self._children:
+            return []
+        candidates = [self._children[key]] + self._extra_children.get(key, [])
+        # The index key is truncated, so confirm the full parent hash
+        return [location for location in candidates if self._header(location)[4:36] == block_hash]
+
+    def _branch_length(self, location: int, limit: int) -> int:
+        """How many blocks the branch starting at ``location`` extends, up to ``limit``"""
+        best = 1
+        stack = [(location, 1)]
+        while stack and best < limit:
+            location, depth = stack.pop()
+            best = max(best, depth)
+            if depth < limit:
+                block_hash = double_sha256(self._header(location))
+                stack.extend((child, depth + 1) for child in self._child_locations(block_hash))
+        return best
+
+    def _next_location(self, block_hash: bytes) -> Optional[int]:
+        children = self._child_locations(block_hash)
+        if len(children) <= 1:
+            return children[0] if children else None
+        return max(children, key=lambda location: self._branch_length(location, FORK_LOOKAHEAD))
+
+    def _orphan_count(self) -> int:
+        """Number of stored blocks whose parent is missing from the files"""
+        stored = {self._key(double_sha256(self._header(location))) for location in self._children.values()}
+        for locations in self._extra_children.values():
+            stored.update(self._key(double_sha256(self._header(location))) for location in locations)
+        stored.add(self._key(NULL_HASH))
+        return sum(1 + len(self._extra_children.get(key, ())) for key in self._children if key not in stored)
+
+    def _iter_chain(self, start_height: int, end_height: Optional[int]) -> Iterator[Tuple[int, int]]:
+        """Yield (height, packed location) along the main chain from ``start_height``.
+
+        Raises MissingBlockError when the chain ends before ``end_height``, or, without an
+        end height, when stored blocks follow a block the files do not contain, as while the
+        node is still downloading blocks out of order.
+        """
+        location = self._next_location(NULL_HASH)
+        height = 0
+        while location is not None and (end_height is None or height <= end_height):
+            if height >= start_height:
+                yield height, location
+            location = self._next_location(double_sha256(self._header(location)))
+            height += 1
+        if end_height is not None:
+            if height <= end_height:
+                raise MissingBlockError(f"Block files in {self.blocks_dir} end at height {height - 1}, "
+                                        f"before end height {end_height}")
+        elif self.block_count > height:
+            orphans = self._orphan_count()
+            if orphans:
+                raise MissingBlockError(f"Block files in {self.blocks_dir} are missing the block after height "
+                                        f"{height - 1}, {orphans} later block(s) cannot be reached")
+
+    def iter_blocks(self, start_height: int = 0, end_height: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """Yield (height, serialized block) along the main chain from ``start_height``"""
+        for height, location in self._iter_chain(start_height, end_height):
+            yield height, self._read(location)
+
+    def iter_locations(self, start_height: int = 0,
+                       end_height: Optional[int] = None) -> Iterator[Tuple[int, Tuple[str, int, int]]]:
+        """Yield (height, (path, offset, size)) along the main chain, for readers in other processes"""
+        for height, location in self._iter_chain(start_height, end_height):
+            mapped = self._files[location >> 40]
+            start = location & ((1 << 40) - 1)
+            yield height, (self._paths[location >> 40], start, int.from_bytes(mapped[start - 4:start], 'little'))
+
+def read_block_file_record(path: str, offset: int, size: int) -> bytes:
+    """Read one serialized block located by ``BlockFileReader.iter_locations``"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
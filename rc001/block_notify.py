@@ -0,0 +1,203 @@
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Optional, Dict, List
+
+try:
+    import zmq
+except ImportError:
+    zmq = None
+
+logger = logging.getLogger(__name__)
+
+# rpc.conf keys that enable a notification source for a coin
+ZMQ_OPTION = 'zmqpubhashblock'
+SOCKET_OPTION = 'blocknotify_socket'
+FILE_OPTION = 'blocknotify_file'
+# How often listeners check for shutdown, and how often a trigger file is stat'ed
+LISTENER_TIMEOUT = 1
+FILE_POLL_INTERVAL = 1
+
+class BlockNotifier:
+    """Wake a coin's scanning worker as soon as its node announces a new block.
+
+    Sources are configured per coin in rpc.conf: ``zmqpubhashblock`` subscribes to the
+    node's ZMQ ``hashblock`` topic, ``blocknotify_socket`` binds a Unix datagram socket
+    fed by ``-blocknotify`` (see ``send_notification``), and ``blocknotify_file`` watches
+    a file whose modification time changes on every block. Workers keep polling on their
+    timeout when no source is configured or a notification is missed.
+    """
+
+    def __init__(self, stop_event: threading.Event):
+        self.stop_event = stop_event
+        self._events: Dict[str, threading.Event] = {}
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _event(self, coin_ticker: str) -> threading.Event:
+        with self._lock:
+            return self._events.setdefault(coin_ticker, threading.Event())
+
+    def notify(self, coin_ticker: str, block_hash: Optional[str] = None) -> None:
+        """Signal that a new block is available for a coin"""
+        logger.debug(f"Block notification for {coin_ticker}: {block_hash or 'no hash'}")
+        self._event(coin_ticker).set()
+
+    def wake_all(self) -> None:
+        """Release every waiting worker, used on shutdown"""
+        with self._lock:
+            events = list(self._events.values())
+        for event in events:
+            event.set()
+
+    def wait(self, coin_ticker: str, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a block notification; True if one arrived.
+
+        Notifications that arrive while the worker is busy scanning are kept, so the
+        next wait returns at once and the new tip is picked up without delay.
+        """
+        event = self._event(coin_ticker)
+        deadline = time.monotonic() + timeout
+        while not self.stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if event.wait(min(remaining, LISTENER_TIMEOUT)):
+                event.clear()
+                return not self.stop_event.is_set()
+        return False
+
+    def start(self, coin_ticker: str, config: Dict[str, str]) -> List[str]:
+        """Start listeners for every notification source configured for a coin"""
+        started = []
+        self._event(coin_ticker)
+        if config.get(ZMQ_OPTION):
+            if zmq is None:
+                logger.warning(f"{ZMQ_OPTION} is set for {coin_ticker} but pyzmq is not installed, polling instead")
+            else:
+                self._spawn(coin_ticker, 'zmq', self._zmq_listener, config[ZMQ_OPTION])
+                started.append(f"zmq {config[ZMQ_OPTION]}")
+        if config.get(SOCKET_OPTION):
+            self._spawn(coin_ticker, 'socket', self._socket_listener, config[SOCKET_OPTION])
+            started.append(f"socket {config[SOCKET_OPTION]}")
+        if config.get(FILE_OPTION):
+            self._spawn(coin_ticker, 'file', self._file_listener, config[FILE_OPTION])
+            started.append(f"file {config[FILE_OPTION]}")
+        if started:
+            logger.info(f"Block notifications for {coin_ticker}: {', '.join(started)}")
+        return started
+
+    def _spawn(self, coin_ticker: str, source: str, target, address: str) -> None:
+        thread = threading.Thread(target=self._run_listener, args=(coin_ticker, source, target, address),
+                                  name=f"notify-{source}-{coin_ticker}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _run_listener(self, coin_ticker: str, source: str, target, address: str) -> None:
+        """Keep a listener running, restarting it after errors until shutdown"""
+        while not self.stop_event.is_set():
+            try:
+                target(coin_ticker, address)
+            except Exception as e:
+                logger.error(f"Block notification {source} listener for {coin_ticker} failed: {e}")
+                self.stop_event.wait(LISTENER_TIMEOUT * 5)
+
+    def _zmq_listener(self, coin_ticker: str, endpoint: str) -> None:
+        """Subscribe to the node's ZMQ hashblock topic"""
+        context = zmq.Context.instance()
+        sub = context.socket(zmq.SUB)
+        try:
+            sub.setsockopt(zmq.RCVTIMEO, LISTENER_TIMEOUT * 1000)
+            sub.setsockopt(zmq.SUBSCRIBE, b'hashblock')
+            sub.connect(endpoint)
+            while not self.stop_event.is_set():
+                try:
+                    parts = sub.recv_multipart()
+                except zmq.Again:
+                    continue
+                self.notify(coin_ticker, parts[1].hex() if len(parts) > 1 else None)
+        finally:
+            sub.close(linger=0)
+
+    def _socket_listener(self, coin_ticker: str, path: str) -> None:
+        """Receive block hashes sent to a Unix datagram socket by -blocknotify"""
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.bind(path)
+            sock.settimeout(LISTENER_TIMEOUT)
+            while not self.stop_event.is_set():
+                try:
+                    data = sock.recv(256)
+                except socket.timeout:
+                    continue
+                self.notify(coin_ticker, data.decode('ascii', 'replace').strip() or None)
+        finally:
+            sock.close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _file_listener(self, coin_ticker: str, path: str) -> None:
+        """Watch a trigger file and notify whenever its modification time changes"""
+        def mtime() -> Optional[int]:
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                return None
+
+        last_mtime = mtime()
+        while not self.stop_event.wait(FILE_POLL_INTERVAL):
+            current = mtime()
+            if current is not None and current != last_mtime:
+                self.notify(coin_ticker)
+            last_mtime = current
+
+def send_notification(block_hash: str, socket_path: Optional[str] = None, file_path: Optional[str] = None,
+                      zmq_endpoint: Optional[str] = None) -> None:
+    """Announce a block to a running indexer; the publishing side of BlockNotifier"""
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.sendto(block_hash.encode('ascii'), socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # The indexer is not running; it will catch up by polling when it starts
+            pass
+        finally:
+            sock.close()
+    if file_path:
+        with open(file_path, 'a'):
+            os.utime(file_path, None)
+    if zmq_endpoint:
+        if zmq is None:
+            raise RuntimeError("pyzmq is required to publish ZMQ notifications")
+        pub = zmq.Context.instance().socket(zmq.PUB)
+        try:
+            pub.bind(zmq_endpoint)
+            # Give subscribers time to connect before the message is sent
+            time.sleep(0.5)
+            pub.send_multipart([b'hashblock', bytes.fromhex(block_hash), (0).to_bytes(4, 'little')])
+        finally:
+            pub.close(linger=1000)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Announce a new block to the rc001 indexer, e.g. "
+                    "blocknotify=python3 /path/to/rc001/block_notify.py --socket /tmp/rc001-DOGE.sock %s")
+    parser.add_argument('block_hash')
+    parser.add_argument('--socket', dest='socket_path', help="Unix datagram socket set as blocknotify_socket")
+    parser.add_argument('--file', dest='file_path', help="trigger file set as blocknotify_file")
+    parser.add_argument('--zmq', dest='zmq_endpoint',
+                        help="bind a ZMQ publisher here and send one hashblock message (stand-in for a node)")
+    args = parser.parse_args(argv)
+    if not (args.socket_path or args.file_path or args.zmq_endpoint):
+        parser.error("one of --socket, --file or --zmq is required")
+    send_notification(args.block_hash, args.socket_path, args.file_path, args.zmq_endpoint)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import threading
+from decimal import Decimal
+from typing import Optional, Tuple, List, Dict, Any
+
+class SerialNumberValidator:
+    """Serial-number check for one collection, compiled once from its serial ranges.
+
+    Follows the rules the indexer has always applied: a single wide range (``000001-010000``)
+    is compared as a zero-padded string, a lone range the same way, and anything else is
+    validated two characters at a time against the range with the same index.
+    """
+
+    def __init__(self, ranges: List[Tuple[int, Any]]):
+        range_values = {}
+        for range_index, range_value in ranges:
+            range_values[range_index] = range_value
+        self.mode = 'segments'
+        self.bounds = None
+        self.segments = {}
+        first = range_values.get(0)
+        if isinstance(first, str) and '-' in first and len(first.split('-')[0]) > 2:
+            bounds = self._compile(first)
+            if bounds and len(bounds[0]) > 2 and len(bounds[1]) > 2:
+                self.mode = 'range'
+                self.bounds = bounds
+                return
+        if len(range_values) == 1:
+            self.mode = 'single'
+            self.bounds = self._compile(next(iter(range_values.values())))
+            return
+        self.segments = {index: self._compile(value) for index, value in range_values.items()}
+
+    @staticmethod
+    def _compile(range_value: Any) -> Optional[Tuple[str, str, int]]:
+        """Split 'low-high' into (low, high, pad width); None for malformed ranges"""
+        # Deploy JSON is stored as given, so a range may be a number, null or a list
+        if not isinstance(range_value, str):
+            return None
+        parts = range_value.split('-')
+        if len(parts) < 2:
+            return None
+        return parts[0], parts[1], len(parts[1])
+
+    def is_valid(self, sn: str) -> bool:
+        """Check a serial number against the compiled ranges"""
+        if self.mode != 'segments':
+            if self.bounds is None:
+                return False
+            low, high, width = self.bounds
+            return low <= sn.zfill(width) <= high
+        for i, start in enumerate(range(0, len(sn), 2)):
+            # A segment without a range, or with a malformed one, rejects the SN
+            bounds = self.segments.get(i)
+            if bounds is None:
+                return False
+            low, high, width = bounds
+            if not (low <= sn[start:start + 2].zfill(width) <= high):
+                return False
+        return True
+
+class CollectionEntry:
+    """What mint validation needs to know about a deployed collection"""
+
+    __slots__ = ('collection_id', 'coin_ticker', 'sanitized_name', 'mint_address', 'mint_price',
+                 'mint_price_btc', 'parent_inscription_id', 'validator')
+
+    def __init__(self, collection_id: int, coin_ticker: str, sanitized_name: str, mint_address: Any,
+                 mint_price: Any, parent_inscription_id: Any, ranges: List[Tuple[int, str]]):
+        self.collection_id = collection_id
+        self.coin_ticker = coin_ticker
+        self.sanitized_name = sanitized_name
+        self.mint_address = mint_address
+        self.mint_price = mint_price
+        try:
+            self.mint_price_btc = Decimal(float(mint_price)) / Decimal(100000000)
+        except (TypeError, ValueError):
+            self.mint_price_btc = None
+        self.parent_inscription_id = parent_inscription_id
+        self.validator = SerialNumberValidator(ranges)
+
+class CollectionRegistry:
+    """In-process map of deployed collections keyed by (coin_ticker, sanitized_name)"""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], CollectionEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, coin_ticker: str, sanitized_name: str) -> Optional[CollectionEntry]:
+        return self._entries.get((coin_ticker, sanitized_name))
+
+    def add(self, entry: CollectionEntry) -> None:
+        with self._lock:
+            self._entries[(entry.coin_ticker, entry.sanitized_name)] = entry
+
+    def load(self, conn) -> None:
+        """Replace the registry contents with every collection in the database"""
+        entries = {(entry.coin_ticker, entry.sanitized_name): entry for entry in load_collection_rows(conn)}
+        with self._lock:
+            self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def load_collection_rows(conn, collection_id: Optional[int] = None) -> List[CollectionEntry]:
+    """Build registry entries from the collections and serial_ranges tables"""
+    c = conn.cursor()
+    where = ' WHERE collection_id = ?' if collection_id is not None else ''
+    params = (collection_id,) if collection_id is not None else ()
+    c.execute('SELECT collection_id, range_index, range_value FROM serial_ranges' + where +
+              ' ORDER BY collection_id, range_index', params)
+    ranges: Dict[int, List[Tuple[int, str]]] = {}
+    for range_collection_id, range_index, range_value in c.fetchall():
+        ranges.setdefault(range_collection_id, []).append((range_index, range_value))
+    c.execute('SELECT collection_id, coin_ticker, sanitized_name, mint_address, mint_price, parent_inscription_id '
+              'FROM collections' + where, params)
+    return [CollectionEntry(row[0], row[1], row[2], row[3], row[4], row[5], ranges.get(row[0], []))
+            for row in c.fetchall()]
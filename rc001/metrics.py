@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Tuple, List, Dict
+
+# Latency buckets in seconds shared by every histogram
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+METRIC_DEFINITIONS = {
+    'rc001_blocks_total': ('counter', "Blocks committed to the database"),
+    'rc001_transactions_total': ('counter', "Transactions in committed blocks"),
+    'rc001_candidates_total': ('counter', "Transactions carrying an rc001 document"),
+    'rc001_deploys_total': ('counter', "Collections deployed"),
+    'rc001_mints_total': ('counter', "Items minted"),
+    'rc001_rejections_total': ('counter', "Deploys and mints rejected, by reason"),
+    'rc001_reorgs_total': ('counter', "Chain reorganizations rolled back"),
+    'rc001_stage_seconds': ('histogram', "Time spent per pipeline stage (rpc, decode, parse, commit)"),
+    'rc001_tip_height': ('gauge', "Best block height reported by the node"),
+    'rc001_indexed_height': ('gauge', "Last block height committed by the indexer"),
+    'rc001_lag_blocks': ('gauge', "Blocks between the node tip and the indexed height"),
+    'rc001_blocks_per_second': ('gauge', "Commit throughput of the last block window"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        # (name, labels) -> [count per bucket, sum, count]
+        self._histograms: Dict[Tuple[str, LabelKey], list] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(HISTOGRAM_BUCKETS), 0.0, 0]
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, stage: str, **labels: str):
+        """Record the duration of a block of code in the stage histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('rc001_stage_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+    def get(self, name: str, **labels: str) -> float:
+        """Current value of a counter or gauge, 0 when it was never set"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key, 0))
+
+    def histogram(self, name: str, **labels: str) -> Tuple[float, int]:
+        """(sum, count) of a histogram, zeros when nothing was observed"""
+        with self._lock:
+            histogram = self._histograms.get((name, _label_key(labels)))
+            return (histogram[1], histogram[2]) if histogram else (0.0, 0)
+
+    def reset(self) -> None:
+        """Forget every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            samples: Dict[str, List[str]] = {}
+            for (name, key), value in sorted(self._counters.items()):
+                samples.setdefault(name, []).append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for (name, key), value in sorted(self._gauges.items()):
+                samples.setdefault(name, []).append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for (name, key), (buckets, total, count) in sorted(self._histograms.items()):
+                lines = samples.setdefault(name, [])
+                cumulative = 0
+                for bound, bucket_count in zip(HISTOGRAM_BUCKETS, buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        output = []
+        for name in sorted(samples):
+            metric_type, help_text = METRIC_DEFINITIONS.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {metric_type}")
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+    def write_file(self, path: str) -> None:
+        """Write the metrics atomically so readers never see a partial file"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def start_http_server(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve the metrics at /metrics from a background thread"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+# Process-wide registry used by the indexer
+metrics = Metrics()
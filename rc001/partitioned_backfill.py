@@ -0,0 +1,112 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any, Iterator, Iterable
+
+from bitcoinrpc.authproxy import AuthServiceProxy
+
+from raw_block import decode_block
+from rc001_html import read_rc001_document
+from blk_reader import BlockFileReader, read_block_file_record
+
+# Heights handed to a worker process at a time
+PARTITION_SIZE = 500
+
+# Per-process state, set up by _init_worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(coin_ticker: str, rpc_url: Optional[str]) -> None:
+    _worker['coin_ticker'] = coin_ticker
+    _worker['rpc_url'] = rpc_url
+    _worker['rpc'] = None
+
+def _fetch_raw_block(block_height: int, location: Optional[Tuple[str, int, int]]) -> bytes:
+    """Serialized block from a blk*.dat record, or from the node when no location is given"""
+    if location is not None:
+        return read_block_file_record(*location)
+    if _worker['rpc'] is None:
+        _worker['rpc'] = AuthServiceProxy(_worker['rpc_url'], timeout=60)
+    try:
+        rpc = _worker['rpc']
+        return rpc.getblock(rpc.getblockhash(block_height), 0)
+    except Exception:
+        _worker['rpc'] = None
+        raise
+
+def _keep_rc001_transactions(block: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a decoded block to its rc001 transactions, with their parsed documents alongside"""
+    txs, documents = [], []
+    for tx in block['tx']:
+        try:
+            doc = read_rc001_document(tx)
+        except Exception:
+            # Left unparsed so the merge reports it exactly as a sequential scan would
+            doc = None
+        else:
+            if doc is None:
+                continue
+        txs.append(tx)
+        documents.append(doc)
+    block['tx'] = txs
+    block['documents'] = documents
+    return block
+
+def _read_partition(task: List[Tuple[int, Optional[Tuple[str, int, int]]]]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """Worker entry point: fetch, decode and parse one partition of heights"""
+    coin_ticker = _worker['coin_ticker']
+    results = []
+    for block_height, location in task:
+        try:
+            block = decode_block(_fetch_raw_block(block_height, location), coin_ticker, block_height)
+            results.append((block_height, _keep_rc001_transactions(block), None))
+        except Exception as e:
+            # Exceptions from the RPC library do not always survive pickling
+            results.append((block_height, None, RuntimeError(f"{type(e).__name__}: {e}")))
+    return results
+
+def _partitions(locations: Iterable[Tuple[int, Optional[Tuple[str, int, int]]]],
+                partition_size: int) -> Iterator[List[Tuple[int, Optional[Tuple[str, int, int]]]]]:
+    partition = []
+    for item in locations:
+        partition.append(item)
+        if len(partition) >= partition_size:
+            yield partition
+            partition = []
+    if partition:
+        yield partition
+
+def iter_partitioned_blocks(coin_ticker: str, start_height: int, end_height: Optional[int],
+                            processes: Optional[int] = None, blocks_dir: Optional[str] = None,
+                            rpc_url: Optional[str] = None,
+                            partition_size: int = PARTITION_SIZE) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """Yield (height, block, error) for a height range decoded by a pool of worker processes.
+
+    The range is cut into partitions of ``partition_size`` heights that workers fetch (from
+    blk*.dat files when ``blocks_dir`` is given, otherwise over RPC), decode and reduce to
+    their rc001 transactions. Results are yielded strictly in (height, tx_index) order, so
+    the caller applies deploys and mints in the same order a sequential scan would.
+    """
+    processes = processes or os.cpu_count() or 1
+    reader = None
+    if blocks_dir:
+        reader = BlockFileReader(blocks_dir, coin_ticker)
+        reader.index()
+        locations = reader.iter_locations(start_height, end_height)
+    else:
+        if end_height is None:
+            raise ValueError("end_height is required for an RPC backfill")
+        locations = ((block_height, None) for block_height in range(start_height, end_height + 1))
+    executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(coin_ticker, rpc_url))
+    pending = deque()
+    try:
+        for partition in _partitions(locations, partition_size):
+            pending.append(executor.submit(_read_partition, partition))
+            # Keep every worker busy without decoding far ahead of the merge
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if reader is not None:
+            reader.close()
@@ -0,0 +1,68 @@
+import hashlib
+import sqlite3
+import zlib
+from typing import Optional, Tuple, Iterable
+
+# Bodies are stored zlib-compressed unless that does not make them smaller
+COMPRESS_LEVEL = 6
+ENCODING_ZLIB = 'zlib'
+ENCODING_IDENTITY = 'identity'
+
+def create_tables(c: sqlite3.Cursor) -> None:
+    """Payload bodies keyed by their sha256, and the inscriptions that carry each body"""
+    c.execute('''CREATE TABLE IF NOT EXISTS payloads (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER,
+                encoding TEXT,
+                data BLOB,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS inscription_payloads (
+                inscription_id TEXT PRIMARY KEY,
+                coin_ticker TEXT,
+                content_type TEXT,
+                sha256 TEXT,
+                FOREIGN KEY (sha256) REFERENCES payloads(sha256)
+                )''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_inscription_payloads_sha256 ON inscription_payloads (sha256)')
+
+def store_payload(c: sqlite3.Cursor, body: bytes) -> str:
+    """Store a body once and return its sha256; identical bodies share one row"""
+    digest = hashlib.sha256(body).hexdigest()
+    c.execute('SELECT 1 FROM payloads WHERE sha256 = ?', (digest,))
+    if c.fetchone() is None:
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        encoding, data = (ENCODING_ZLIB, compressed) if len(compressed) < len(body) else (ENCODING_IDENTITY, body)
+        c.execute('INSERT INTO payloads (sha256, size, encoding, data) VALUES (?, ?, ?, ?)',
+                 (digest, len(body), encoding, data))
+    return digest
+
+def store_inscription(c: sqlite3.Cursor, coin_ticker: str, inscription_id: str, content_type: str,
+                      body: bytes) -> Optional[int]:
+    """Store an inscription's body; returns the new row id, None when it was stored before"""
+    digest = store_payload(c, body)
+    c.execute('''INSERT OR IGNORE INTO inscription_payloads (inscription_id, coin_ticker, content_type, sha256)
+                VALUES (?, ?, ?, ?)''', (inscription_id, coin_ticker, content_type, digest))
+    return c.lastrowid if c.rowcount else None
+
+def delete_inscriptions(c: sqlite3.Cursor, row_ids: Iterable[int]) -> None:
+    """Remove inscription rows, e.g. on a reorg, and any body no other inscription still uses"""
+    digests = set()
+    for row_id in row_ids:
+        row = c.execute('SELECT sha256 FROM inscription_payloads WHERE rowid = ?', (row_id,)).fetchone()
+        if row:
+            digests.add(row[0])
+            c.execute('DELETE FROM inscription_payloads WHERE rowid = ?', (row_id,))
+    for digest in digests:
+        c.execute('''DELETE FROM payloads WHERE sha256 = ?
+                    AND NOT EXISTS (SELECT 1 FROM inscription_payloads WHERE sha256 = ?)''', (digest, digest))
+
+def load_inscription(conn: sqlite3.Connection, inscription_id: str) -> Optional[Tuple[str, str, bytes]]:
+    """(sha256, content type, body) of a stored inscription"""
+    row = conn.execute('''SELECT p.sha256, i.content_type, p.encoding, p.data FROM inscription_payloads i
+                         JOIN payloads p ON p.sha256 = i.sha256 WHERE i.inscription_id = ?''',
+                       (inscription_id,)).fetchone()
+    if row is None:
+        return None
+    digest, content_type, encoding, data = row
+    return digest, content_type, zlib.decompress(data) if encoding == ENCODING_ZLIB else bytes(data)
@@ -0,0 +1,306 @@
+import hashlib
+from decimal import Decimal
+from typing import Optional, Tuple, List, Dict, Any, Union
+
+from script_parser import iter_script_ops
+
+# Push of the 3-byte "ord" tag that starts every inscription scriptSig
+ORD_MARKER = b'\x03ord'
+RC001_MARKER = b'rc001'
+VERSION_AUXPOW = 1 << 8
+BLOCK_HEADER_SIZE = 80
+COIN = Decimal(100000000)
+
+# Address parameters and on-disk message start bytes per coin, taken from the bundled bitcore-lib networks
+NETWORKS = {
+    'DOGE': {'pubkeyhash': 0x1e, 'scripthash': 0x16, 'auxpow': True, 'magic': bytes.fromhex('c0c0c0c0')},
+    'PEP': {'pubkeyhash': 0x38, 'scripthash': 0x16, 'auxpow': True, 'magic': bytes.fromhex('c0a0f0e0')},
+    'SHIC': {'pubkeyhash': 0x3f, 'scripthash': 0x16, 'auxpow': True, 'magic': bytes.fromhex('b0c0e0f0')},
+    'DEV': {'pubkeyhash': 0x1e, 'scripthash': 0x16, 'auxpow': True, 'magic': bytes.fromhex('c0c1c2c3')},
+    'BONC': {'pubkeyhash': 0x19, 'scripthash': 0x1c, 'auxpow': True, 'magic': bytes.fromhex('424f4e43')},
+    'FLOP': {'pubkeyhash': 0x23, 'scripthash': 0x16, 'auxpow': True, 'magic': bytes.fromhex('c0c0c0c0')},
+    'LKY': {'pubkeyhash': 0x2f, 'scripthash': 0x05, 'auxpow': True, 'magic': bytes.fromhex('fbc0b6db')},
+    'DGB': {'pubkeyhash': 0x1e, 'scripthash': 0x3f, 'bech32_hrp': 'dgb', 'auxpow': False,
+            'magic': bytes.fromhex('fac3b6da')},
+}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32M_CONST = 0x2bc830a3
+
+def double_sha256(data: Buffer) -> bytes:
+    """SHA256d of data"""
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+def hash160(data: Buffer) -> Optional[bytes]:
+    """RIPEMD160(SHA256(data)), None when the local OpenSSL has no ripemd160"""
+    try:
+        return hashlib.new('ripemd160', hashlib.sha256(data).digest()).digest()
+    except ValueError:
+        return None
+
+def base58check_encode(version: int, payload: bytes) -> str:
+    """Encode a versioned payload as a base58check address"""
+    data = bytes([version]) + payload
+    data += double_sha256(data)[:4]
+    value = int.from_bytes(data, 'big')
+    encoded = ''
+    while value:
+        value, remainder = divmod(value, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    leading_zeros = len(data) - len(data.lstrip(b'\x00'))
+    return '1' * leading_zeros + encoded
+
+def _bech32_polymod(values: List[int]) -> int:
+    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            checksum ^= generator[i] if ((top >> i) & 1) else 0
+    return checksum
+
+def segwit_address(hrp: str, witness_version: int, program: bytes) -> str:
+    """Encode a witness program as a bech32 (v0) or bech32m (v1+) address"""
+    data = [witness_version]
+    accumulator, bits = 0, 0
+    for byte in program:
+        accumulator = (accumulator << 8) | byte
+        bits += 8
+        while bits >= 5:
+            bits -= 5
+            data.append((accumulator >> bits) & 31)
+    if bits:
+        data.append((accumulator << (5 - bits)) & 31)
+    const = 1 if witness_version == 0 else BECH32M_CONST
+    expanded_hrp = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    polymod = _bech32_polymod(expanded_hrp + data + [0] * 6) ^ const
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[d] for d in data + checksum)
+
+def read_varint(buf: Buffer, pos: int) -> Tuple[int, int]:
+    """Read a CompactSize integer, returning (value, new position)"""
+    first = buf[pos]
+    if first < 0xfd:
+        return first, pos + 1
+    size = 2 if first == 0xfd else 4 if first == 0xfe else 8
+    return int.from_bytes(buf[pos + 1:pos + 1 + size], 'little'), pos + 1 + size
+
+def skip_transaction(buf: Buffer, pos: int) -> Tuple[int, Optional[Tuple[int, int]], Optional[int]]:
+    """Walk a serialized transaction without decoding it.
+
+    Returns (end position, (start, end) of the first input's scriptSig, witness start or None).
+    """
+    pos += 4
+    segwit = buf[pos] == 0 and buf[pos + 1] != 0
+    if segwit:
+        pos += 2
+    input_count, pos = read_varint(buf, pos)
+    first_script_sig = None
+    for i in range(input_count):
+        pos += 36
+        script_length, pos = read_varint(buf, pos)
+        if i == 0:
+            first_script_sig = (pos, pos + script_length)
+        pos += script_length + 4
+    output_count, pos = read_varint(buf, pos)
+    for _ in range(output_count):
+        script_length, pos = read_varint(buf, pos + 8)
+        pos += script_length
+    witness_start = None
+    if segwit:
+        witness_start = pos
+        for _ in range(input_count):
+            item_count, pos = read_varint(buf, pos)
+            for _ in range(item_count):
+                item_length, pos = read_varint(buf, pos)
+                pos += item_length
+    if pos + 4 > len(buf):
+        raise ValueError("transaction runs past end of buffer")
+    return pos + 4, first_script_sig, witness_start
+
+def skip_block_header(buf: Buffer, pos: int, auxpow: bool) -> int:
+    """Skip an 80-byte header and, for merge-mined blocks, the AuxPoW that follows it"""
+    version = int.from_bytes(buf[pos:pos + 4], 'little')
+    pos += BLOCK_HEADER_SIZE
+    if auxpow and version & VERSION_AUXPOW:
+        pos, _, _ = skip_transaction(buf, pos)  # parent coinbase
+        pos += 32  # parent block hash
+        for _ in range(2):  # coinbase branch, then blockchain branch
+            branch_length, pos = read_varint(buf, pos)
+            pos += 32 * branch_length + 4
+        pos += BLOCK_HEADER_SIZE  # parent block header
+    return pos
+
+def transaction_id(buf: Buffer, start: int, end: int, witness_start: Optional[int]) -> str:
+    """Hex txid of a serialized transaction, excluding witness data"""
+    if witness_start is None:
+        return double_sha256(buf[start:end])[::-1].hex()
+    stripped = bytes(buf[start:start + 4]) + bytes(buf[start + 6:witness_start]) + bytes(buf[end - 4:end])
+    return double_sha256(stripped)[::-1].hex()
+
+def _multisig_pubkeys(script: bytes) -> Optional[Tuple[int, List[bytes]]]:
+    """(required signatures, public keys) of a bare ``m <pubkeys> n OP_CHECKMULTISIG`` script"""
+    length = len(script)
+    if length < 3 or script[-1] != 0xae or not 0x51 <= script[0] <= 0x60 or not 0x51 <= script[-2] <= 0x60:
+        return None
+    pubkeys = []
+    pos = 1
+    while pos < length - 2:
+        size = script[pos]
+        if size not in (33, 65) or pos + 1 + size > length - 2:
+            return None
+        pubkeys.append(script[pos + 1:pos + 1 + size])
+        pos += 1 + size
+    required = script[0] - 0x50
+    if len(pubkeys) != script[-2] - 0x50 or not 1 <= required <= len(pubkeys):
+        return None
+    return required, pubkeys
+
+def _is_valid_pubkey(pubkey: bytes) -> bool:
+    """The prefix check bitcoind applies before listing a key's address"""
+    return (len(pubkey) == 33 and pubkey[0] in (2, 3)) or (len(pubkey) == 65 and pubkey[0] in (4, 6, 7))
+
+def decode_script_pubkey(script: bytes, coin_ticker: str) -> Dict[str, Any]:
+    """Decode an output script into bitcoind's verbose ``scriptPubKey`` layout"""
+    network = NETWORKS.get(coin_ticker, {})
+    script_pubkey = {'hex': script.hex(), 'type': 'nonstandard'}
+    address = None
+    length = len(script)
+    if length == 25 and script[:3] == b'\x76\xa9\x14' and script[23:] == b'\x88\xac':
+        script_pubkey['type'] = 'pubkeyhash'
+        if 'pubkeyhash' in network:
+            address = base58check_encode(network['pubkeyhash'], script[3:23])
+    elif length == 23 and script[:2] == b'\xa9\x14' and script[22] == 0x87:
+        script_pubkey['type'] = 'scripthash'
+        if 'scripthash' in network:
+            address = base58check_encode(network['scripthash'], script[2:22])
+    elif length in (35, 67) and script[0] == length - 2 and script[-1] == 0xac:
+        script_pubkey['type'] = 'pubkey'
+        pubkey_hash = hash160(script[1:-1])
+        if pubkey_hash and 'pubkeyhash' in network:
+            address = base58check_encode(network['pubkeyhash'], pubkey_hash)
+    elif length and script[0] == 0x6a:
+        script_pubkey['type'] = 'nulldata'
+    elif (multisig := _multisig_pubkeys(script)) is not None:
+        # Verbose getblock lists the P2PKH address of every valid key of a bare multisig output
+        required, pubkeys = multisig
+        script_pubkey['type'] = 'multisig'
+        script_pubkey['reqSigs'] = required
+        pubkey_hashes = [hash160(pubkey) for pubkey in pubkeys if _is_valid_pubkey(pubkey)]
+        if 'pubkeyhash' in network and pubkey_hashes and all(pubkey_hashes):
+            script_pubkey['addresses'] = [base58check_encode(network['pubkeyhash'], pubkey_hash)
+                                          for pubkey_hash in pubkey_hashes]
+    elif length in (22, 34) and script[0] == 0x00 and script[1] == length - 2:
+        script_pubkey['type'] = 'witness_v0_keyhash' if length == 22 else 'witness_v0_scripthash'
+        if 'bech32_hrp' in network:
+            address = segwit_address(network['bech32_hrp'], 0, script[2:])
+    elif length == 34 and script[0] == 0x51 and script[1] == 0x20:
+        script_pubkey['type'] = 'witness_v1_taproot'
+        if 'bech32_hrp' in network:
+            address = segwit_address(network['bech32_hrp'], 1, script[2:])
+    if address:
+        script_pubkey['addresses'] = [address]
+    return script_pubkey
+
+def decode_transaction(buf: Buffer, start: int, coin_ticker: str) -> Dict[str, Any]:
+    """Fully decode one serialized transaction into bitcoind's verbose transaction layout"""
+    end, _, witness_start = skip_transaction(buf, start)
+    pos = start + 4
+    if witness_start is not None:
+        pos += 2
+    vin = []
+    input_count, pos = read_varint(buf, pos)
+    for _ in range(input_count):
+        prev_txid = bytes(buf[pos:pos + 32])
+        prev_index = int.from_bytes(buf[pos + 32:pos + 36], 'little')
+        script_length, pos = read_varint(buf, pos + 36)
+        script_sig = bytes(buf[pos:pos + script_length])
+        pos += script_length
+        sequence = int.from_bytes(buf[pos:pos + 4], 'little')
+        pos += 4
+        if prev_txid == b'\x00' * 32 and prev_index == 0xffffffff:
+            vin.append({'coinbase': script_sig.hex(), 'sequence': sequence})
+        else:
+            vin.append({
+                'txid': prev_txid[::-1].hex(),
+                'vout': prev_index,
+                'scriptSig': {'hex': script_sig.hex()},
+                'sequence': sequence,
+            })
+    vout = []
+    output_count, pos = read_varint(buf, pos)
+    for n in range(output_count):
+        value = int.from_bytes(buf[pos:pos + 8], 'little')
+        script_length, pos = read_varint(buf, pos + 8)
+        script = bytes(buf[pos:pos + script_length])
+        pos += script_length
+        vout.append({'value': Decimal(value) / COIN, 'n': n,
+                     'scriptPubKey': decode_script_pubkey(script, coin_ticker)})
+    return {
+        'txid': transaction_id(buf, start, end, witness_start),
+        'version': int.from_bytes(buf[start:start + 4], 'little'),
+        'locktime': int.from_bytes(buf[end - 4:end], 'little'),
+        'vin': vin,
+        'vout': vout,
+    }
+
+def _is_rc001_candidate(buf: bytes, script_sig: Optional[Tuple[int, int]]) -> bool:
+    """Whether the first scriptSig starts with the ord push and may carry the rc001 meta bytes"""
+    if script_sig is None or not buf.startswith(ORD_MARKER, script_sig[0], script_sig[1]):
+        return False
+    return _may_contain_rc001(buf, script_sig)
+
+def _may_contain_rc001(buf: bytes, script_sig: Tuple[int, int]) -> bool:
+    """Cheap check for the rc001 meta bytes in an inscription scriptSig"""
+    start, end = script_sig
+    if buf.find(RC001_MARKER, start, end) != -1:
+        return True
+    # The marker may straddle two body chunks, so look again with the push headers removed
+    try:
+        body = b''.join(data for _, data in iter_script_ops(memoryview(buf)[start:end])
+                        if data is not None and len(data) > 4)
+    except ValueError:
+        return False
+    return RC001_MARKER in body
+
+def decode_block(raw_block: Union[str, bytes], coin_ticker: str, block_height: int) -> Dict[str, Any]:
+    """Decode a raw block, keeping only transactions that can be rc001 inscriptions.
+
+    Hex is parsed once into a single buffer, which is then walked through a memoryview
+    without copying; only transactions whose first scriptSig starts with the ord push and
+    carries the rc001 meta bytes are fully decoded.
+    """
+    data = bytes.fromhex(raw_block) if isinstance(raw_block, str) else raw_block
+    buf = memoryview(data)
+    network = NETWORKS.get(coin_ticker, {})
+    block = {
+        'hash': double_sha256(buf[:BLOCK_HEADER_SIZE])[::-1].hex(),
+        'previousblockhash': buf[4:36][::-1].hex(),
+        'height': block_height,
+        'tx': [],
+    }
+    pos = skip_block_header(buf, 0, network.get('auxpow', False))
+    tx_count, pos = read_varint(buf, pos)
+    # Total transaction count, as in bitcoind's verbose blocks, even though only candidates are kept
+    block['nTx'] = tx_count
+    if data.find(ORD_MARKER, pos) == -1:
+        return block
+    for _ in range(tx_count):
+        start = pos
+        pos, script_sig, _ = skip_transaction(buf, start)
+        if _is_rc001_candidate(data, script_sig):
+            block['tx'].append(decode_transaction(buf, start, coin_ticker))
+    return block
+
+def decode_rc001_candidate(raw_tx: Union[str, bytes], coin_ticker: str) -> Optional[Dict[str, Any]]:
+    """Decode a single serialized transaction if it can be an rc001 inscription, otherwise None"""
+    data = bytes.fromhex(raw_tx) if isinstance(raw_tx, str) else raw_tx
+    buf = memoryview(data)
+    _, script_sig, _ = skip_transaction(buf, 0)
+    if not _is_rc001_candidate(data, script_sig):
+        return None
+    return decode_transaction(buf, 0, coin_ticker)
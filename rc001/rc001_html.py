@@ -0,0 +1,135 @@
+import html
+import re
+from typing import Optional, Dict, Any
+
+from bs4 import BeautifulSoup
+
+from raw_block import ORD_MARKER
+from script_parser import extract_inscription
+
+RC001_META = '<meta name="p" content="rc001">'
+
+# Opening tags the extractor cares about; quoted attribute values may contain '>'
+_TAG_RE = re.compile(r'''<(meta|title|script|style)\b((?:[^>"']|"[^"]*"|'[^']*')*)>''', re.IGNORECASE)
+_ATTR_RE = re.compile(r'''([^\s"'=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+_CLOSE_RE = {
+    'title': re.compile(r'</\s*title\s*>', re.IGNORECASE),
+    'script': re.compile(r'</\s*script\s*>', re.IGNORECASE),
+    'style': re.compile(r'</\s*style\s*>', re.IGNORECASE),
+}
+
+class Rc001Document:
+    """The fields of an rc001 deploy or mint document the indexer needs"""
+
+    __slots__ = ('op', 'sn', 'title', 'script_src', 'json_data', 'body', 'content_type')
+
+    def __init__(self, op: Optional[str] = None, sn: Optional[str] = None, title: Optional[str] = 'Untitled',
+                 script_src: Optional[str] = None, json_data: Optional[str] = None):
+        self.op = op
+        self.sn = sn
+        # 'Untitled' when there is no <title>, None when the <title> is empty
+        self.title = title
+        self.script_src = script_src
+        self.json_data = json_data
+        # The raw inscription, set by read_rc001_document
+        self.body: Optional[bytes] = None
+        self.content_type: Optional[str] = None
+
+def _parse_attrs(attr_text: str) -> dict:
+    """Parse tag attributes, lowercasing names and unescaping values like html.parser"""
+    attrs = {}
+    for match in _ATTR_RE.finditer(attr_text):
+        name = match.group(1).lower()
+        value = next((v for v in match.group(2, 3, 4) if v is not None), None)
+        attrs[name] = html.unescape(value) if value is not None else None
+    return attrs
+
+def extract_rc001_fields(html_text: str) -> Optional[Rc001Document]:
+    """Pull op, sn, title, script src and the json-data script out of an rc001 document.
+
+    Returns None for documents the scanner can't read reliably (comments, unterminated
+    title/script elements, markup inside <title>), which callers hand to BeautifulSoup.
+    """
+    if '<!--' in html_text:
+        return None
+    doc = Rc001Document()
+    seen_title = False
+    pos = 0
+    while True:
+        match = _TAG_RE.search(html_text, pos)
+        if not match:
+            return doc
+        tag = match.group(1).lower()
+        attrs = _parse_attrs(match.group(2))
+        pos = match.end()
+        if tag == 'meta':
+            name = attrs.get('name')
+            if name == 'op' and doc.op is None:
+                doc.op = attrs.get('content')
+            elif name == 'sn' and doc.sn is None:
+                doc.sn = attrs.get('content')
+            continue
+        if match.group(2).rstrip().endswith('/') and tag != 'script':
+            if tag == 'title' and not seen_title:
+                seen_title = True
+                doc.title = None
+            continue
+        close = _CLOSE_RE[tag].search(html_text, pos)
+        if not close:
+            return None
+        content = html_text[pos:close.start()]
+        pos = close.end()
+        if tag == 'title' and not seen_title:
+            if '<' in content:
+                return None
+            seen_title = True
+            doc.title = html.unescape(content) or None
+        elif tag == 'script':
+            if doc.script_src is None and attrs.get('src') is not None:
+                doc.script_src = attrs['src']
+            if (doc.json_data is None and attrs.get('type') == 'application/json'
+                    and attrs.get('id') == 'json-data'):
+                doc.json_data = content or None
+
+def _document_from_soup(soup: BeautifulSoup) -> Rc001Document:
+    """Build the document fields from a BeautifulSoup tree"""
+    op_meta = soup.find('meta', attrs={'name': 'op'})
+    sn_meta = soup.find('meta', attrs={'name': 'sn'})
+    title_tag = soup.find('title')
+    script_tag = soup.find('script', src=True)
+    json_script = soup.find('script', attrs={'type': 'application/json', 'id': 'json-data'})
+    return Rc001Document(
+        op=op_meta.get('content') if op_meta else None,
+        sn=sn_meta.get('content') if sn_meta else None,
+        title=title_tag.string if title_tag else 'Untitled',
+        script_src=script_tag['src'] if script_tag else None,
+        json_data=json_script.string if json_script else None,
+    )
+
+def parse_rc001_document(html_text: str) -> Rc001Document:
+    """Extract rc001 fields with the fast scanner, falling back to BeautifulSoup"""
+    doc = extract_rc001_fields(html_text)
+    if doc is None:
+        doc = _document_from_soup(BeautifulSoup(html_text, 'html.parser'))
+    return doc
+
+def read_rc001_document(tx: Dict[str, Any]) -> Optional[Rc001Document]:
+    """Parse the rc001 document a transaction inscribes in its first input, None if there is none.
+
+    Raises UnicodeDecodeError for text/html inscriptions that are not valid UTF-8.
+    """
+    if not tx.get('vin') or not tx['vin'][0].get('scriptSig', {}).get('hex'):
+        return None
+    script_sig = bytes.fromhex(tx['vin'][0]['scriptSig']['hex'])
+    if not script_sig.startswith(ORD_MARKER):
+        return None
+    body, content_type = extract_inscription(script_sig)
+    if not body or not content_type or b'text/html' not in content_type.lower():
+        return None
+    html_text = str(body, 'utf-8')
+    if RC001_META not in html_text:
+        return None
+    doc = parse_rc001_document(html_text)
+    doc.body = bytes(body)
+    doc.content_type = content_type.decode('ascii', 'replace')
+    return doc
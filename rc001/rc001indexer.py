@@ -1,9 +1,6 @@
 import json
-import base64
-import binascii
 import sqlite3
 from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
-from bs4 import BeautifulSoup
 import time
 import os
 import re
@@ -12,7 +9,20 @@ import logging
 from logging.handlers import RotatingFileHandler
 from contextlib import contextmanager
 import configparser
-from typing import Optional, Tuple, List, Dict, Any
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Any, Iterator, Iterable
+from raw_block import NETWORKS, decode_block, decode_rc001_candidate, skip_transaction
+from rc001_html import Rc001Document, read_rc001_document
+from collection_registry import CollectionRegistry, CollectionEntry, load_collection_rows
+from block_notify import BlockNotifier
+from blk_reader import BlockFileReader
+from partitioned_backfill import iter_partitioned_blocks
+from metrics import metrics
+from payload_store import create_tables as create_payload_tables, store_inscription, delete_inscriptions
+from script_parser import extract_inscription
 
 # Configure logging
 logging.basicConfig(
@@ -28,15 +38,182 @@ CONFIG_DIR = "./collections"
 LAST_BLOCK_FILE = "./last_block_scanned.json"
 RPC_CONFIG_FILE = "../config/rpc.conf"
 DATABASE_FILE = "./collections/all_collections.db"
+# Polling interval; coins with a block notification source are woken as soon as a block arrives
 SCAN_INTERVAL = 30
 RETRY_DELAY = 5
+MAX_RETRY_DELAY = 300
+# Blocks and their scan checkpoint are written in one transaction per window of this many blocks or seconds
+COMMIT_BLOCK_WINDOW = 100
+COMMIT_INTERVAL = 5
+# Undo journal entries are kept for this many blocks below the tip; deeper reorgs need a manual rescan
+MAX_REORG_DEPTH = 288
+DEFAULT_BLOCK_HEIGHTS = {
+    "DOGE": {"start_block_height": 5455286, "last_block_height": 5455285},
+    "PEP": {"start_block_height": 0, "last_block_height": 0},
+    "SHIC": {"start_block_height": 0, "last_block_height": 0},
+    "DEV": {"start_block_height": 0, "last_block_height": 0},
+    "BONC": {"start_block_height": 0, "last_block_height": 0},
+    "DGB": {"start_block_height": 5455286, "last_block_height": 5455285}
+}
+PREFETCH_DEPTH = 64
+PREFETCH_WORKERS = 4
+RPC_BATCH_SIZE = 16
+# JSON-RPC errors meaning the node cannot handle a batch at all: parse error, invalid request, and
+# python-bitcoinrpc's non-JSON HTTP response and missing result; anything else is retried as a batch
+BATCH_REJECTION_CODES = (-32700, -32600, -342, -343)
+# Fetch raw blocks and decode only inscription candidates locally (coins listed in raw_block.NETWORKS)
+RAW_BLOCK_MODE = True
+# Unconfirmed rc001 mints are tracked by diffing getrawmempool this often (seconds)
+MEMPOOL_WATCH = True
+MEMPOOL_INTERVAL = 2
+MEMPOOL_BATCH_SIZE = 100
+# Prometheus text metrics are written to METRICS_FILE every METRICS_INTERVAL seconds for the Flask app to
+# serve, and also served at http://METRICS_HOST:METRICS_PORT/metrics when a port is set
+METRICS_FILE = "./collections/indexer_metrics.prom"
+METRICS_INTERVAL = 15
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = None
+# Keep the body of every indexed deploy and mint in the content-addressed payload store served at
+# /content; the parent script a collection's mints load is fetched from the node (getrawtransaction,
+# which needs txindex=1 for confirmed transactions) after the deploy commits and stored with it, so
+# stored mints render without an external ord server
+STORE_PAYLOADS = True
+STORE_PARENT_PAYLOADS = True
+
+class InvalidMint(Exception):
+    """A mint that does not satisfy its collection's rules"""
+
+    def __init__(self, message: str, reason: str, level: int = logging.WARNING):
+        super().__init__(message)
+        self.reason = reason
+        self.level = level
+
+class BlockPrefetcher:
+    """Fetch upcoming blocks for one coin in the background while the current block is processed.
+
+    Heights are fetched in windows of up to ``batch_size`` blocks, each window resolved with
+    one JSON-RPC batch for the hashes and one for the blocks. At most ``depth`` blocks are
+    requested ahead of the consumer, spread over a small thread pool, and blocks are always
+    yielded in height order. In raw mode blocks are fetched serialized and only the rc001
+    candidate transactions are decoded.
+    """
+
+    def __init__(self, scanner: 'BlockchainScanner', coin_ticker: str, start_height: int, end_height: int,
+                 depth: int = PREFETCH_DEPTH, workers: int = PREFETCH_WORKERS, batch_size: int = RPC_BATCH_SIZE):
+        self.scanner = scanner
+        self.coin_ticker = coin_ticker
+        self.start_height = start_height
+        self.end_height = end_height
+        self.batch_size = max(1, min(batch_size, depth))
+        self.max_windows = max(1, depth // self.batch_size)
+        self.raw = RAW_BLOCK_MODE and coin_ticker in NETWORKS
+        self.verbosity = 0 if self.raw else 2
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers),
+                                            thread_name_prefix=f"prefetch-{coin_ticker}")
+
+    def _rpc(self) -> AuthServiceProxy:
+        """Per-thread RPC proxy, AuthServiceProxy is not safe to share between threads"""
+        rpc = getattr(self._local, 'rpc', None)
+        if rpc is None:
+            rpc = self.scanner.create_rpc_proxy(self.coin_ticker)
+            self._local.rpc = rpc
+        return rpc
+
+    def _fetch(self, block_height: int) -> Dict[str, Any]:
+        """Fetch a single block with full transaction data"""
+        try:
+            rpc = self._rpc()
+            with metrics.timer('rpc', coin=self.coin_ticker):
+                block_hash = rpc.getblockhash(block_height)
+                block = rpc.getblock(block_hash, self.verbosity)
+            return self._decode(block_height, block)
+        except Exception:
+            # Drop the proxy so a broken HTTP connection is not reused
+            self._local.rpc = None
+            raise
+
+    def _fetch_batch(self, heights: List[int]) -> List[Dict[str, Any]]:
+        """Fetch a window of blocks with two JSON-RPC batch requests"""
+        try:
+            rpc = self._rpc()
+            with metrics.timer('rpc', coin=self.coin_ticker):
+                block_hashes = self.scanner.rpc_batch(rpc, [['getblockhash', height] for height in heights])
+                blocks = self.scanner.rpc_batch(rpc, [['getblock', block_hash, self.verbosity] for block_hash in block_hashes])
+        except Exception:
+            self._local.rpc = None
+            raise
+        return [self._decode(height, block) for height, block in zip(heights, blocks)]
+
+    def _decode(self, block_height: int, block: Any) -> Dict[str, Any]:
+        """Turn a raw block into a block dict holding only candidate transactions"""
+        if self.raw:
+            with metrics.timer('decode', coin=self.coin_ticker):
+                return decode_block(block, self.coin_ticker, block_height)
+        return block
+
+    def _fetch_window(self, heights: List[int]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Fetch a window of blocks, falling back to single calls when the batch fails"""
+        batch_rejected = False
+        if len(heights) > 1 and self.scanner.supports_batch(self.coin_ticker):
+            try:
+                blocks = self._fetch_batch(heights)
+                return [(height, block, None) for height, block in zip(heights, blocks)]
+            except Exception as e:
+                logger.warning(f"Batch fetch of blocks {heights[0]}-{heights[-1]} failed for {self.coin_ticker}, "
+                               f"falling back to single calls: {e}")
+                batch_rejected = self.scanner.is_batch_rejection(e)
+        results = []
+        for height in heights:
+            try:
+                results.append((height, self._fetch(height), None))
+            except Exception as e:
+                results.append((height, None, e))
+        if batch_rejected and all(error is None for _, _, error in results):
+            # The batch itself was refused while every block is reachable one by one, so the node
+            # does not support batches; timeouts and per-call errors leave batching on for the next window
+            self.scanner.disable_batch(self.coin_ticker)
+        return results
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Yield (height, block, error) tuples in height order"""
+        pending = deque()
+        next_height = self.start_height
+        try:
+            while pending or next_height <= self.end_height:
+                while next_height <= self.end_height and len(pending) < self.max_windows:
+                    window_end = min(next_height + self.batch_size - 1, self.end_height)
+                    heights = list(range(next_height, window_end + 1))
+                    pending.append((heights, self._executor.submit(self._fetch_window, heights)))
+                    next_height = window_end + 1
+                heights, future = pending.popleft()
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [(height, None, e) for height in heights]
+                yield from results
+        finally:
+            for _, future in pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
 
 class BlockchainScanner:
     def __init__(self):
         self.rpc_configs = self._load_rpc_configs()
         self.rpc_connections = {}
+        self.batch_unsupported = set()
+        self.stop_event = threading.Event()
+        self.notifier = BlockNotifier(self.stop_event)
+        self.db_write_lock = threading.RLock()
+        # Collections that received a mint older than their newest one in the open write transaction
+        self.renumber_collection_ids = set()
+        # (coin, parent inscription ID) -> deploy block, for deploys in the open write transaction; fetched after it commits
+        self.parent_payload_queue = {}
         os.makedirs(CONFIG_DIR, exist_ok=True)
         self._initialize_database()
+        self.writer = self._open_writer()
+        self.collections = CollectionRegistry()
+        self._load_collection_registry()
 
     def _load_rpc_configs(self) -> Dict[str, Dict[str, str]]:
         """Load RPC configurations from RPC.conf"""
@@ -85,18 +262,116 @@ class BlockchainScanner:
                         UNIQUE(collection_id, sn),
                         FOREIGN KEY (collection_id) REFERENCES collections(collection_id)
                         )''')
+            # Items are listed per collection in mint order, see /rc001/collections?include=items
+            c.execute('CREATE INDEX IF NOT EXISTS idx_items_collection_sequence ON items (collection_id, sequence_number)')
+            c.execute('''CREATE TABLE IF NOT EXISTS scan_checkpoints (
+                        coin_ticker TEXT PRIMARY KEY,
+                        start_block_height INTEGER,
+                        last_block_height INTEGER,
+                        last_block_hash TEXT,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )''')
+            c.execute('''CREATE TABLE IF NOT EXISTS scanned_blocks (
+                        coin_ticker TEXT,
+                        block_height INTEGER,
+                        block_hash TEXT,
+                        PRIMARY KEY (coin_ticker, block_height)
+                        )''')
+            c.execute('''CREATE TABLE IF NOT EXISTS block_undo (
+                        undo_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        coin_ticker TEXT,
+                        block_height INTEGER,
+                        table_name TEXT,
+                        row_id INTEGER
+                        )''')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_block_undo_height ON block_undo (coin_ticker, block_height)')
+            c.execute('''CREATE TABLE IF NOT EXISTS pending_mints (
+                        txid TEXT PRIMARY KEY,
+                        coin_ticker TEXT,
+                        collection_id INTEGER,
+                        inscription_id TEXT,
+                        sn TEXT,
+                        inscription_address TEXT,
+                        first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(collection_id, sn),
+                        FOREIGN KEY (collection_id) REFERENCES collections(collection_id)
+                        )''')
+            c.execute('''CREATE TABLE IF NOT EXISTS collection_stats (
+                        collection_id INTEGER PRIMARY KEY,
+                        minted_count INTEGER NOT NULL DEFAULT 0,
+                        next_sequence_number INTEGER NOT NULL DEFAULT 1,
+                        last_mint_height INTEGER,
+                        FOREIGN KEY (collection_id) REFERENCES collections(collection_id)
+                        )''')
+            c.execute('''CREATE TABLE IF NOT EXISTS rescan_jobs (
+                        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        coin_ticker TEXT,
+                        from_height INTEGER,
+                        to_height INTEGER,
+                        next_height INTEGER,
+                        status TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )''')
+            # Bumped by every commit that changes indexed data; the API's response cache is keyed on it,
+            # so its own writes (SN reservations) and mempool tracking do not invalidate cached responses
+            c.execute('''CREATE TABLE IF NOT EXISTS index_version (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL
+                        )''')
+            c.execute('INSERT OR IGNORE INTO index_version (id, version) VALUES (1, 0)')
+            create_payload_tables(c)
+            # Backfill counters for collections indexed before collection_stats existed
+            c.execute('''INSERT INTO collection_stats (collection_id, minted_count, next_sequence_number, last_mint_height)
+                        SELECT c.collection_id, COUNT(i.inscription_id), COUNT(i.item_id) + 1, MAX(i.created_at)
+                        FROM collections c LEFT JOIN items i ON i.collection_id = c.collection_id
+                        WHERE c.collection_id NOT IN (SELECT collection_id FROM collection_stats)
+                        GROUP BY c.collection_id''')
             conn.commit()
 
-    @contextmanager
-    def get_rpc_connection(self, coin_ticker: str):
-        """Context manager for chain-specific RPC connection"""
+    def create_rpc_proxy(self, coin_ticker: str) -> AuthServiceProxy:
+        """Create a new RPC proxy for a coin"""
         if coin_ticker not in self.rpc_configs:
             logger.error(f"No RPC configuration found for coin {coin_ticker}")
             raise ValueError(f"No RPC configuration found for coin {coin_ticker}")
+        return AuthServiceProxy(self.rpc_url(coin_ticker), timeout=60)
+
+    def rpc_url(self, coin_ticker: str) -> str:
+        """RPC endpoint URL for a coin, with credentials"""
         rpc_config = self.rpc_configs[coin_ticker]
-        rpc_url = f"http://{rpc_config['rpcuser']}:{rpc_config['rpcpassword']}@{rpc_config['rpchost']}:{rpc_config['rpcport']}"
+        return f"http://{rpc_config['rpcuser']}:{rpc_config['rpcpassword']}@{rpc_config['rpchost']}:{rpc_config['rpcport']}"
+
+    def supports_batch(self, coin_ticker: str) -> bool:
+        """Whether JSON-RPC batch requests should be tried for a coin"""
+        return coin_ticker not in self.batch_unsupported
+
+    def disable_batch(self, coin_ticker: str) -> None:
+        """Stop sending JSON-RPC batch requests to a coin's node"""
+        if coin_ticker not in self.batch_unsupported:
+            logger.warning(f"RPC node for {coin_ticker} rejects batch requests, using single calls")
+            self.batch_unsupported.add(coin_ticker)
+
+    @staticmethod
+    def is_batch_rejection(error: Exception) -> bool:
+        """Whether a failed batch request means the node does not accept batches"""
+        if isinstance(error, JSONRPCException):
+            return getattr(error, 'code', None) in BATCH_REJECTION_CODES
+        # A node without batch support answers with a single JSON object, which batch_ cannot iterate
+        return isinstance(error, (TypeError, KeyError, AttributeError))
+
+    @staticmethod
+    def rpc_batch(rpc: AuthServiceProxy, calls: List[List[Any]]) -> List[Any]:
+        """Send calls as a single JSON-RPC batch request and return the results in call order"""
+        results = rpc.batch_([list(call) for call in calls])
+        if not isinstance(results, list) or len(results) != len(calls):
+            raise JSONRPCException({'code': -32600, 'message': 'invalid batch response'})
+        return results
+
+    @contextmanager
+    def get_rpc_connection(self, coin_ticker: str):
+        """Context manager for chain-specific RPC connection"""
+        rpc = self.create_rpc_proxy(coin_ticker)
         try:
-            rpc = AuthServiceProxy(rpc_url, timeout=60)
             yield rpc
         except Exception as e:
             logger.error(f"Error connecting to RPC server for {coin_ticker}: {e}")
@@ -104,6 +379,47 @@ class BlockchainScanner:
         finally:
             pass
 
+    def _open_writer(self) -> sqlite3.Connection:
+        """Open the persistent connection all indexer writes go through"""
+        conn = sqlite3.connect(DATABASE_FILE, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def write_transaction(self):
+        """Run a block of writes as one transaction on the writer connection"""
+        with self.db_write_lock:
+            c = self.writer.cursor()
+            c.execute('BEGIN IMMEDIATE')
+            try:
+                if self._collections_signature(self.writer) != self.collections_signature:
+                    # Another process, e.g. a rescan, committed deploys this registry has not seen
+                    logger.info("Collections changed outside the indexer, reloading the registry")
+                    self._load_collection_registry()
+                yield c
+                self.collections_signature = self._collections_signature(self.writer)
+                c.execute('COMMIT')
+            except BaseException:
+                c.execute('ROLLBACK')
+                self.renumber_collection_ids.clear()
+                self.parent_payload_queue.clear()
+                # Deploys from the rolled back transaction may already be in the registry
+                self._load_collection_registry()
+                raise
+
+    @contextmanager
+    def savepoint(self, c: sqlite3.Cursor, name: str = 'operation'):
+        """Undo a single operation's writes on failure without aborting the enclosing transaction"""
+        c.execute(f'SAVEPOINT {name}')
+        try:
+            yield c
+        except BaseException:
+            c.execute(f'ROLLBACK TO {name}')
+            c.execute(f'RELEASE {name}')
+            raise
+        c.execute(f'RELEASE {name}')
+
     @contextmanager
     def get_db_connection(self):
         """Context manager for database connection"""
@@ -118,213 +434,115 @@ class BlockchainScanner:
             if conn:
                 conn.close()
 
-    def load_last_block_heights(self) -> Dict[str, Dict[str, int]]:
-        """Load the last scanned block heights for all coins"""
+    def _read_block_heights_file(self) -> Optional[Dict[str, Dict[str, int]]]:
+        """Read the legacy last_block_scanned.json checkpoint file"""
         try:
             with open(LAST_BLOCK_FILE, 'r') as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            logger.warning("Last block file not found or invalid, using defaults")
-            return {
-                "DOGE": {"start_block_height": 5455286, "last_block_height": 5455285},
-                "PEP": {"start_block_height": 0, "last_block_height": 0},
-                "SHIC": {"start_block_height": 0, "last_block_height": 0},
-                "DEV": {"start_block_height": 0, "last_block_height": 0},
-                "BONC": {"start_block_height": 0, "last_block_height": 0},
-                "DGB": {"start_block_height": 5455286, "last_block_height": 5455285}
-            }
-
-    def update_last_block_heights(self, block_heights: Dict[str, Dict[str, int]]) -> None:
-        """Update the last scanned block heights for all coins"""
-        try:
-            with open(LAST_BLOCK_FILE, 'w') as f:
-                json.dump(block_heights, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error updating last block heights: {e}")
-            raise
-
-    @staticmethod
-    def hex_to_base64(hex_str: str) -> Optional[str]:
-        """Convert hex string to base64"""
-        try:
-            if len(hex_str) % 2 != 0:
-                return None
-            return base64.b64encode(binascii.unhexlify(hex_str)).decode('utf-8')
-        except binascii.Error as e:
-            logger.error(f"Error decoding hex to base64: {e}")
             return None
 
-    @staticmethod
-    def base64_to_text(base64_str: str) -> Optional[str]:
-        """Convert base64 string to text"""
-        try:
-            return base64.b64decode(base64_str).decode('utf-8')
-        except (binascii.Error, UnicodeDecodeError) as e:
-            logger.error(f"Error decoding base64 to text: {e}")
-            return None
+    def load_last_block_heights(self) -> Dict[str, Dict[str, int]]:
+        """Load the scan checkpoints for all coins.
 
-    @staticmethod
-    def hex_to_ascii(hex_string: str) -> Optional[str]:
-        """Convert hex string to ASCII"""
-        try:
-            if len(hex_string) % 2 != 0:
-                return None
-            return binascii.unhexlify(hex_string).decode('ascii')
-        except Exception as e:
-            logger.error(f"Error converting hex to ASCII: {e}")
-            return None
+        Coins listed in last_block_scanned.json that have no checkpoint in the database yet
+        are imported from it once; after that the database is authoritative.
+        """
+        with self.write_transaction() as c:
+            c.execute('SELECT coin_ticker, start_block_height, last_block_height FROM scan_checkpoints')
+            block_heights = {coin_ticker: {"start_block_height": start_height, "last_block_height": last_height}
+                             for coin_ticker, start_height, last_height in c.fetchall()}
+            legacy_heights = self._read_block_heights_file()
+            if legacy_heights is None and not block_heights:
+                logger.warning("Last block file not found or invalid, using defaults")
+                legacy_heights = DEFAULT_BLOCK_HEIGHTS
+            for coin_ticker, heights in (legacy_heights or {}).items():
+                if coin_ticker in block_heights:
+                    continue
+                c.execute('''INSERT INTO scan_checkpoints (coin_ticker, start_block_height, last_block_height)
+                            VALUES (?, ?, ?)''',
+                         (coin_ticker, heights["start_block_height"], heights["last_block_height"]))
+                block_heights[coin_ticker] = {"start_block_height": heights["start_block_height"],
+                                              "last_block_height": heights["last_block_height"]}
+                logger.info(f"Imported scan checkpoint for {coin_ticker} at height {heights['last_block_height']}")
+        return block_heights
 
     @staticmethod
     def sanitize_filename(name: str) -> str:
         """Sanitize filename to prevent injection"""
         return re.sub(r'[^\w\-]', '', name)
 
-    def _get_collection_id(self, coin_ticker: str, sanitized_name: str) -> Optional[int]:
-        """Get collection ID from coin ticker and sanitized name"""
-        with self.get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute('SELECT collection_id FROM collections WHERE coin_ticker = ? AND sanitized_name = ?', 
-                     (coin_ticker, sanitized_name))
-            result = c.fetchone()
-            return result[0] if result else None
-
-    def _get_collection_config(self, collection_id: int) -> Dict[str, Any]:
-        """Get collection configuration from database"""
-        config = {}
+    @staticmethod
+    def _collections_signature(conn: sqlite3.Connection) -> Tuple[int, Optional[int]]:
+        """Changes whenever a collection is added or removed"""
+        return tuple(conn.execute('SELECT COUNT(*), MAX(collection_id) FROM collections').fetchone())
+
+    def _load_collection_registry(self) -> None:
+        """Load every deployed collection into the in-memory registry"""
         with self.get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute('SELECT * FROM collections WHERE collection_id = ?', (collection_id,))
-            collection_data = c.fetchone()
-            if not collection_data:
-                return {}
-            c.execute('SELECT range_index, range_value FROM serial_ranges WHERE collection_id = ? ORDER BY range_index', 
-                     (collection_id,))
-            ranges = c.fetchall()
-            config['coin_ticker'] = collection_data[1]
-            config['mint_address'] = collection_data[4]
-            config['mint_price'] = collection_data[5]
-            config['parent_inscription_id'] = collection_data[6]
-            for range_index, range_value in ranges:
-                if range_index == 0 and '-' in range_value and len(range_value.split('-')[0]) > 2:
-                    config['sn_range'] = range_value
-                config[f'sn_index_{range_index}'] = range_value
-        return config
+            # Taken before loading, so a deploy committed in between only causes another reload
+            self.collections_signature = self._collections_signature(conn)
+            self.collections.load(conn)
+        logger.info(f"Loaded {len(self.collections)} collections into the registry")
 
     def is_valid_sn(self, sn: str, coin_ticker: str, collection_name: str) -> bool:
         """Validate serial number against collection configuration"""
         try:
-            collection_id = self._get_collection_id(coin_ticker, collection_name)
-            if not collection_id:
+            entry = self.collections.get(coin_ticker, collection_name)
+            if not entry:
                 logger.error(f"Collection {collection_name} not found on coin {coin_ticker}")
                 return False
-            config = self._get_collection_config(collection_id)
-            if not config:
-                logger.error(f"Configuration for collection {collection_name} on coin {coin_ticker} not found")
-                return False
-            if 'sn_range' in config:
-                valid_range = config['sn_range'].split('-')
-                if len(valid_range[0]) > 2 and len(valid_range[1]) > 2:
-                    padded_sn = sn.zfill(len(valid_range[1]))
-                    if valid_range[0] <= padded_sn <= valid_range[1]:
-                        return True
-                    return False
-            sn_index_keys = [key for key in config if key.startswith('sn_index_')]
-            if len(sn_index_keys) == 1:
-                valid_range = config[sn_index_keys[0]].split('-')
-                padded_sn = sn.zfill(len(valid_range[1]))
-                if valid_range[0] <= padded_sn <= valid_range[1]:
-                    return True
-                return False
-            segments = [sn[i:i+2] for i in range(0, len(sn), 2)]
-            for i, segment in enumerate(segments):
-                range_key = f'sn_index_{i}'
-                if range_key in config:
-                    valid_range = config[range_key].split('-')
-                    padded_segment = segment.zfill(len(valid_range[1]))
-                    if not (valid_range[0] <= padded_segment <= valid_range[1]):
-                        return False
-                else:
-                    return False
-            return True
+            return entry.validator.is_valid(sn)
         except Exception as e:
             logger.error(f"Error validating serial number: {e}")
             return False
 
-    def extract_inscription_data(self, asm_data: List[str]) -> Tuple[Optional[str], Optional[str]]:
-        """Extract inscription data from ASM"""
-        try:
-            data_string = ""
-            mime_type = None
-            index = 1
-            if index >= len(asm_data) or not asm_data[index].lstrip('-').isdigit():
-                return None, None
-            index += 1
-            if index >= len(asm_data):
-                return None, None
-            mime_type_hex = asm_data[index]
-            mime_type = self.hex_to_ascii(mime_type_hex)
-            index += 1
-            while index < len(asm_data):
-                part = asm_data[index]
-                if part.lstrip('-').isdigit():
-                    index += 1
-                    if index >= len(asm_data):
-                        return None, None
-                    data_string += asm_data[index]
-                    index += 1
-                else:
-                    break
-            return data_string, mime_type
-        except Exception as e:
-            logger.error(f"Error extracting inscription data: {e}")
-            return None, None
-
-    def process_transaction(self, coin_ticker: str, tx: Dict[str, Any], rpc_connection: AuthServiceProxy, block: Dict[str, Any]) -> None:
-        """Process a single transaction"""
+    def process_transaction(self, coin_ticker: str, tx: Dict[str, Any], rpc_connection: AuthServiceProxy, block: Dict[str, Any],
+                            doc: Optional[Rc001Document] = None) -> None:
+        """Process a single transaction, ``doc`` is its rc001 document when already parsed"""
         try:
-            if not tx.get('vin') or not tx['vin'][0].get('scriptSig', {}).get('asm'):
-                return
-            asm_data = tx['vin'][0]['scriptSig']['asm'].split()
-            if not asm_data or asm_data[0] != '6582895':
-                return
-            data_string, mime_type = self.extract_inscription_data(asm_data)
-            if not data_string or not mime_type or 'text/html' not in mime_type.lower():
-                return
-            html_data_base64 = self.hex_to_base64(data_string)
-            if not html_data_base64:
-                return
-            html_data_text = self.base64_to_text(html_data_base64)
-            if not html_data_text or '<meta name="p" content="rc001">' not in html_data_text:
-                return
-            soup = BeautifulSoup(html_data_text, 'html.parser')
-            op_meta = soup.find('meta', attrs={'name': 'op'})
-            if not op_meta:
-                return
-            operation = op_meta.get('content')
-            if operation == 'deploy':
-                self.handle_deploy_operation(coin_ticker, soup, tx['txid'], tx)
-            elif operation == 'mint':
-                self.handle_mint_operation(coin_ticker, soup, tx['txid'], tx, block)
+            if doc is None:
+                try:
+                    with metrics.timer('parse', coin=coin_ticker):
+                        doc = read_rc001_document(tx)
+                except UnicodeDecodeError as e:
+                    logger.error(f"Error decoding inscription body of {tx['txid']} on coin {coin_ticker}: {e}")
+                    return
+                if doc is None:
+                    return
+            metrics.inc('rc001_candidates_total', coin=coin_ticker)
+            if doc.op == 'deploy':
+                self.handle_deploy_operation(coin_ticker, doc, tx['txid'], tx, block)
+            elif doc.op == 'mint':
+                self.handle_mint_operation(coin_ticker, doc, tx['txid'], tx, block)
         except Exception as e:
             logger.error(f"Error processing transaction {tx['txid']} on coin {coin_ticker}: {e}")
 
-    def handle_deploy_operation(self, coin_ticker: str, soup: BeautifulSoup, txid: str, tx: Dict[str, Any]) -> None:
+    def handle_deploy_operation(self, coin_ticker: str, doc: Rc001Document, txid: str, tx: Dict[str, Any], block: Dict[str, Any]) -> None:
         """Handle deploy operation"""
         try:
-            title = soup.find('title').string if soup.find('title') else 'Untitled'
+            title = doc.title
             sanitized_title = self.sanitize_filename(title)
-            with self.get_db_connection() as conn:
-                c = conn.cursor()
-                c.execute('SELECT collection_id FROM collections WHERE coin_ticker = ? AND sanitized_name = ?', 
-                         (coin_ticker, sanitized_title))
-                if c.fetchone():
-                    logger.warning(f"Collection {sanitized_title} already exists on coin {coin_ticker} with txid {txid}")
+            existing = self.collections.get(coin_ticker, sanitized_title)
+            if existing:
+                row = self.writer.execute('SELECT deploy_txid, parent_inscription_id FROM collections WHERE collection_id = ?',
+                                          (existing.collection_id,)).fetchone()
+                if row and row[0] == txid:
+                    # Indexed before, e.g. when a rescan covers blocks that were already scanned
+                    logger.debug(f"Collection {sanitized_title} on coin {coin_ticker} is already indexed from {txid}")
+                    with self.savepoint(self.writer.cursor()) as c:
+                        self.store_inscription_payload(c, coin_ticker, f"{txid}i0", doc, block)
+                        if STORE_PARENT_PAYLOADS and row[1] and row[1] != 'Unknown':
+                            self.queue_parent_payload(c, coin_ticker, row[1], block)
                     return
-            json_script = soup.find('script', attrs={'type': 'application/json', 'id': 'json-data'})
-            if not json_script or not json_script.string:
+                logger.warning(f"Collection {sanitized_title} already exists on coin {coin_ticker} with txid {txid}")
+                metrics.inc('rc001_rejections_total', coin=coin_ticker, op='deploy', reason='duplicate_collection')
+                return
+            if not doc.json_data:
                 logger.error(f"No valid JSON data found in deploy operation with txid {txid}")
+                metrics.inc('rc001_rejections_total', coin=coin_ticker, op='deploy', reason='no_json_data')
                 return
-            json_data = json.loads(json_script.string.strip().replace('\xa0', ' '))
+            json_data = json.loads(doc.json_data.strip().replace('\xa0', ' '))
             sn_ranges = json_data.get('sn', [])
             mint_address = json_data.get('mint_address', 'Unknown')
             mint_price = json_data.get('mint_price', 'Unknown')
@@ -334,8 +552,7 @@ class BlockchainScanner:
             inscription_address = None
             if tx['vout'] and tx['vout'][0].get('scriptPubKey', {}).get('addresses'):
                 inscription_address = tx['vout'][0]['scriptPubKey']['addresses'][0]
-            with self.get_db_connection() as conn:
-                c = conn.cursor()
+            with self.savepoint(self.writer.cursor()) as c:
                 c.execute('''INSERT INTO collections (
                             coin_ticker, name, sanitized_name, mint_address, mint_price, parent_inscription_id,
                             emblem_inscription_id, website, deploy_txid, deploy_address
@@ -343,115 +560,577 @@ class BlockchainScanner:
                          (coin_ticker, title, sanitized_title, mint_address, mint_price, parent_inscription_id,
                           emblem_inscription_id, website, txid, inscription_address))
                 collection_id = c.lastrowid
+                self.record_undo(c, coin_ticker, block, 'collections', collection_id)
                 for i, sn in enumerate(sn_ranges):
                     c.execute('INSERT INTO serial_ranges (collection_id, range_index, range_value) VALUES (?, ?, ?)',
                              (collection_id, i, sn["range"]))
-                conn.commit()
+                c.execute('INSERT INTO collection_stats (collection_id) VALUES (?)', (collection_id,))
+                self.store_inscription_payload(c, coin_ticker, f"{txid}i0", doc, block)
+                if STORE_PARENT_PAYLOADS and parent_inscription_id != 'Unknown':
+                    self.queue_parent_payload(c, coin_ticker, parent_inscription_id, block)
+            # Re-read the stored row so the registry sees exactly what the database holds
+            for entry in load_collection_rows(self.writer, collection_id):
+                self.collections.add(entry)
+            metrics.inc('rc001_deploys_total', coin=coin_ticker)
             logger.info(f"Deployed collection {sanitized_title} on coin {coin_ticker} with txid {txid}")
         except Exception as e:
             logger.error(f"Error handling deploy operation on coin {coin_ticker} with txid {txid}: {e}")
+            metrics.inc('rc001_rejections_total', coin=coin_ticker, op='deploy', reason='error')
+
+    def validate_mint(self, coin_ticker: str, doc: Rc001Document, tx: Dict[str, Any]) -> Tuple[CollectionEntry, str]:
+        """Check a mint against its collection; returns (collection entry, serial number) or raises InvalidMint"""
+        title = doc.title
+        sanitized_title = self.sanitize_filename(title)
+        entry = self.collections.get(coin_ticker, sanitized_title)
+        if not entry:
+            raise InvalidMint(f"Collection {sanitized_title} not found on coin {coin_ticker}", 'collection_not_found',
+                              logging.ERROR)
+        sn = doc.sn if doc.sn is not None else 'Unknown'
+        if not entry.validator.is_valid(sn):
+            raise InvalidMint(f"Invalid serial number {sn} for collection {sanitized_title} on coin {coin_ticker}",
+                              'invalid_sn')
+        parent_inscription_id = entry.parent_inscription_id
+        if not doc.script_src or doc.script_src.split('/')[-1] != parent_inscription_id:
+            raise InvalidMint(f"Parent inscription ID mismatch or no script tag found for {sanitized_title} on {coin_ticker}",
+                              'parent_mismatch')
+        mint_price_btc = entry.mint_price_btc
+        if mint_price_btc is None:
+            raise InvalidMint(f"Invalid mint price {entry.mint_price!r} for collection {sanitized_title} on {coin_ticker}",
+                              'invalid_price', logging.ERROR)
+        mint_address = entry.mint_address
+        if mint_price_btc > 0:
+            valid_payment = any(
+                Decimal(vout['value']) == mint_price_btc and mint_address in vout['scriptPubKey']['addresses']
+                for vout in tx['vout']
+                if 'value' in vout and 'scriptPubKey' in vout and 'addresses' in vout['scriptPubKey']
+            )
+            if not valid_payment:
+                raise InvalidMint(f"Invalid payment for mint: {mint_price_btc} to {mint_address} on {coin_ticker}",
+                                  'invalid_payment')
+        return entry, sn
 
-    def handle_mint_operation(self, coin_ticker: str, soup: BeautifulSoup, txid: str, tx: Dict[str, Any], block: Dict[str, Any]) -> None:
+    def handle_mint_operation(self, coin_ticker: str, doc: Rc001Document, txid: str, tx: Dict[str, Any], block: Dict[str, Any]) -> None:
         """Handle mint operation"""
         try:
-            title = soup.find('title').string if soup.find('title') else 'Untitled'
-            sanitized_title = self.sanitize_filename(title)
-            collection_id = self._get_collection_id(coin_ticker, sanitized_title)
-            if not collection_id:
-                logger.error(f"Collection {sanitized_title} not found on coin {coin_ticker}")
-                return
-            config = self._get_collection_config(collection_id)
-            if not config:
-                logger.error(f"Configuration for collection {sanitized_title} on coin {coin_ticker} not found")
+            try:
+                entry, sn = self.validate_mint(coin_ticker, doc, tx)
+            except InvalidMint as e:
+                logger.log(e.level, str(e))
+                metrics.inc('rc001_rejections_total', coin=coin_ticker, op='mint', reason=e.reason)
                 return
-            sn_meta = soup.find('meta', attrs={'name': 'sn'})
-            sn = sn_meta['content'] if sn_meta else 'Unknown'
-            if not self.is_valid_sn(sn, coin_ticker, sanitized_title):
-                logger.warning(f"Invalid serial number {sn} for collection {sanitized_title} on coin {coin_ticker}")
-                return
-            parent_inscription_id = config.get('parent_inscription_id', 'Unknown')
-            script_tag = soup.find('script', src=True)
-            if not script_tag or script_tag['src'].split('/')[-1] != parent_inscription_id:
-                logger.warning(f"Parent inscription ID mismatch or no script tag found for {sanitized_title} on {coin_ticker}")
-                return
-            mint_price_sats = float(config.get('mint_price', '0'))
-            mint_price_btc = Decimal(mint_price_sats) / Decimal(100000000)
-            mint_address = config.get('mint_address', 'Unknown')
-            if mint_price_btc > 0:
-                valid_payment = any(
-                    Decimal(vout['value']) == mint_price_btc and mint_address in vout['scriptPubKey']['addresses']
-                    for vout in tx['vout']
-                    if 'value' in vout and 'scriptPubKey' in vout and 'addresses' in vout['scriptPubKey']
-                )
-                if not valid_payment:
-                    logger.warning(f"Invalid payment for mint: {mint_price_btc} to {mint_address} on {coin_ticker}")
-                    return
+            collection_id = entry.collection_id
+            sanitized_title = entry.sanitized_name
 
             # Retrieve the block height from the block data
             block_height = block.get('height', None)
             if block_height is None:
                 logger.error(f"Block height not found for transaction {txid} on coin {coin_ticker}")
+                metrics.inc('rc001_rejections_total', coin=coin_ticker, op='mint', reason='no_block_height')
                 return
 
-            with self.get_db_connection() as conn:
-                c = conn.cursor()
-                c.execute('SELECT item_id FROM items WHERE collection_id = ? AND sn = ?', (collection_id, sn))
-                if c.fetchone():
+            with self.savepoint(self.writer.cursor()) as c:
+                inscription_id = f"{txid}i0"
+                c.execute('SELECT inscription_id FROM items WHERE collection_id = ? AND sn = ?', (collection_id, sn))
+                row = c.fetchone()
+                if row and row[0] == inscription_id:
+                    logger.debug(f"Mint {inscription_id} of {sanitized_title} on {coin_ticker} is already indexed")
+                    self.store_inscription_payload(c, coin_ticker, inscription_id, doc, block)
+                    return
+                if row:
                     logger.warning(f"Serial number {sn} already exists in collection {sanitized_title} on {coin_ticker}")
+                    metrics.inc('rc001_rejections_total', coin=coin_ticker, op='mint', reason='duplicate_sn')
                     return
-                inscription_id = f"{txid}i0"
                 inscription_address = None
                 if tx['vout'] and tx['vout'][0].get('scriptPubKey', {}).get('addresses'):
                     inscription_address = tx['vout'][0]['scriptPubKey']['addresses'][0]
 
-                # Calculate the next sequence number
-                c.execute('SELECT COUNT(*) FROM items WHERE collection_id = ?', (collection_id,))
-                sequence_number = c.fetchone()[0] + 1
+                c.execute('SELECT next_sequence_number, last_mint_height FROM collection_stats WHERE collection_id = ?',
+                         (collection_id,))
+                sequence_number, last_mint_height = c.fetchone()
+                # A rescan can repair a mint older than the collection's newest; it is numbered at the end
+                # for now and the collection is renumbered before the window commits
+                out_of_order = last_mint_height is not None and block_height < last_mint_height
 
                 c.execute('''INSERT INTO items (
                             collection_id, inscription_id, sn, inscription_status, inscription_address, created_at, sequence_number
                             ) VALUES (?, ?, ?, ?, ?, ?, ?)''',
                          (collection_id, inscription_id, sn, 'minted', inscription_address, block_height, sequence_number))
-                conn.commit()
+                self.record_undo(c, coin_ticker, block, 'items', c.lastrowid)
+                self.store_inscription_payload(c, coin_ticker, inscription_id, doc, block)
+                c.execute('''UPDATE collection_stats SET minted_count = minted_count + 1,
+                            next_sequence_number = ?, last_mint_height = MAX(COALESCE(last_mint_height, ?), ?)
+                            WHERE collection_id = ?''',
+                         (sequence_number + 1, block_height, block_height, collection_id))
+                # The mint is confirmed, and pending mints of the same SN can no longer succeed
+                c.execute('DELETE FROM pending_mints WHERE txid = ? OR (collection_id = ? AND sn = ?)',
+                         (txid, collection_id, sn))
+            if out_of_order:
+                self.renumber_collection_ids.add(collection_id)
+            metrics.inc('rc001_mints_total', coin=coin_ticker)
             logger.info(f"Minted item with SN {sn} for collection {sanitized_title} on coin {coin_ticker} with txid {txid}")
         except Exception as e:
             logger.error(f"Error handling mint operation on coin {coin_ticker}: {e}")
+            metrics.inc('rc001_rejections_total', coin=coin_ticker, op='mint', reason='error')
 
-    def run(self) -> None:
-        """Main scanning loop for multiple blockchains"""
+    def store_inscription_payload(self, c: sqlite3.Cursor, coin_ticker: str, inscription_id: str,
+                                  doc: Rc001Document, block: Dict[str, Any]) -> None:
+        """Keep an indexed inscription's body in the payload store"""
+        if not STORE_PAYLOADS or doc.body is None:
+            return
+        row_id = store_inscription(c, coin_ticker, inscription_id, doc.content_type, doc.body)
+        if row_id is not None:
+            self.record_undo(c, coin_ticker, block, 'inscription_payloads', row_id)
+
+    def queue_parent_payload(self, c: sqlite3.Cursor, coin_ticker: str, parent_inscription_id: str,
+                             block: Dict[str, Any]) -> None:
+        """Remember a collection's parent inscription for store_parent_payloads, unless it is stored already"""
+        if not isinstance(parent_inscription_id, str) or parent_inscription_id.partition('i')[2] != '0':
+            return
+        if c.execute('SELECT 1 FROM inscription_payloads WHERE inscription_id = ?', (parent_inscription_id,)).fetchone():
+            return
+        self.parent_payload_queue.setdefault((coin_ticker, parent_inscription_id), block)
+
+    def fetch_parent_inscription(self, coin_ticker: str, parent_inscription_id: str) -> Optional[Tuple[bytes, bytes]]:
+        """(body, content type) of a parent inscription contained in one transaction, fetched from the node"""
+        txid = parent_inscription_id.partition('i')[0]
+        try:
+            buf = bytes.fromhex(self.create_rpc_proxy(coin_ticker).getrawtransaction(txid, 0))
+            _, script_sig, _ = skip_transaction(buf, 0)
+        except Exception as e:
+            logger.warning(f"Could not fetch parent inscription {parent_inscription_id} on {coin_ticker} "
+                           f"(the node needs txindex=1 to look up confirmed transactions): {e}")
+            return None
+        body, content_type = None, None
+        if script_sig:
+            body, content_type = extract_inscription(buf[script_sig[0]:script_sig[1]], complete=True)
+        if body is None:
+            logger.info(f"Parent inscription {parent_inscription_id} on {coin_ticker} is not complete in one transaction, not stored")
+            return None
+        return bytes(body), content_type
+
+    def store_parent_payloads(self) -> None:
+        """Fetch the parent inscriptions queued by committed deploys and store them.
+
+        The node is queried before the write transaction opens, so a slow or failing
+        getrawtransaction never holds the database write lock.
+        """
+        queued, self.parent_payload_queue = self.parent_payload_queue, {}
+        fetched = []
+        for (coin_ticker, parent_inscription_id), block in queued.items():
+            inscription = self.fetch_parent_inscription(coin_ticker, parent_inscription_id)
+            if inscription is not None:
+                fetched.append((coin_ticker, parent_inscription_id, block, inscription))
+        if not fetched:
+            return
+        with self.write_transaction() as c:
+            for coin_ticker, parent_inscription_id, block, (body, content_type) in fetched:
+                # The deploy may have been rolled back in the meantime
+                if not c.execute('SELECT 1 FROM collections WHERE coin_ticker = ? AND parent_inscription_id = ?',
+                                 (coin_ticker, parent_inscription_id)).fetchone():
+                    continue
+                row_id = store_inscription(c, coin_ticker, parent_inscription_id, content_type.decode('ascii', 'replace'), body)
+                if row_id is not None:
+                    self.record_undo(c, coin_ticker, block, 'inscription_payloads', row_id)
+
+    def scan_coin(self, coin_ticker: str, block_heights: Dict[str, Dict[str, int]]) -> None:
+        """Scan one coin from its last scanned block up to the current tip"""
+        heights = block_heights[coin_ticker]
+        with self.get_rpc_connection(coin_ticker) as rpc:
+            current_block_height = rpc.getblockcount()
+            metrics.set('rc001_tip_height', current_block_height, coin=coin_ticker)
+            metrics.set('rc001_lag_blocks', max(0, current_block_height - heights["last_block_height"]), coin=coin_ticker)
+            start_height = heights["start_block_height"]
+            last_height = heights["last_block_height"]
+            scan_start_height = max(start_height, last_height + 1)
+            tip_hash = self.get_scanned_block_hash(coin_ticker, scan_start_height - 1)
+            if tip_hash is not None and scan_start_height - 1 <= current_block_height \
+                    and rpc.getblockhash(scan_start_height - 1) != tip_hash:
+                logger.warning(f"Block {scan_start_height - 1} on {coin_ticker} is no longer {tip_hash}, chain reorganized")
+                self.handle_reorg(coin_ticker, rpc, block_heights)
+                return
+            if scan_start_height > current_block_height:
+                logger.info(f"No new blocks to process for {coin_ticker} at height {current_block_height}")
+                return
+            logger.info(f"Processing blocks for {coin_ticker} from {scan_start_height} to {current_block_height}")
+            prefetcher = BlockPrefetcher(self, coin_ticker, scan_start_height, current_block_height)
+            if not self.apply_blocks(coin_ticker, prefetcher, block_heights, rpc, tip_hash):
+                self.handle_reorg(coin_ticker, rpc, block_heights)
+
+    def apply_blocks(self, coin_ticker: str, blocks: Iterable[Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]],
+                     block_heights: Dict[str, Dict[str, int]], rpc: Optional[AuthServiceProxy],
+                     tip_hash: Optional[str], rescan_job_id: Optional[int] = None) -> bool:
+        """Commit (height, block, error) tuples in windows; False when a block does not extend the one before it.
+
+        A block that could not be fetched raises after the blocks before it are committed.
+        """
+        window = []
+        window_started = time.monotonic()
+        for block_height, block, fetch_error in blocks:
+            if self.stop_event.is_set():
+                break
+            if fetch_error is not None:
+                # Keep the blocks before it, but never move the checkpoint past a block that was not applied;
+                # the caller backs off and the next pass starts again at this height
+                if window:
+                    self.commit_blocks(coin_ticker, window, block_heights, rpc, rescan_job_id)
+                raise RuntimeError(f"Could not fetch block {block_height} for {coin_ticker}: {fetch_error}")
+            if tip_hash is not None and block.get('previousblockhash') != tip_hash:
+                logger.warning(f"Block {block_height} on {coin_ticker} does not extend {tip_hash}, chain reorganized")
+                if window:
+                    self.commit_blocks(coin_ticker, window, block_heights, rpc, rescan_job_id)
+                return False
+            tip_hash = block.get('hash')
+            window.append((block_height, block))
+            if len(window) >= COMMIT_BLOCK_WINDOW or time.monotonic() - window_started >= COMMIT_INTERVAL:
+                self.commit_blocks(coin_ticker, window, block_heights, rpc, rescan_job_id)
+                metrics.set('rc001_blocks_per_second', len(window) / max(time.monotonic() - window_started, 1e-6),
+                            coin=coin_ticker)
+                window = []
+                window_started = time.monotonic()
+        if window:
+            self.commit_blocks(coin_ticker, window, block_heights, rpc, rescan_job_id)
+        return True
+
+    def backfill(self, coin_ticker: str, blocks_dir: Optional[str] = None, end_height: Optional[int] = None,
+                 processes: int = 1) -> None:
+        """Index a coin from its checkpoint in one pass, e.g. for a first sync or a rebuild.
+
+        Blocks are read from the node's blk*.dat files when ``blocks_dir`` is given, otherwise
+        over RPC up to the current tip. With ``processes`` above 1 the range is decoded by a
+        process pool and merged back in height order, giving the same result as one process.
+        """
         block_heights = self.load_last_block_heights()
-        while True:
-            for coin_ticker, heights in block_heights.items():
-                try:
-                    if coin_ticker not in self.rpc_configs:
-                        logger.warning(f"Skipping coin {coin_ticker}: No RPC configuration found")
+        if coin_ticker not in block_heights:
+            raise ValueError(f"No scan checkpoint for coin {coin_ticker}")
+        heights = block_heights[coin_ticker]
+        scan_start_height = max(heights["start_block_height"], heights["last_block_height"] + 1)
+        tip_hash = self.get_scanned_block_hash(coin_ticker, scan_start_height - 1)
+        if not blocks_dir and end_height is None:
+            with self.get_rpc_connection(coin_ticker) as rpc:
+                end_height = rpc.getblockcount()
+        logger.info(f"Backfilling {coin_ticker} from height {scan_start_height} with {processes} process(es)")
+        started = time.monotonic()
+        if processes > 1:
+            blocks = iter_partitioned_blocks(coin_ticker, scan_start_height, end_height, processes, blocks_dir,
+                                             None if blocks_dir else self.rpc_url(coin_ticker))
+            applied = self.apply_blocks(coin_ticker, blocks, block_heights, None, tip_hash)
+        elif blocks_dir:
+            with BlockFileReader(blocks_dir, coin_ticker) as reader:
+                blocks = ((block_height, decode_block(raw_block, coin_ticker, block_height), None)
+                          for block_height, raw_block in reader.iter_blocks(scan_start_height, end_height))
+                applied = self.apply_blocks(coin_ticker, blocks, block_heights, None, tip_hash)
+        else:
+            blocks = BlockPrefetcher(self, coin_ticker, scan_start_height, end_height)
+            applied = self.apply_blocks(coin_ticker, blocks, block_heights, None, tip_hash)
+        if not applied:
+            raise RuntimeError(f"Blocks for {coin_ticker} do not extend the indexed chain at height "
+                               f"{block_heights[coin_ticker]['last_block_height']}")
+        logger.info(f"Backfilled {coin_ticker} to height {block_heights[coin_ticker]['last_block_height']} "
+                    f"in {time.monotonic() - started:.1f}s")
+
+    def commit_blocks(self, coin_ticker: str, window: List[Tuple[int, Dict[str, Any]]],
+                      block_heights: Dict[str, Dict[str, int]], rpc: AuthServiceProxy,
+                      rescan_job_id: Optional[int] = None) -> None:
+        """Apply a window of blocks and advance the coin's checkpoint in one database transaction.
+
+        With ``rescan_job_id`` the window re-applies blocks below the checkpoint: the job's
+        progress is advanced instead and the checkpoint is left alone.
+        """
+        last_height, last_block = window[-1]
+        with metrics.timer('commit', coin=coin_ticker), self.write_transaction() as c:
+            changes = self.writer.total_changes
+            for block_height, block in window:
+                # Blocks from a partitioned backfill carry the documents their workers already parsed
+                documents = block.get('documents')
+                for tx_index, tx in enumerate(block['tx']):
+                    self.process_transaction(coin_ticker, tx, rpc, block, documents[tx_index] if documents else None)
+            # Deploys, mints and the pending mints they confirm; most windows at the tip have none
+            indexed = self.writer.total_changes != changes
+            c.executemany('INSERT OR REPLACE INTO scanned_blocks (coin_ticker, block_height, block_hash) VALUES (?, ?, ?)',
+                          [(coin_ticker, block_height, block.get('hash')) for block_height, block in window])
+            if rescan_job_id is None:
+                c.execute('''UPDATE scan_checkpoints SET last_block_height = ?, last_block_hash = ?,
+                            updated_at = CURRENT_TIMESTAMP WHERE coin_ticker = ?''',
+                         (last_height, last_block.get('hash'), coin_ticker))
+            else:
+                c.execute('UPDATE rescan_jobs SET next_height = ?, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?',
+                         (last_height + 1, rescan_job_id))
+            # Blocks this deep are treated as final, their undo entries are no longer needed
+            c.execute('DELETE FROM block_undo WHERE coin_ticker = ? AND block_height <= ?',
+                     (coin_ticker, last_height - MAX_REORG_DEPTH))
+            if self.renumber_collection_ids:
+                positions = {f"{tx['txid']}i0": tx_index for _, block in window for tx_index, tx in enumerate(block['tx'])}
+                while self.renumber_collection_ids:
+                    self.renumber_collection(c, self.renumber_collection_ids.pop(), positions)
+            if indexed:
+                # Clears the API's response cache, so only windows that changed indexed data bump it
+                c.execute('UPDATE index_version SET version = version + 1 WHERE id = 1')
+        if self.parent_payload_queue:
+            self.store_parent_payloads()
+        metrics.inc('rc001_blocks_total', len(window), coin=coin_ticker)
+        metrics.inc('rc001_transactions_total', sum(block.get('nTx', len(block['tx'])) for _, block in window),
+                    coin=coin_ticker)
+        if rescan_job_id is not None:
+            return
+        block_heights[coin_ticker]["last_block_height"] = last_height
+        metrics.set('rc001_indexed_height', last_height, coin=coin_ticker)
+        tip_height = metrics.get('rc001_tip_height', coin=coin_ticker)
+        metrics.set('rc001_lag_blocks', max(0, tip_height - last_height), coin=coin_ticker)
+
+    def renumber_collection(self, c: sqlite3.Cursor, collection_id: int, positions: Dict[str, int]) -> None:
+        """Number a collection's items in mint order again, after a mint was inserted behind newer ones.
+
+        Items keep their current order, except in the blocks of this window (``positions`` maps
+        their inscription IDs to the transaction's place in its block), which are ordered by
+        their position in the block.
+        """
+        rows = c.execute('''SELECT item_id, inscription_id, created_at FROM items WHERE collection_id = ?
+                            ORDER BY created_at, sequence_number, item_id''', (collection_id,)).fetchall()
+        # The sort is stable, so items outside the window keep their order within a block
+        rows.sort(key=lambda row: (row[2], positions.get(row[1], 0)))
+        item_ids = [row[0] for row in rows]
+        c.executemany('UPDATE items SET sequence_number = ? WHERE item_id = ?',
+                      [(number, item_id) for number, item_id in enumerate(item_ids, start=1)])
+        c.execute('UPDATE collection_stats SET next_sequence_number = ? WHERE collection_id = ?',
+                 (len(item_ids) + 1, collection_id))
+        logger.info(f"Renumbered {len(item_ids)} items of collection {collection_id} after a repaired mint")
+
+    def record_undo(self, c: sqlite3.Cursor, coin_ticker: str, block: Dict[str, Any], table_name: str, row_id: int) -> None:
+        """Journal a row inserted for a block so a reorg can remove it again"""
+        c.execute('INSERT INTO block_undo (coin_ticker, block_height, table_name, row_id) VALUES (?, ?, ?, ?)',
+                 (coin_ticker, block.get('height'), table_name, row_id))
+
+    def get_scanned_block_hash(self, coin_ticker: str, block_height: int) -> Optional[str]:
+        """Hash recorded for a scanned block, None if the height was not scanned"""
+        with self.db_write_lock:
+            row = self.writer.execute('SELECT block_hash FROM scanned_blocks WHERE coin_ticker = ? AND block_height = ?',
+                                      (coin_ticker, block_height)).fetchone()
+        return row[0] if row else None
+
+    def find_fork_height(self, coin_ticker: str, rpc: AuthServiceProxy, from_height: int) -> int:
+        """Walk back from ``from_height`` to the highest scanned block still on the node's best chain"""
+        with self.db_write_lock:
+            rows = self.writer.execute('''SELECT block_height, block_hash FROM scanned_blocks
+                                          WHERE coin_ticker = ? AND block_height <= ?
+                                          ORDER BY block_height DESC LIMIT ?''',
+                                       (coin_ticker, from_height, MAX_REORG_DEPTH)).fetchall()
+        for block_height, block_hash in rows:
+            if rpc.getblockhash(block_height) == block_hash:
+                return block_height
+        raise RuntimeError(f"No common ancestor with the node's chain within {MAX_REORG_DEPTH} blocks of {from_height} on {coin_ticker}")
+
+    def rollback_to_height(self, coin_ticker: str, fork_height: int, block_heights: Dict[str, Dict[str, int]]) -> None:
+        """Undo every row inserted above ``fork_height`` and move the checkpoint back, in one transaction"""
+        with self.write_transaction() as c:
+            c.execute('''SELECT table_name, row_id FROM block_undo WHERE coin_ticker = ? AND block_height > ?
+                        ORDER BY block_height DESC, undo_id DESC''', (coin_ticker, fork_height))
+            affected_collections = set()
+            payload_rows = []
+            for table_name, row_id in c.fetchall():
+                if table_name == 'items':
+                    row = c.execute('SELECT collection_id FROM items WHERE item_id = ?', (row_id,)).fetchone()
+                    if row:
+                        affected_collections.add(row[0])
+                    c.execute('DELETE FROM items WHERE item_id = ?', (row_id,))
+                elif table_name == 'collections':
+                    for table in ('items', 'serial_ranges', 'collection_stats', 'collections'):
+                        c.execute(f'DELETE FROM {table} WHERE collection_id = ?', (row_id,))
+                    affected_collections.discard(row_id)
+                elif table_name == 'inscription_payloads':
+                    payload_rows.append(row_id)
+            delete_inscriptions(c, payload_rows)
+            for collection_id in affected_collections:
+                c.execute('''UPDATE collection_stats SET
+                            minted_count = (SELECT COUNT(inscription_id) FROM items WHERE collection_id = ?),
+                            next_sequence_number = (SELECT COUNT(*) FROM items WHERE collection_id = ?) + 1,
+                            last_mint_height = (SELECT MAX(created_at) FROM items WHERE collection_id = ?)
+                            WHERE collection_id = ?''', (collection_id, collection_id, collection_id, collection_id))
+            c.execute('DELETE FROM block_undo WHERE coin_ticker = ? AND block_height > ?', (coin_ticker, fork_height))
+            c.execute('DELETE FROM scanned_blocks WHERE coin_ticker = ? AND block_height > ?', (coin_ticker, fork_height))
+            c.execute('''UPDATE scan_checkpoints SET last_block_height = ?,
+                        last_block_hash = (SELECT block_hash FROM scanned_blocks WHERE coin_ticker = ? AND block_height = ?),
+                        updated_at = CURRENT_TIMESTAMP WHERE coin_ticker = ?''',
+                     (fork_height, coin_ticker, fork_height, coin_ticker))
+            c.execute('UPDATE index_version SET version = version + 1 WHERE id = 1')
+        block_heights[coin_ticker]["last_block_height"] = fork_height
+        self._load_collection_registry()
+
+    def handle_reorg(self, coin_ticker: str, rpc: AuthServiceProxy, block_heights: Dict[str, Dict[str, int]]) -> None:
+        """Roll the coin back to its fork point with the node's best chain and schedule a rescan"""
+        last_height = block_heights[coin_ticker]["last_block_height"]
+        fork_height = self.find_fork_height(coin_ticker, rpc, last_height)
+        logger.warning(f"Rolling back {coin_ticker} blocks {fork_height + 1}-{last_height} after a chain reorganization")
+        self.rollback_to_height(coin_ticker, fork_height, block_heights)
+        metrics.inc('rc001_reorgs_total', coin=coin_ticker)
+        self.notifier.notify(coin_ticker)
+
+    def coin_worker(self, coin_ticker: str, block_heights: Dict[str, Dict[str, int]]) -> None:
+        """Scanning loop for a single coin with its own retry backoff"""
+        failures = 0
+        while not self.stop_event.is_set():
+            try:
+                self.scan_coin(coin_ticker, block_heights)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+                logger.error(f"Error in RPC connection or block retrieval for {coin_ticker} "
+                             f"(attempt {failures}, retrying in {delay}s): {e}")
+                self.stop_event.wait(delay)
+                continue
+            self.notifier.wait(coin_ticker, SCAN_INTERVAL)
+
+    def fetch_mempool_transactions(self, coin_ticker: str, rpc: AuthServiceProxy, txids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Fetch unconfirmed transactions, yielding only those that can be rc001 inscriptions"""
+        raw = RAW_BLOCK_MODE and coin_ticker in NETWORKS
+        for i in range(0, len(txids), MEMPOOL_BATCH_SIZE):
+            chunk = txids[i:i + MEMPOOL_BATCH_SIZE]
+            calls = [['getrawtransaction', txid, 0 if raw else 1] for txid in chunk]
+            try:
+                if len(chunk) > 1 and self.supports_batch(coin_ticker):
+                    results = self.rpc_batch(rpc, calls)
+                else:
+                    results = [rpc.getrawtransaction(txid, 0 if raw else 1) for txid in chunk]
+            except Exception:
+                # A transaction left the mempool between listing and fetching, go one by one
+                results = []
+                for txid in chunk:
+                    try:
+                        results.append(rpc.getrawtransaction(txid, 0 if raw else 1))
+                    except JSONRPCException:
                         continue
-                    with self.get_rpc_connection(coin_ticker) as rpc:
-                        current_block_height = rpc.getblockcount()
-                        start_height = heights["start_block_height"]
-                        last_height = heights["last_block_height"]
-                        scan_start_height = max(start_height, last_height + 1)
-                        if scan_start_height > current_block_height:
-                            logger.info(f"No new blocks to process for {coin_ticker} at height {current_block_height}")
-                            continue
-                        logger.info(f"Processing blocks for {coin_ticker} from {scan_start_height} to {current_block_height}")
-                        for block_height in range(scan_start_height, current_block_height + 1):
-                            try:
-                                block_hash = rpc.getblockhash(block_height)
-                                block = rpc.getblock(block_hash, 2)
-                                for tx in block['tx']:
-                                    self.process_transaction(coin_ticker, tx, rpc, block)
-                                block_heights[coin_ticker]["last_block_height"] = block_height
-                                self.update_last_block_heights(block_heights)
-                            except Exception as e:
-                                logger.error(f"Error processing block {block_height} for {coin_ticker}: {e}")
-                                continue  # Skip to next block if one fails
-                except Exception as e:
-                    logger.error(f"Error in RPC connection or block retrieval for {coin_ticker}: {e}")
-                    time.sleep(RETRY_DELAY)
-                    continue  # Skip to next coin if RPC fails
-            time.sleep(SCAN_INTERVAL)
+            for result in results:
+                tx = decode_rc001_candidate(result, coin_ticker) if raw else result
+                if tx is not None:
+                    yield tx
+
+    def process_pending_transaction(self, coin_ticker: str, tx: Dict[str, Any]) -> bool:
+        """Record an unconfirmed transaction as a pending mint if it would mint today.
+
+        Returns True when the mint's collection is not indexed yet, so the caller can retry it.
+        """
+        try:
+            try:
+                doc = read_rc001_document(tx)
+            except UnicodeDecodeError:
+                return False
+            if doc is None or doc.op != 'mint':
+                return False
+            if self.collections.get(coin_ticker, self.sanitize_filename(doc.title)) is None:
+                return True
+            try:
+                entry, sn = self.validate_mint(coin_ticker, doc, tx)
+            except InvalidMint:
+                return False
+            txid = tx['txid']
+            inscription_address = None
+            if tx['vout'] and tx['vout'][0].get('scriptPubKey', {}).get('addresses'):
+                inscription_address = tx['vout'][0]['scriptPubKey']['addresses'][0]
+            with self.write_transaction() as c:
+                c.execute('SELECT 1 FROM items WHERE collection_id = ? AND sn = ?', (entry.collection_id, sn))
+                if c.fetchone():
+                    return False
+                # The first mint of an SN seen in the mempool keeps it
+                c.execute('''INSERT OR IGNORE INTO pending_mints (
+                            txid, coin_ticker, collection_id, inscription_id, sn, inscription_address
+                            ) VALUES (?, ?, ?, ?, ?, ?)''',
+                         (txid, coin_ticker, entry.collection_id, f"{txid}i0", sn, inscription_address))
+                if not c.rowcount:
+                    return False
+            logger.info(f"Pending mint with SN {sn} for collection {entry.sanitized_name} on coin {coin_ticker} with txid {txid}")
+        except Exception as e:
+            logger.error(f"Error processing pending transaction {tx.get('txid')} on coin {coin_ticker}: {e}")
+        return False
+
+    def evict_pending_mints(self, coin_ticker: str, mempool: set) -> None:
+        """Drop pending mints that left the mempool without being confirmed"""
+        with self.write_transaction() as c:
+            c.execute('SELECT txid FROM pending_mints WHERE coin_ticker = ?', (coin_ticker,))
+            gone = [(txid,) for txid, in c.fetchall() if txid not in mempool]
+            if gone:
+                c.executemany('DELETE FROM pending_mints WHERE txid = ?', gone)
+                logger.info(f"Evicted {len(gone)} pending mints for {coin_ticker} that left the mempool")
+
+    def mempool_worker(self, coin_ticker: str) -> None:
+        """Track unconfirmed rc001 mints for a single coin by diffing getrawmempool"""
+        with self.write_transaction() as c:
+            c.execute('DELETE FROM pending_mints WHERE coin_ticker = ?', (coin_ticker,))
+        seen = set()
+        # Mints of collections the scanner has not indexed yet, re-checked on every pass
+        unknown_collection: Dict[str, Dict[str, Any]] = {}
+        failures = 0
+        while not self.stop_event.is_set():
+            try:
+                with self.get_rpc_connection(coin_ticker) as rpc:
+                    mempool = set(rpc.getrawmempool())
+                    new_txids = [txid for txid in mempool if txid not in seen]
+                    retry = [tx for txid, tx in unknown_collection.items() if txid in mempool]
+                    unknown_collection = {}
+                    for tx in retry + list(self.fetch_mempool_transactions(coin_ticker, rpc, new_txids)):
+                        if self.process_pending_transaction(coin_ticker, tx):
+                            unknown_collection[tx['txid']] = tx
+                    seen = mempool
+                    self.evict_pending_mints(coin_ticker, mempool)
+                failures = 0
+                delay = MEMPOOL_INTERVAL
+            except Exception as e:
+                failures += 1
+                delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+                logger.error(f"Error watching the mempool for {coin_ticker} (attempt {failures}, retrying in {delay}s): {e}")
+            self.stop_event.wait(delay)
+
+    def metrics_worker(self) -> None:
+        """Periodically write the metrics file served by the Flask app"""
+        while True:
+            try:
+                metrics.write_file(METRICS_FILE)
+            except Exception as e:
+                logger.error(f"Error writing metrics file {METRICS_FILE}: {e}")
+            if self.stop_event.wait(METRICS_INTERVAL):
+                break
+
+    def run(self) -> None:
+        """Start one scanning worker per configured coin and wait for them"""
+        block_heights = self.load_last_block_heights()
+        threading.Thread(target=self.metrics_worker, name="metrics", daemon=True).start()
+        if METRICS_PORT:
+            metrics.start_http_server(METRICS_PORT, METRICS_HOST)
+            logger.info(f"Serving metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        workers = []
+        for coin_ticker in block_heights:
+            if coin_ticker not in self.rpc_configs:
+                logger.warning(f"Skipping coin {coin_ticker}: No RPC configuration found")
+                continue
+            self.notifier.start(coin_ticker, self.rpc_configs[coin_ticker])
+            worker = threading.Thread(target=self.coin_worker, args=(coin_ticker, block_heights),
+                                      name=f"scanner-{coin_ticker}", daemon=True)
+            worker.start()
+            workers.append(worker)
+            if MEMPOOL_WATCH:
+                threading.Thread(target=self.mempool_worker, args=(coin_ticker,),
+                                 name=f"mempool-{coin_ticker}", daemon=True).start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("Stopping scanner workers")
+            self.stop_event.set()
+            self.notifier.wake_all()
+            for worker in workers:
+                worker.join()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index rc001 collections from the configured coin nodes")
+    parser.add_argument('--coin', help="backfill this coin from its checkpoint and exit instead of scanning")
+    parser.add_argument('--blocks-dir', help="read the backfill from this node blocks directory (blk*.dat)")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes decoding the backfill")
+    parser.add_argument('--to', type=int, dest='end_height', help="last height to backfill")
+    args = parser.parse_args()
+    if (args.blocks_dir or args.end_height is not None or args.processes > 1) and not args.coin:
+        parser.error("--coin is required for a backfill")
     scanner = BlockchainScanner()
-    scanner.run()
\ No newline at end of file
+    if args.coin:
+        scanner.backfill(args.coin.upper(), args.blocks_dir, args.end_height, args.processes)
+    else:
+        scanner.run()
\ No newline at end of file
@@ -0,0 +1,170 @@
+import argparse
+import sys
+import time
+from typing import Optional, Tuple, List, Dict, Any, Iterator, Iterable
+
+from rc001indexer import BlockchainScanner, BlockPrefetcher, logger
+
+# Rescans share the node with the live indexer, so they fetch with fewer threads by default
+RESCAN_WORKERS = 2
+RESCAN_DEPTH = 32
+# Progress is logged this often (seconds)
+PROGRESS_INTERVAL = 10
+
+def throttle(blocks: Iterable[Tuple[int, Any, Any]], max_rate: Optional[float]) -> Iterator[Tuple[int, Any, Any]]:
+    """Yield blocks no faster than ``max_rate`` per second.
+
+    The prefetcher only runs a bounded number of windows ahead of its consumer, so
+    slowing the consumer also slows the requests sent to the node.
+    """
+    if not max_rate:
+        yield from blocks
+        return
+    interval = 1.0 / max_rate
+    next_time = time.monotonic()
+    for item in blocks:
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_time = max(next_time, time.monotonic() - interval) + interval
+        yield item
+
+def report_progress(blocks: Iterable[Tuple[int, Any, Any]], coin_ticker: str, from_height: int,
+                    to_height: int) -> Iterator[Tuple[int, Any, Any]]:
+    """Log blocks/s and an ETA for the rest of the range while passing blocks through"""
+    started = last_report = time.monotonic()
+    done = 0
+    total = to_height - from_height + 1
+    for item in blocks:
+        yield item
+        done += 1
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL or done == total:
+            rate = done / max(now - started, 1e-6)
+            eta = (total - done) / rate if rate else 0
+            logger.info(f"Rescan {coin_ticker}: block {item[0]} ({done}/{total}, {done * 100 / total:.1f}%), "
+                        f"{rate:.1f} blocks/s, ETA {time.strftime('%H:%M:%S', time.gmtime(eta))}")
+            last_report = now
+
+def stop_on_fetch_error(blocks: Iterable[Tuple[int, Any, Any]]) -> Iterator[Tuple[int, Any, Any]]:
+    """Raise instead of skipping a block that could not be fetched, so the job stays resumable from it"""
+    for block_height, block, fetch_error in blocks:
+        if fetch_error is not None:
+            raise RuntimeError(f"Could not fetch block {block_height}: {fetch_error}")
+        yield block_height, block, fetch_error
+
+class Rescanner:
+    """Re-apply a range of already scanned blocks to repair the index.
+
+    Blocks go through the scanner's own prefetch and commit pipeline, and rows that are
+    already indexed are left as they are, so a rescan only adds what is missing. The
+    scan checkpoint is not touched; progress is kept in ``rescan_jobs`` instead, and
+    running the same rescan again continues an unfinished job where it stopped. Deploys
+    a rescan inserts are picked up by a running indexer before its next write, and mints
+    it repairs are numbered at their place in the collection, not after the newest.
+    """
+
+    def __init__(self, scanner: BlockchainScanner):
+        self.scanner = scanner
+
+    def find_job(self, coin_ticker: str, from_height: int, to_height: Optional[int]) -> Optional[Dict[str, Any]]:
+        """The latest unfinished job for this range, any end height when ``to_height`` is None"""
+        row = self.scanner.writer.execute('''SELECT job_id, to_height, next_height FROM rescan_jobs
+                                             WHERE coin_ticker = ? AND from_height = ? AND to_height = COALESCE(?, to_height)
+                                             AND status = 'running' ORDER BY job_id DESC LIMIT 1''',
+                                          (coin_ticker, from_height, to_height)).fetchone()
+        return {"job_id": row[0], "to_height": row[1], "next_height": row[2]} if row else None
+
+    def create_job(self, coin_ticker: str, from_height: int, to_height: int) -> Dict[str, Any]:
+        with self.scanner.write_transaction() as c:
+            c.execute('''INSERT INTO rescan_jobs (coin_ticker, from_height, to_height, next_height, status)
+                        VALUES (?, ?, ?, ?, 'running')''', (coin_ticker, from_height, to_height, from_height))
+            return {"job_id": c.lastrowid, "to_height": to_height, "next_height": from_height}
+
+    def finish_job(self, job_id: int) -> None:
+        with self.scanner.write_transaction() as c:
+            c.execute("UPDATE rescan_jobs SET status = 'done', updated_at = CURRENT_TIMESTAMP WHERE job_id = ?", (job_id,))
+
+    def list_jobs(self, coin_ticker: Optional[str] = None) -> List[Tuple]:
+        query = 'SELECT job_id, coin_ticker, from_height, to_height, next_height, status, updated_at FROM rescan_jobs'
+        params = ()
+        if coin_ticker:
+            query += ' WHERE coin_ticker = ?'
+            params = (coin_ticker,)
+        return self.scanner.writer.execute(query + ' ORDER BY job_id', params).fetchall()
+
+    def rescan(self, coin_ticker: str, from_height: int, to_height: Optional[int] = None,
+               max_rate: Optional[float] = None, workers: int = RESCAN_WORKERS) -> int:
+        """Rescan a height range, resuming an unfinished job for the same range; returns the job id.
+
+        Without ``to_height`` the range ends at the indexed height, or where the unfinished
+        job for ``from_height`` ends.
+        """
+        block_heights = self.scanner.load_last_block_heights()
+        if coin_ticker not in block_heights:
+            raise ValueError(f"No scan checkpoint for coin {coin_ticker}")
+        job = self.find_job(coin_ticker, from_height, to_height)
+        if job:
+            to_height = job["to_height"]
+            logger.info(f"Resuming rescan job {job['job_id']} of {coin_ticker} at height {job['next_height']}")
+        else:
+            last_height = block_heights[coin_ticker]["last_block_height"]
+            if to_height is None or to_height > last_height:
+                # Blocks above the checkpoint belong to the live scan, which applies them anyway
+                if to_height is not None:
+                    logger.warning(f"Rescan of {coin_ticker} capped at the indexed height {last_height}")
+                to_height = last_height
+            if from_height > to_height:
+                raise ValueError(f"Nothing to rescan for {coin_ticker}: {from_height} is above {to_height}")
+            job = self.create_job(coin_ticker, from_height, to_height)
+            logger.info(f"Started rescan job {job['job_id']} of {coin_ticker} from {from_height} to {to_height}")
+        start_height = job["next_height"]
+        if start_height <= to_height:
+            tip_hash = self.scanner.get_scanned_block_hash(coin_ticker, start_height - 1)
+            prefetcher = BlockPrefetcher(self.scanner, coin_ticker, start_height, to_height,
+                                         depth=RESCAN_DEPTH, workers=workers)
+            blocks = report_progress(stop_on_fetch_error(throttle(prefetcher, max_rate)), coin_ticker, start_height, to_height)
+            with self.scanner.get_rpc_connection(coin_ticker) as rpc:
+                if not self.scanner.apply_blocks(coin_ticker, blocks, block_heights, rpc, tip_hash, job["job_id"]):
+                    raise RuntimeError(f"The {coin_ticker} chain changed inside the rescan range; "
+                                       f"let the indexer handle the reorganization, then run the rescan again")
+            if self.scanner.stop_event.is_set():
+                logger.info(f"Rescan job {job['job_id']} interrupted, run the same command to resume")
+                return job["job_id"]
+        self.finish_job(job["job_id"])
+        logger.info(f"Rescan job {job['job_id']} of {coin_ticker} from {from_height} to {to_height} finished")
+        return job["job_id"]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-index a range of blocks without moving the scan checkpoint")
+    parser.add_argument('--coin', help="coin ticker, e.g. DOGE")
+    parser.add_argument('--from', dest='from_height', type=int, help="first height to rescan")
+    parser.add_argument('--to', dest='to_height', type=int, help="last height to rescan (default: the indexed height)")
+    parser.add_argument('--max-rate', type=float, help="cap on blocks per second requested from the node")
+    parser.add_argument('--workers', type=int, default=RESCAN_WORKERS, help="prefetch threads")
+    parser.add_argument('--list', action='store_true', help="show rescan jobs and exit")
+    args = parser.parse_args(argv)
+    if args.coin:
+        args.coin = args.coin.upper()
+
+    scanner = BlockchainScanner()
+    rescanner = Rescanner(scanner)
+    if args.list:
+        for job_id, coin_ticker, from_height, to_height, next_height, status, updated_at in rescanner.list_jobs(args.coin):
+            print(f"{job_id:5d} {coin_ticker:6s} {from_height}-{to_height} next {next_height} {status} ({updated_at})")
+        return 0
+    if not args.coin or args.from_height is None:
+        parser.error("--coin and --from are required")
+    try:
+        rescanner.rescan(args.coin, args.from_height, args.to_height, args.max_rate, args.workers)
+    except KeyboardInterrupt:
+        scanner.stop_event.set()
+        logger.info("Rescan interrupted, run the same command to resume")
+        return 1
+    except Exception as e:
+        logger.error(f"Rescan failed: {e}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+from typing import Iterator, Optional, Tuple, Union
+
+# Script opcodes used by the parser
+OP_0 = 0x00
+OP_PUSHDATA1 = 0x4c
+OP_PUSHDATA2 = 0x4d
+OP_PUSHDATA4 = 0x4e
+OP_1NEGATE = 0x4f
+OP_1 = 0x51
+OP_16 = 0x60
+
+OPCODE_NAMES = {
+    0x61: 'OP_NOP', 0x63: 'OP_IF', 0x64: 'OP_NOTIF', 0x67: 'OP_ELSE', 0x68: 'OP_ENDIF',
+    0x69: 'OP_VERIFY', 0x6a: 'OP_RETURN', 0x6d: 'OP_2DROP', 0x75: 'OP_DROP', 0x76: 'OP_DUP',
+    0x7c: 'OP_SWAP', 0x87: 'OP_EQUAL', 0x88: 'OP_EQUALVERIFY', 0xa8: 'OP_SHA256',
+    0xa9: 'OP_HASH160', 0xaa: 'OP_HASH256', 0xac: 'OP_CHECKSIG', 0xad: 'OP_CHECKSIGVERIFY',
+    0xae: 'OP_CHECKMULTISIG', 0xaf: 'OP_CHECKMULTISIGVERIFY', 0xb1: 'OP_CHECKLOCKTIMEVERIFY',
+    0xb2: 'OP_CHECKSEQUENCEVERIFY',
+}
+
+Script = Union[bytes, bytearray, memoryview]
+
+def iter_script_ops(script: Script) -> Iterator[Tuple[int, Optional[memoryview]]]:
+    """Yield (opcode, data) for every operation in a script.
+
+    Push data is returned as a memoryview into ``script``; non-push opcodes yield None.
+    Raises ValueError when a push runs past the end of the script.
+    """
+    view = memoryview(script)
+    # Indexing bytes is cheaper than indexing a memoryview, data is still sliced from the view
+    buf = script if isinstance(script, bytes) else view
+    end = len(view)
+    pos = 0
+    while pos < end:
+        opcode = buf[pos]
+        pos += 1
+        if opcode > OP_PUSHDATA4:
+            yield opcode, None
+            continue
+        if opcode < OP_PUSHDATA1:
+            size = opcode
+        elif opcode == OP_PUSHDATA1:
+            if pos + 1 > end:
+                raise ValueError("truncated OP_PUSHDATA1")
+            size = buf[pos]
+            pos += 1
+        elif opcode == OP_PUSHDATA2:
+            if pos + 2 > end:
+                raise ValueError("truncated OP_PUSHDATA2")
+            size = buf[pos] | buf[pos + 1] << 8
+            pos += 2
+        else:
+            if pos + 4 > end:
+                raise ValueError("truncated OP_PUSHDATA4")
+            size = int.from_bytes(buf[pos:pos + 4], 'little')
+            pos += 4
+        if pos + size > end:
+            raise ValueError("push past end of script")
+        yield opcode, view[pos:pos + size]
+        pos += size
+
+def decode_script_num(data: Script) -> int:
+    """Decode a minimally encoded script number (little endian, sign bit in the last byte)"""
+    if not data:
+        return 0
+    value = int.from_bytes(data, 'little')
+    if data[-1] & 0x80:
+        return -(value & ~(0x80 << (8 * (len(data) - 1))))
+    return value
+
+def script_to_asm(script: Script) -> str:
+    """Render a script the way bitcoind renders ``scriptSig.asm``.
+
+    Signature pushes are shown as plain hex, without the ``[ALL]`` sighash suffix.
+    """
+    parts = []
+    try:
+        for opcode, data in iter_script_ops(script):
+            if data is not None:
+                parts.append(str(decode_script_num(data)) if len(data) <= 4 else data.hex())
+            elif opcode == OP_1NEGATE:
+                parts.append('-1')
+            elif OP_1 <= opcode <= OP_16:
+                parts.append(str(opcode - OP_1 + 1))
+            else:
+                parts.append(OPCODE_NAMES.get(opcode, 'OP_UNKNOWN'))
+    except ValueError:
+        parts.append('[error]')
+    return ' '.join(parts)
+
+def _is_number_op(opcode: int, data: Optional[memoryview]) -> bool:
+    """Whether an operation renders as a number in asm (small push, OP_1NEGATE or OP_1..OP_16)"""
+    if data is not None:
+        return len(data) <= 4
+    return opcode == OP_1NEGATE or OP_1 <= opcode <= OP_16
+
+def _script_number(opcode: int, data: Optional[memoryview]) -> int:
+    """Value of an operation _is_number_op accepts"""
+    if data is not None:
+        return decode_script_num(data)
+    return -1 if opcode == OP_1NEGATE else opcode - OP_1 + 1
+
+def extract_inscription(script: Script, complete: bool = False) -> Tuple[Optional[Union[bytes, memoryview]], Optional[bytes]]:
+    """Extract (body, content type) from an ord inscription scriptSig.
+
+    The layout is ``"ord" <chunk count> <content type>`` followed by ``<countdown> <chunk>``
+    pairs. A single-chunk body is returned as a memoryview into ``script``, multi-chunk
+    bodies are joined once. Returns (None, None) when the script is not an inscription.
+
+    Large inscriptions continue in later transactions, so their first scriptSig ends on a
+    countdown above zero and holds only a prefix of the body. With ``complete`` such a
+    prefix, or a script without any chunk, also returns (None, None).
+    """
+    try:
+        ops = iter_script_ops(script)
+        opcode, data = next(ops, (None, None))
+        if data is None or data != b'ord':
+            return None, None
+        opcode, data = next(ops, (None, None))
+        if opcode is None or not _is_number_op(opcode, data):
+            return None, None
+        opcode, content_type = next(ops, (None, None))
+        if content_type is None:
+            return None, None
+        chunks = []
+        countdown = None
+        while True:
+            try:
+                opcode, data = next(ops)
+            except (StopIteration, ValueError):
+                # A malformed push after the body (e.g. in the signature) ends the body
+                break
+            if not _is_number_op(opcode, data):
+                break
+            countdown = opcode, data
+            _, chunk = next(ops, (None, None))
+            if chunk is None:
+                return None, None
+            chunks.append(chunk)
+        if complete and (countdown is None or _script_number(*countdown) != 0):
+            return None, None
+        body = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+        return body, bytes(content_type)
+    except ValueError:
+        return None, None
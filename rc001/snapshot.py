@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Optional, List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+DATABASE_FILE = "./collections/all_collections.db"
+SNAPSHOT_DIR = "./snapshots"
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = 'manifest.json'
+DATABASE_NAME = 'all_collections.db'
+# Pages copied per backup step; the copy restarts if the indexer writes between steps, so keep it large
+BACKUP_PAGES = -1
+COMPRESS_LEVEL = 6
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_checkpoints(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    rows = conn.execute('''SELECT coin_ticker, start_block_height, last_block_height, last_block_hash
+                           FROM scan_checkpoints ORDER BY coin_ticker''').fetchall()
+    return {coin_ticker: {"start_block_height": start, "last_block_height": last, "last_block_hash": block_hash}
+            for coin_ticker, start, last, block_hash in rows}
+
+def create_snapshot(database_file: str = DATABASE_FILE, output: Optional[str] = None) -> Dict[str, Any]:
+    """Write a consistent, gzipped copy of the database plus a manifest of its scan checkpoints.
+
+    The copy is taken with SQLite's online backup API from a read-only connection, so the
+    indexer and the API keep running; in WAL mode the backup reads one committed state and
+    does not block writers. Returns the manifest.
+    """
+    if not os.path.exists(database_file):
+        raise FileNotFoundError(f"Database {database_file} not found")
+    if output is None:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        output = os.path.join(SNAPSHOT_DIR, f"all_collections-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.tar.gz")
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as temp_dir:
+        copy_path = os.path.join(temp_dir, DATABASE_NAME)
+        source = sqlite3.connect(f"file:{os.path.abspath(database_file)}?mode=ro", uri=True, timeout=30)
+        copy = sqlite3.connect(copy_path)
+        try:
+            source.backup(copy, pages=BACKUP_PAGES)
+            # The copy is a standalone file, no -wal sidecar to ship alongside it
+            copy.execute('PRAGMA journal_mode=DELETE')
+            checkpoints = _read_checkpoints(copy)
+            counts = {table: copy.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                      for table in ('collections', 'items')}
+        finally:
+            copy.close()
+            source.close()
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "database": DATABASE_NAME,
+            "database_size": os.path.getsize(copy_path),
+            "database_sha256": _sha256_file(copy_path),
+            "checkpoints": checkpoints,
+            "counts": counts,
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+        temp_output = f"{output}.tmp"
+        with tarfile.open(temp_output, 'w:gz', compresslevel=COMPRESS_LEVEL) as archive:
+            # Manifest first so it can be read without decompressing the database
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest_bytes)
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(manifest_bytes))
+            archive.add(copy_path, arcname=DATABASE_NAME)
+        os.replace(temp_output, output)
+    manifest['path'] = output
+    logger.info(f"Snapshot {output} written in {time.monotonic() - started:.1f}s "
+                f"({os.path.getsize(output)} bytes, {counts['collections']} collections, {counts['items']} items)")
+    return manifest
+
+def read_manifest(snapshot: str) -> Dict[str, Any]:
+    """Manifest of a snapshot archive"""
+    with tarfile.open(snapshot, 'r:gz') as archive:
+        member = archive.next()
+        if member is None or member.name != MANIFEST_NAME:
+            raise ValueError(f"{snapshot} is not an rc001 snapshot")
+        manifest = json.load(archive.extractfile(member))
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')}")
+    return manifest
+
+def restore_snapshot(snapshot: str, database_file: str = DATABASE_FILE, force: bool = False) -> Dict[str, Any]:
+    """Replace the database with a snapshot; the indexer then continues from the snapshot's checkpoints.
+
+    The archive is unpacked next to the target, checked against the manifest's hash and
+    checkpoints and SQLite's integrity check, and only then moved into place. Stop the
+    indexer first; the API can keep running as it opens a connection per request.
+    """
+    manifest = read_manifest(snapshot)
+    if os.path.exists(database_file) and not force:
+        raise FileExistsError(f"Database {database_file} already exists, use --force to replace it")
+    target_dir = os.path.dirname(os.path.abspath(database_file))
+    os.makedirs(target_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=target_dir) as temp_dir:
+        restored_path = os.path.join(temp_dir, DATABASE_NAME)
+        with tarfile.open(snapshot, 'r:gz') as archive:
+            member = archive.getmember(manifest["database"])
+            if not member.isfile():
+                raise ValueError(f"{snapshot} holds no database file")
+            with archive.extractfile(member) as src, open(restored_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b''):
+                    dst.write(chunk)
+        if _sha256_file(restored_path) != manifest["database_sha256"]:
+            raise ValueError(f"Database in {snapshot} does not match its manifest hash")
+        conn = sqlite3.connect(restored_path)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            if result != 'ok':
+                raise ValueError(f"Database in {snapshot} failed the integrity check: {result}")
+            if _read_checkpoints(conn) != manifest["checkpoints"]:
+                raise ValueError(f"Checkpoints in {snapshot} do not match its manifest")
+        finally:
+            conn.close()
+        # WAL files of the old database would be replayed into the restored one
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(database_file + suffix):
+                os.remove(database_file + suffix)
+        os.replace(restored_path, database_file)
+    logger.info(f"Restored {database_file} from {snapshot} taken at {manifest['created_at']}")
+    return manifest
+
+def _print_checkpoints(manifest: Dict[str, Any]) -> None:
+    for coin_ticker, checkpoint in manifest["checkpoints"].items():
+        print(f"  {coin_ticker}: height {checkpoint['last_block_height']} ({checkpoint['last_block_hash'] or 'no hash'})")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot and restore the rc001 index database")
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help="write a compressed snapshot of the live database")
+    create.add_argument('--db', default=DATABASE_FILE)
+    create.add_argument('--output', help=f"archive path, by default a timestamped file in {SNAPSHOT_DIR}")
+    restore = commands.add_parser('restore', help="replace the database with a snapshot")
+    restore.add_argument('snapshot')
+    restore.add_argument('--db', default=DATABASE_FILE)
+    restore.add_argument('--force', action='store_true', help="replace an existing database")
+    show = commands.add_parser('show', help="print a snapshot's manifest")
+    show.add_argument('snapshot')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        if args.command == 'create':
+            manifest = create_snapshot(args.db, args.output)
+            print(f"Snapshot written to {manifest['path']}")
+        elif args.command == 'restore':
+            manifest = restore_snapshot(args.snapshot, args.db, args.force)
+            print(f"Restored {args.db}; the indexer will continue from:")
+        else:
+            manifest = read_manifest(args.snapshot)
+            print(json.dumps({key: value for key, value in manifest.items() if key != 'checkpoints'}, indent=2))
+        _print_checkpoints(manifest)
+    except Exception as e:
+        logger.error(f"Snapshot {args.command} failed: {e}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,16 @@
 import os
 import sqlite3
-import random
-import datetime
 import base64
 import re
-from flask import Blueprint, jsonify, make_response, request
+from flask import Blueprint, Response, jsonify, make_response, request
 from collections import OrderedDict
 import logging
 from logging.handlers import RotatingFileHandler
 import subprocess
 import json
+from routes.rc001_cache import ResponseCache
+from routes.sn_allocator import SnAllocator, SoldOut
+from rc001.payload_store import load_inscription
 
 # Configure logging
 logging.basicConfig(
@@ -22,23 +23,103 @@ logger.addHandler(handler)
 
 # Create a new Blueprint for rc001
 rc001_bp = Blueprint('rc001', __name__)
+# Mint HTML loads its parent script from /content/<id> at the site root, as on an ord server
+rc001_content_bp = Blueprint('rc001_content', __name__)
 
 DATABASE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../rc001/collections/all_collections.db'))
+# Written by the indexer in the Prometheus text format
+METRICS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../rc001/collections/indexer_metrics.prom'))
+# Read endpoints are served from memory until the indexer commits again
+response_cache = ResponseCache(DATABASE_FILE)
+# SNs handed out by /mint are reserved for an hour so concurrent minters never share one
+sn_allocator = SnAllocator()
+# Inscription bodies never change, so clients and proxies may cache them for a year
+CONTENT_MAX_AGE = 31536000
+# Same policy ord applies to /content: inscriptions may only load other content from this server
+CONTENT_SECURITY_POLICY = "default-src 'self' 'unsafe-eval' 'unsafe-inline' data: blob:"
 
 # Function to sanitize the collection name
 def sanitize_filename(name):
     return re.sub(r'[^\w\-]', '', name)
 
+# Paging of the items embedded by /collections?include=items
+DEFAULT_ITEMS_LIMIT = 100
+MAX_ITEMS_LIMIT = 1000
+COLLECTION_FIELDS = ('coin_ticker', 'mint_address', 'deploy_address', 'mint_price', 'parent_inscription_id',
+                     'emblem_inscription_id', 'website', 'deploy_txid', 'max_supply', 'minted', 'left_to_mint',
+                     'percent_minted', 'block_height', 'sn_ranges')
+ITEM_FIELDS = ('sn', 'inscription_id', 'inscription_status', 'inscription_address', 'sequence_number')
+
+def parse_fields(value, allowed):
+    """Split a comma separated ?fields= value, None when absent; raises ValueError for unknown names"""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+def encode_items_cursor(collection_id, sequence_number):
+    return base64.urlsafe_b64encode(f"{collection_id}:{sequence_number}".encode()).decode().rstrip('=')
+
+def decode_items_cursor(cursor_value):
+    """(collection_id, sequence_number) from an items cursor; raises ValueError when malformed"""
+    try:
+        padded = cursor_value + '=' * (-len(cursor_value) % 4)
+        collection_id, sequence_number = base64.urlsafe_b64decode(padded).decode().split(':')
+        return int(collection_id), int(sequence_number)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor_value}'")
+
 @rc001_bp.route('/collections', methods=['GET'])
+@response_cache.cached
 def list_collections():
-    """List all collections from the database with their details."""
+    """List collections with their mint progress.
+
+    Summaries come from one aggregated query. Items are only embedded with
+    ``?include=items``, a page of ``limit`` per collection ordered by sequence number,
+    with ``items_next_cursor`` to pass back as ``cursor`` (together with ``coin_ticker``
+    and ``name``) for the following page. ``fields`` and ``item_fields`` select keys.
+    """
     try:
+        include = {value.strip() for value in request.args.get('include', '').split(',') if value.strip()}
+        try:
+            fields = parse_fields(request.args.get('fields'), COLLECTION_FIELDS)
+            item_fields = parse_fields(request.args.get('item_fields'), ITEM_FIELDS) or list(ITEM_FIELDS)
+            limit = min(max(int(request.args.get('limit', DEFAULT_ITEMS_LIMIT)), 1), MAX_ITEMS_LIMIT)
+            cursor_value = request.args.get('cursor')
+            cursor_position = decode_items_cursor(cursor_value) if cursor_value else None
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+        query = """
+            SELECT c.collection_id, c.coin_ticker, c.sanitized_name, c.mint_address, c.deploy_address, c.mint_price,
+                   c.parent_inscription_id, c.emblem_inscription_id, c.website, c.deploy_txid, c.created_at,
+                   COALESCE(s.minted_count, 0) AS minted_count,
+                   (SELECT json_group_array(range_value) FROM
+                        (SELECT range_value FROM serial_ranges r WHERE r.collection_id = c.collection_id
+                         ORDER BY r.range_index)) AS sn_ranges
+            FROM collections c LEFT JOIN collection_stats s ON s.collection_id = c.collection_id
+        """
+        conditions, params = [], []
+        if request.args.get('coin_ticker'):
+            conditions.append("UPPER(c.coin_ticker) = UPPER(?)")
+            params.append(request.args['coin_ticker'])
+        if request.args.get('name'):
+            conditions.append("UPPER(c.sanitized_name) = UPPER(?)")
+            params.append(sanitize_filename(request.args['name']))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY c.created_at DESC"
+
         with sqlite3.connect(DATABASE_FILE) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            
-            # Fetch all collections
-            cursor.execute("SELECT * FROM collections ORDER BY created_at DESC")
+            cursor.execute(query, params)
             collections_data = cursor.fetchall()
             
             if not collections_data:
@@ -48,19 +129,21 @@ def list_collections():
                     "message": "No collections found."
                 })
 
+            if cursor_position and len(collections_data) != 1:
+                return jsonify({
+                    "status": "error",
+                    "message": "A cursor pages the items of one collection, pass coin_ticker and name with it."
+                }), 400
+
             collections = {}
             for row in collections_data:
                 collection_id = row['collection_id']
                 sanitized_name = row['sanitized_name']
-                coin_ticker = row['coin_ticker']
+                ranges = json.loads(row['sn_ranges'])
 
                 # Calculate max_supply from serial ranges
-                cursor.execute("SELECT range_value FROM serial_ranges WHERE collection_id = ? ORDER BY range_index", 
-                             (collection_id,))
-                ranges = cursor.fetchall()
-                
                 max_supply = 1
-                for range_value, in ranges:
+                for range_value in ranges:
                     try:
                         start, end = map(int, range_value.split('-'))
                         max_supply *= (end - start + 1)
@@ -71,17 +154,14 @@ def list_collections():
                             "message": f"Invalid range format for collection {sanitized_name}: '{range_value}'"
                         }), 400
 
-                # Count minted items
-                cursor.execute("SELECT COUNT(*) FROM items WHERE collection_id = ? AND inscription_id IS NOT NULL", 
-                             (collection_id,))
-                minted = cursor.fetchone()[0]
+                minted = row['minted_count']
 
                 left_to_mint = max_supply - minted
                 percent_minted = round((minted / max_supply) * 100, 2) if max_supply > 0 else 0
 
                 # Create ordered dictionary for consistent output
                 ordered_collection_data = OrderedDict([
-                    ('coin_ticker', coin_ticker),
+                    ('coin_ticker', row['coin_ticker']),
                     ('mint_address', row['mint_address']),
                     ('deploy_address', row['deploy_address']),
                     ('mint_price', row['mint_price']),
@@ -98,23 +178,40 @@ def list_collections():
                 ])
 
                 # Add serial ranges
-                for i, (range_value,) in enumerate(ranges):
+                for i, range_value in enumerate(ranges):
                     ordered_collection_data[f'sn_index_{i}'] = range_value
 
-                # Fetch items with sequence numbers
-                cursor.execute("SELECT sn, inscription_id, inscription_status, inscription_address, sequence_number FROM items WHERE collection_id = ? ORDER BY sequence_number", 
-                             (collection_id,))
-                items = cursor.fetchall()
-                ordered_collection_data['items'] = [
-                    {
-                        'sn': item['sn'],
-                        'inscription_id': item['inscription_id'],
-                        'inscription_status': item['inscription_status'],
-                        'inscription_address': item['inscription_address'],
-                        'sequence_number': item['sequence_number']
-                    }
-                    for item in items
-                ]
+                if fields is not None:
+                    selected = OrderedDict((field, ordered_collection_data[field]) for field in fields if field != 'sn_ranges')
+                    if 'sn_ranges' in fields:
+                        selected.update((key, value) for key, value in ordered_collection_data.items() if key.startswith('sn_index_'))
+                    ordered_collection_data = selected
+
+                if 'items' in include:
+                    after = 0
+                    if cursor_position:
+                        if cursor_position[0] != collection_id:
+                            return jsonify({
+                                "status": "error",
+                                "message": f"Cursor does not belong to collection '{sanitized_name}'"
+                            }), 400
+                        after = cursor_position[1]
+                    # Keyset paging on (collection_id, sequence_number) reads one page from the index
+                    cursor.execute(f"""
+                        SELECT {', '.join(dict.fromkeys(item_fields + ['sequence_number']))} FROM items
+                        WHERE collection_id = ? AND sequence_number > ?
+                        ORDER BY sequence_number LIMIT ?
+                    """, (collection_id, after, limit + 1))
+                    items = cursor.fetchall()
+                    has_more = len(items) > limit
+                    items = items[:limit]
+                    ordered_collection_data['items'] = [
+                        {field: item[field] for field in item_fields}
+                        for item in items
+                    ]
+                    ordered_collection_data['items_next_cursor'] = (
+                        encode_items_cursor(collection_id, items[-1]['sequence_number']) if has_more else None
+                    )
 
                 collections[sanitized_name] = ordered_collection_data
 
@@ -137,33 +234,21 @@ def list_collections():
         }), 500
 
 def generate_unique_sn(collection_id: int, conn):
-    """Generate a unique SN that is not already minted or older than 24 hours."""
-    cursor = conn.cursor()
-    
-    # Get serial ranges
-    cursor.execute("SELECT range_value FROM serial_ranges WHERE collection_id = ? ORDER BY range_index", 
-                  (collection_id,))
-    ranges = [tuple(map(int, r[0].split('-'))) for r in cursor.fetchall()]
-    
-    # Get existing SNs
-    cursor.execute("""
-        SELECT sn FROM items 
-        WHERE collection_id = ? 
-        AND (inscription_id IS NOT NULL 
-             OR (created_at < ?))
-    """, (collection_id, datetime.datetime.now() - datetime.timedelta(hours=24)))
-    existing_sns = {row[0] for row in cursor.fetchall()}
-
-    while True:
-        if len(ranges) == 1 and len(str(ranges[0][0])) > 2:  # Single range case
-            start, end = ranges[0]
-            sn = f"{random.randint(start, end):06d}"
-        else:  # Segmented ranges
-            sn_parts = [f"{random.randint(start, end):02d}" for start, end in ranges]
-            sn = ''.join(sn_parts)
-        
-        if sn not in existing_sns:
-            return sn
+    """Reserve a random SN that is not minted, pending or reserved by another minter."""
+    sns, _ = sn_allocator.reserve(conn, collection_id)
+    return sns[0]
+
+def build_mint_html(collection_name, parent_inscription_id, sn):
+    """HTML of a mint inscription for one SN."""
+    return f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><meta name="p" content="rc001"><meta name="op" content="mint"><meta name="sn" content="{sn}"><title>{collection_name}</title></head><body><script src="/content/{parent_inscription_id}"></script></body></html>"""
+
+def sold_out_response(collection_name, e):
+    return jsonify({
+        "status": "error",
+        "message": f"Only {e.available} serial number(s) left in collection '{collection_name}'" if e.available
+                   else f"Collection '{collection_name}' is sold out",
+        "available": e.available
+    }), 409
 
 @rc001_bp.route('/mint/<coin_ticker>/<collection_name>', methods=['GET'])
 def generate_html(coin_ticker, collection_name):
@@ -191,11 +276,14 @@ def generate_html(coin_ticker, collection_name):
             sn = generate_unique_sn(collection['collection_id'], conn)
 
             # Construct HTML content
-            html_content = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><meta name="p" content="rc001"><meta name="op" content="mint"><meta name="sn" content="{sn}"><title>{collection_name}</title></head><body><script src="/content/{collection['parent_inscription_id']}"></script></body></html>"""
+            html_content = build_mint_html(collection_name, collection['parent_inscription_id'], sn)
             response = make_response(html_content)
             response.headers['Content-Type'] = 'text/html;charset=utf-8'
             return response
 
+    except SoldOut as e:
+        logger.info(f"Sold out in generate_html: coin_ticker={coin_ticker}, sanitized_name={sanitized_collection_name}")
+        return sold_out_response(collection_name, e)
     except sqlite3.Error as e:
         logger.error(f"Database error in generate_html: {e}")
         return jsonify({
@@ -210,6 +298,7 @@ def generate_html(coin_ticker, collection_name):
         }), 500
 
 @rc001_bp.route('/inscriptions/<coin_ticker>/<collection_name>/<address>', methods=['GET'])
+@response_cache.cached
 def list_inscriptions_by_collection_and_address(coin_ticker, collection_name, address):
     """List all inscription_ids for an address in a specific collection on a coin."""
     sanitized_collection_name = sanitize_filename(collection_name)
@@ -255,6 +344,7 @@ def list_inscriptions_by_collection_and_address(coin_ticker, collection_name, ad
         }), 500
 
 @rc001_bp.route('/collection/<coin_ticker>/<collection_name>', methods=['GET'])
+@response_cache.cached
 def list_collection_as_json(coin_ticker, collection_name):
     """List all entries in the specified collection as JSON."""
     sanitized_collection_name = sanitize_filename(collection_name)
@@ -303,35 +393,75 @@ def list_collection_as_json(coin_ticker, collection_name):
             "message": str(e)
         }), 500
 
+# POST /validate accepts up to this many IDs and looks them up this many at a time
+MAX_VALIDATE_IDS = 1000
+VALIDATE_CHUNK_SIZE = 500
+
+# The number is the item's position in its collection; sequence_number stores it, older rows without
+# one fall back to counting the items minted before it
+VALIDATE_ITEMS_QUERY = """
+    SELECT i.inscription_id, i.inscription_address, c.coin_ticker, c.sanitized_name, c.deploy_address,
+           c.deploy_txid, c.parent_inscription_id,
+           COALESCE(i.sequence_number, (SELECT COUNT(*) FROM items j WHERE j.collection_id = i.collection_id
+               AND (j.created_at < i.created_at OR (j.created_at = i.created_at AND j.item_id <= i.item_id)))) AS number
+    FROM items i JOIN collections c ON c.collection_id = i.collection_id
+    WHERE i.inscription_id IN ({placeholders})
+"""
+VALIDATE_PENDING_QUERY = """
+    SELECT p.inscription_id, p.inscription_address, p.sn, p.first_seen, c.coin_ticker, c.sanitized_name
+    FROM pending_mints p JOIN collections c ON c.collection_id = p.collection_id
+    WHERE p.inscription_id IN ({placeholders})
+"""
+
+def include_pending_requested():
+    """Pending mints are only reported when the caller asks with ?include_pending=1"""
+    return request.args.get('include_pending', '').lower() in ('1', 'true', 'yes')
+
+def lookup_inscriptions(conn, inscription_ids, include_pending=False):
+    """Validation results for the minted inscription IDs, and with ``include_pending`` the pending ones, keyed by ID"""
+    results = {}
+    for i in range(0, len(inscription_ids), VALIDATE_CHUNK_SIZE):
+        chunk = inscription_ids[i:i + VALIDATE_CHUNK_SIZE]
+        placeholders = ','.join('?' * len(chunk))
+        for row in conn.execute(VALIDATE_ITEMS_QUERY.format(placeholders=placeholders), chunk):
+            results[row['inscription_id']] = {
+                "status": "success",
+                "coin_ticker": row['coin_ticker'],
+                "collection_name": row['sanitized_name'],
+                "number": row['number'],
+                "deploy_address": row['deploy_address'],
+                "deploy_txid": row['deploy_txid'],
+                "parent_inscription_id": row['parent_inscription_id'],
+                "inscription_address": row['inscription_address']
+            }
+        # Not confirmed yet, but the indexer may have seen them in the mempool
+        missing = [inscription_id for inscription_id in chunk if inscription_id not in results]
+        if missing and include_pending:
+            placeholders = ','.join('?' * len(missing))
+            for row in conn.execute(VALIDATE_PENDING_QUERY.format(placeholders=placeholders), missing):
+                results[row['inscription_id']] = {
+                    "status": "pending",
+                    "coin_ticker": row['coin_ticker'],
+                    "collection_name": row['sanitized_name'],
+                    "sn": row['sn'],
+                    "inscription_address": row['inscription_address'],
+                    "first_seen": row['first_seen']
+                }
+    return results
+
 @rc001_bp.route('/validate/<inscription_id>', methods=['GET'])
 def validate_inscription(inscription_id):
-    """Validate an inscription_id across all collections."""
+    """Validate an inscription_id across all collections.
+
+    A mint still in the mempool is a 404 like an unknown ID, unless ?include_pending=1 asks for it.
+    """
     try:
         with sqlite3.connect(DATABASE_FILE) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Get all collections
-            cursor.execute("SELECT collection_id, coin_ticker, name, sanitized_name, deploy_address, deploy_txid, parent_inscription_id FROM collections")
-            collections = cursor.fetchall()
-
-            for collection in collections:
-                cursor.execute("SELECT inscription_id, inscription_address FROM items WHERE collection_id = ? ORDER BY created_at", 
-                             (collection['collection_id'],))
-                results = cursor.fetchall()
+            result = lookup_inscriptions(conn, [inscription_id], include_pending_requested()).get(inscription_id)
 
-                for index, row in enumerate(results, start=1):
-                    if row['inscription_id'] == inscription_id:
-                        return jsonify({
-                            "status": "success",
-                            "coin_ticker": collection['coin_ticker'],
-                            "collection_name": collection['sanitized_name'],
-                            "number": index,
-                            "deploy_address": collection['deploy_address'],
-                            "deploy_txid": collection['deploy_txid'],
-                            "parent_inscription_id": collection['parent_inscription_id'],
-                            "inscription_address": row['inscription_address']
-                        })
+            if result:
+                return jsonify(result)
 
             return jsonify({
                 "status": "error",
@@ -351,6 +481,157 @@ def validate_inscription(inscription_id):
             "message": str(e)
         }), 500
 
+@rc001_bp.route('/validate', methods=['POST'])
+def validate_inscriptions():
+    """Validate many inscription IDs at once, e.g. a whole wallet.
+
+    Takes {"inscription_ids": [...]} and returns a result per ID in the same shape as
+    GET /validate/<inscription_id>, with status "not_found" for unknown IDs. Mints still in
+    the mempool are reported with status "pending" only with ?include_pending=1.
+    """
+    try:
+        data = request.get_json(silent=True)
+        inscription_ids = data.get('inscription_ids') if isinstance(data, dict) else data
+        if not isinstance(inscription_ids, list) or not all(isinstance(i, str) for i in inscription_ids):
+            return jsonify({
+                "status": "error",
+                "message": "Expected a JSON body {\"inscription_ids\": [...]} with string IDs."
+            }), 400
+        if len(inscription_ids) > MAX_VALIDATE_IDS:
+            return jsonify({
+                "status": "error",
+                "message": f"At most {MAX_VALIDATE_IDS} inscription IDs per request."
+            }), 400
+        inscription_ids = list(dict.fromkeys(inscription_ids))
+
+        with sqlite3.connect(DATABASE_FILE) as conn:
+            conn.row_factory = sqlite3.Row
+            found = lookup_inscriptions(conn, inscription_ids, include_pending_requested())
+
+        results = OrderedDict(
+            (inscription_id, found.get(inscription_id, {"status": "not_found"}))
+            for inscription_id in inscription_ids
+        )
+        return jsonify({
+            "status": "success",
+            "results": results
+        })
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error in validate_inscriptions: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database error: {e}"
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in validate_inscriptions: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@rc001_bp.route('/pending/<coin_ticker>/<collection_name>', methods=['GET'])
+def list_pending_mints(coin_ticker, collection_name):
+    """List unconfirmed mints the indexer has seen in the mempool for a collection."""
+    sanitized_collection_name = sanitize_filename(collection_name)
+    
+    try:
+        with sqlite3.connect(DATABASE_FILE) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT collection_id FROM collections WHERE UPPER(coin_ticker) = UPPER(?) AND UPPER(sanitized_name) = UPPER(?)", 
+                         (coin_ticker, sanitized_collection_name))
+            collection = cursor.fetchone()
+            
+            if not collection:
+                logger.error(f"Collection not found in list_pending_mints: coin_ticker={coin_ticker}, sanitized_name={sanitized_collection_name}")
+                return jsonify({
+                    "status": "error",
+                    "message": f"Collection '{collection_name}' not found on coin '{coin_ticker}'"
+                }), 404
+
+            query = "SELECT inscription_id, sn, inscription_address, first_seen FROM pending_mints WHERE collection_id = ?"
+            params = [collection['collection_id']]
+            address = request.args.get('address')
+            if address:
+                query += " AND inscription_address = ?"
+                params.append(address)
+            cursor.execute(query + " ORDER BY first_seen", params)
+            pending = [dict(row) for row in cursor.fetchall()]
+
+            return jsonify({
+                "status": "success",
+                "pending": pending
+            })
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error in list_pending_mints: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database error: {e}"
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in list_pending_mints: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@rc001_bp.route('/metrics', methods=['GET'])
+def indexer_metrics():
+    """Serve the indexer's metrics file in the Prometheus text format."""
+    try:
+        with open(METRICS_FILE, 'r') as f:
+            body = f.read()
+    except FileNotFoundError:
+        return jsonify({
+            "status": "error",
+            "message": "Indexer metrics are not available yet."
+        }), 503
+    response = make_response(body)
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@rc001_bp.route('/content/<inscription_id>', methods=['GET'])
+@rc001_content_bp.route('/content/<inscription_id>', methods=['GET'])
+def inscription_content(inscription_id):
+    """Serve an inscription body from the indexer's payload store, with a strong ETag and Range support."""
+    try:
+        with sqlite3.connect(DATABASE_FILE) as conn:
+            inscription = load_inscription(conn, inscription_id)
+
+        if not inscription:
+            return jsonify({
+                "status": "error",
+                "message": f"Content for inscription '{inscription_id}' not found."
+            }), 404
+
+        digest, content_type, body = inscription
+        response = Response(body, content_type=content_type or 'application/octet-stream')
+        response.set_etag(digest)
+        response.cache_control.public = True
+        response.cache_control.max_age = CONTENT_MAX_AGE
+        response.cache_control.immutable = True
+        response.headers['Content-Security-Policy'] = CONTENT_SECURITY_POLICY
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        # Answers If-None-Match with a 304 and Range requests with a 206
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error in inscription_content: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database error: {e}"
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in inscription_content: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @rc001_bp.route('/mint_hex/<coin_ticker>/<collection_name>', methods=['GET'])
 def generate_hex(coin_ticker, collection_name):
     """Generate a hex representation of an HTML page with a unique SN."""
@@ -377,7 +658,7 @@ def generate_hex(coin_ticker, collection_name):
             sn = generate_unique_sn(collection['collection_id'], conn)
 
             # Construct HTML content
-            html_content = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><meta name="p" content="rc001"><meta name="op" content="mint"><meta name="sn" content="{sn}"><title>{collection_name}</title></head><body><script src="/content/{collection['parent_inscription_id']}"></script></body></html>"""
+            html_content = build_mint_html(collection_name, collection['parent_inscription_id'], sn)
             hex_content = html_content.encode('utf-8').hex()
 
             return jsonify({
@@ -385,6 +666,9 @@ def generate_hex(coin_ticker, collection_name):
                 "hex": hex_content
             })
 
+    except SoldOut as e:
+        logger.info(f"Sold out in generate_hex: coin_ticker={coin_ticker}, sanitized_name={sanitized_collection_name}")
+        return sold_out_response(collection_name, e)
     except sqlite3.Error as e:
         logger.error(f"Database error in generate_hex: {e}")
         return jsonify({
@@ -398,6 +682,81 @@ def generate_hex(coin_ticker, collection_name):
             "message": str(e)
         }), 500
     
+MAX_BULK_MINT = 1000
+MINT_FORMATS = ('hex', 'html')
+
+@rc001_bp.route('/mint_bulk/<coin_ticker>/<collection_name>', methods=['GET'])
+def generate_bulk(coin_ticker, collection_name):
+    """Reserve ``count`` distinct SNs at once and return a mint payload for each.
+
+    ``format`` is hex (default) or html. With ``Accept: application/x-ndjson`` or
+    ``?stream=ndjson`` the payloads are streamed one JSON object per line, after a
+    first line carrying the reservation expiry. Either all SNs are reserved or, when
+    fewer are left, none and a 409 with the number still available.
+    """
+    sanitized_collection_name = sanitize_filename(collection_name)
+    try:
+        count = int(request.args.get('count', 1))
+    except ValueError:
+        count = 0
+    payload_format = request.args.get('format', 'hex')
+    if not 1 <= count <= MAX_BULK_MINT or payload_format not in MINT_FORMATS:
+        return jsonify({
+            "status": "error",
+            "message": f"count must be 1 to {MAX_BULK_MINT} and format one of {', '.join(MINT_FORMATS)}."
+        }), 400
+    stream = request.args.get('stream') == 'ndjson' or \
+        request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+    try:
+        with sqlite3.connect(DATABASE_FILE) as conn:
+            conn.row_factory = sqlite3.Row
+            collection = conn.execute("SELECT collection_id, parent_inscription_id FROM collections WHERE UPPER(coin_ticker) = UPPER(?) AND UPPER(sanitized_name) = UPPER(?)",
+                                      (coin_ticker, sanitized_collection_name)).fetchone()
+            if not collection:
+                logger.error(f"Collection not found in generate_bulk: coin_ticker={coin_ticker}, sanitized_name={sanitized_collection_name}")
+                return jsonify({
+                    "status": "error",
+                    "message": f"Collection '{collection_name}' not found on coin '{coin_ticker}'"
+                }), 404
+            sns, expires_at = sn_allocator.reserve(conn, collection['collection_id'], count)
+
+        parent_inscription_id = collection['parent_inscription_id']
+
+        def payload(sn):
+            html_content = build_mint_html(collection_name, parent_inscription_id, sn)
+            return {"sn": sn, payload_format: html_content.encode('utf-8').hex() if payload_format == 'hex' else html_content}
+
+        reserved_until = int(expires_at)
+        if stream:
+            def generate():
+                yield json.dumps({"status": "success", "count": count, "reserved_until": reserved_until}) + '\n'
+                for sn in sns:
+                    yield json.dumps(payload(sn)) + '\n'
+            return Response(generate(), content_type='application/x-ndjson')
+        return jsonify({
+            "status": "success",
+            "count": count,
+            "reserved_until": reserved_until,
+            "mints": [payload(sn) for sn in sns]
+        })
+
+    except SoldOut as e:
+        logger.info(f"Sold out in generate_bulk: coin_ticker={coin_ticker}, sanitized_name={sanitized_collection_name}, count={count}")
+        return sold_out_response(collection_name, e)
+    except sqlite3.Error as e:
+        logger.error(f"Database error in generate_bulk: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database error: {e}"
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_bulk: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @rc001_bp.route('/mint_rc001/<ticker>', methods=['POST'])
 def mint_rc001(ticker):
     data = request.json
@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional
+
+from flask import Response, make_response, request
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Appended to the ETag of the gzipped body
+GZIP_ETAG_SUFFIX = '-gz'
+MAX_ENTRIES = 512
+# Clients keep the body but must revalidate it, which costs a 304 when nothing changed
+CACHE_CONTROL = 'no-cache'
+
+class CachedResponse:
+    """A pre-serialized 200 response, with a gzipped copy when that is smaller"""
+
+    __slots__ = ('version', 'body', 'gzipped', 'content_type', 'etag')
+
+    def __init__(self, version: str, body: bytes, content_type: str):
+        self.version = version
+        self.body = body
+        self.content_type = content_type
+        # Strong validator derived from the bytes, so a new data version with unchanged output still gets a 304
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.gzipped = None
+        if len(body) >= GZIP_MIN_SIZE:
+            compressed = gzip.compress(body, GZIP_LEVEL, mtime=0)
+            if len(compressed) < len(body):
+                self.gzipped = compressed
+
+class ResponseCache:
+    """Cache read-only JSON responses until the indexer next commits indexed data.
+
+    The version is the indexer's ``index_version`` counter, bumped by its block commits
+    and rollbacks only, so SN reservations and mempool tracking leave the cache alone.
+    It is read from one long-lived read-only connection, and only after SQLite's
+    ``PRAGMA data_version`` shows that some other connection committed. A database file
+    replaced on disk, e.g. by a snapshot restore, is noticed by its inode and the
+    connection reopened.
+    """
+
+    def __init__(self, database_file: str, max_entries: int = MAX_ENTRIES):
+        self.database_file = database_file
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inode: Optional[int] = None
+        self._generation = 0
+        self._data_version: Optional[int] = None
+        self._index_version: Optional[str] = None
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._conn = sqlite3.connect(f"file:{self.database_file}?mode=ro", uri=True, check_same_thread=False)
+        self._generation += 1
+        self._data_version = None
+
+    def _read_index_version(self, data_version: int) -> str:
+        try:
+            row = self._conn.execute('SELECT version FROM index_version WHERE id = 1').fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        # Databases from before index_version existed fall back to every commit
+        return str(row[0]) if row else f"d{data_version}"
+
+    def data_version(self) -> Optional[str]:
+        """Opaque version of the database contents, None when the database cannot be read"""
+        with self._lock:
+            try:
+                inode = os.stat(self.database_file).st_ino
+                if self._conn is None or inode != self._inode:
+                    self._connect()
+                    self._inode = inode
+                data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+                if data_version != self._data_version:
+                    self._data_version = data_version
+                    self._index_version = self._read_index_version(data_version)
+                return f"{self._generation}.{self._index_version}"
+            except (OSError, sqlite3.Error):
+                self._inode = None
+                return None
+
+    def get(self, key: str, version: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def cache_key() -> str:
+        """Path plus query parameters in a stable order"""
+        args = sorted((key, value) for key in request.args for value in request.args.getlist(key))
+        return request.path + '?' + '&'.join(f"{key}={value}" for key, value in args)
+
+    def respond(self, entry: CachedResponse) -> Response:
+        """Serve an entry as a 304, a gzipped body or a plain body, depending on the request"""
+        gzipped = entry.gzipped is not None and 'gzip' in request.accept_encodings
+        # The gzipped and plain bodies are different representations and need different strong ETags
+        etag = f"{entry.etag}{GZIP_ETAG_SUFFIX}" if gzipped else entry.etag
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        elif gzipped:
+            response = Response(entry.gzipped, content_type=entry.content_type)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(entry.body, content_type=entry.content_type)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def cached(self, view):
+        """Decorator for GET views whose output depends only on the URL and the database"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = self.data_version()
+            if version is None:
+                return view(*args, **kwargs)
+            key = self.cache_key()
+            entry = self.get(key, version)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = CachedResponse(version, response.get_data(), response.content_type)
+                self.put(key, entry)
+            return self.respond(entry)
+        return wrapper
@@ -0,0 +1,255 @@
+import itertools
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Optional, Tuple, List, Dict, Set
+
+# An SN handed out by /mint stays reserved for this long (seconds) so no one else is given it
+RESERVATION_TTL = 3600
+# SN spaces up to this many slots get a bitmap and free list; larger ones are sampled against a set
+DENSE_SLOT_LIMIT = 1 << 22
+# Random picks that may hit a reserved slot before the remaining free slots are listed outright
+MAX_RANDOM_ATTEMPTS = 64
+# Random probes of a sparse SN space before it is scanned for the free slots left
+MAX_SPARSE_PROBES = MAX_RANDOM_ATTEMPTS * 16
+# How long a reservation waits for the indexer's write transaction to finish (milliseconds)
+BUSY_TIMEOUT_MS = 30000
+
+class SoldOut(Exception):
+    def __init__(self, collection_id: int, available: int):
+        super().__init__(f"Only {available} serial number(s) left in collection {collection_id}")
+        self.collection_id = collection_id
+        self.available = available
+
+class SerialSpace:
+    """Bijection between slot numbers and the SNs /mint generates for a collection's serial ranges.
+
+    SNs are formatted as /mint always has: a single range starting at 100 or above as six
+    digits, otherwise one two-digit segment per range (a lone low range as a plain number).
+    Slot numbers enumerate the cartesian product of the ranges.
+    """
+
+    def __init__(self, range_values: List[str]):
+        self.ranges = [tuple(map(int, value.split('-'))) for value in range_values]
+        self.sizes = [max(0, end - start + 1) for start, end in self.ranges]
+        self.wide = len(self.ranges) == 1 and len(str(self.ranges[0][0])) > 2
+        # A collection without serial ranges has no SNs to hand out
+        self.total = 1 if self.ranges else 0
+        for size in self.sizes:
+            self.total *= size
+
+    def slot_to_sn(self, slot: int) -> str:
+        if self.wide:
+            return f"{self.ranges[0][0] + slot:06d}"
+        parts = []
+        for (start, _), size in zip(reversed(self.ranges), reversed(self.sizes)):
+            slot, offset = divmod(slot, size)
+            parts.append(f"{start + offset:02d}")
+        return ''.join(reversed(parts))
+
+    def sn_to_slot(self, sn: str) -> Optional[int]:
+        """Slot of an SN, None when it lies outside the ranges"""
+        try:
+            if len(self.ranges) == 1:
+                values = [int(sn)]
+            else:
+                values = [int(sn[i:i + 2]) for i in range(0, len(sn), 2)]
+        except ValueError:
+            return None
+        if len(values) != len(self.ranges):
+            return None
+        slot = 0
+        for value, (start, end), size in zip(values, self.ranges, self.sizes):
+            if not start <= value <= end:
+                return None
+            slot = slot * size + value - start
+        return slot
+
+class CollectionSlots:
+    """Minted slots of one collection, kept in step with the items table"""
+
+    def __init__(self, collection_id: int, space: SerialSpace):
+        self.collection_id = collection_id
+        self.space = space
+        self.dense = space.total <= DENSE_SLOT_LIMIT
+        self.item_count = 0
+        self.last_item_id = 0
+        self.minted_slots = 0
+        if self.dense:
+            self.bitmap = bytearray((space.total + 7) // 8)
+            # Taken slots are dropped lazily when a pick lands on them
+            self.free = array('I', range(space.total))
+        else:
+            self.taken: Set[int] = set()
+
+    def is_taken(self, slot: int) -> bool:
+        if self.dense:
+            return bool(self.bitmap[slot >> 3] & (1 << (slot & 7)))
+        return slot in self.taken
+
+    def mark(self, slot: int) -> None:
+        if self.is_taken(slot):
+            return
+        if self.dense:
+            self.bitmap[slot >> 3] |= 1 << (slot & 7)
+        else:
+            self.taken.add(slot)
+        self.minted_slots += 1
+
+    @property
+    def free_count(self) -> int:
+        return self.space.total - self.minted_slots
+
+    def sync(self, conn: sqlite3.Connection) -> bool:
+        """Apply items minted since the last sync; False when items were removed (a reorg) and a rebuild is needed"""
+        rows = conn.execute('SELECT item_id, sn FROM items WHERE collection_id = ? AND item_id > ? ORDER BY item_id',
+                            (self.collection_id, self.last_item_id)).fetchall()
+        row = conn.execute('SELECT minted_count FROM collection_stats WHERE collection_id = ?',
+                           (self.collection_id,)).fetchone()
+        if row is None:
+            row = conn.execute('SELECT COUNT(*) FROM items WHERE collection_id = ?', (self.collection_id,)).fetchone()
+        if self.item_count + len(rows) != row[0]:
+            return False
+        for item_id, sn in rows:
+            slot = self.space.sn_to_slot(sn) if sn is not None else None
+            if slot is not None:
+                self.mark(slot)
+            self.last_item_id = item_id
+        self.item_count += len(rows)
+        return True
+
+    def _random_free_slot(self) -> Optional[int]:
+        if self.dense:
+            free = self.free
+            while free:
+                index = random.randrange(len(free))
+                slot = free[index]
+                if not self.is_taken(slot):
+                    return slot
+                # Swap-remove the stale entry
+                free[index] = free[-1]
+                free.pop()
+            return None
+        for _ in range(MAX_SPARSE_PROBES):
+            slot = random.randrange(self.space.total)
+            if slot not in self.taken:
+                return slot
+        # Nearly full, list the free slots left instead of probing
+        free = self._scan_free_slots(set(), 1)
+        return free[0] if free else None
+
+    def _scan_free_slots(self, exclude: Set[int], count: int) -> List[int]:
+        """Up to ``count`` free slots outside ``exclude``, scanning the space from a random slot"""
+        total = self.space.total
+        start = random.randrange(total)
+        found: List[int] = []
+        for slot in itertools.chain(range(start, total), range(start)):
+            if not self.is_taken(slot) and slot not in exclude:
+                found.append(slot)
+                if len(found) == count:
+                    break
+        return found
+
+    def pick(self, count: int, blocked: Set[int]) -> List[int]:
+        """``count`` distinct random free slots outside ``blocked``; raises SoldOut when there are not enough"""
+        blocked_free = {slot for slot in blocked if not self.is_taken(slot)}
+        available = self.free_count - len(blocked_free)
+        if available < count:
+            raise SoldOut(self.collection_id, max(0, available))
+        picked: List[int] = []
+        chosen: Set[int] = set()
+        misses = 0
+        while len(picked) < count:
+            slot = self._random_free_slot()
+            if slot is None:
+                raise SoldOut(self.collection_id, len(picked))
+            if slot in blocked_free or slot in chosen:
+                misses += 1
+                if misses >= MAX_RANDOM_ATTEMPTS:
+                    # Nearly everything left is reserved, choose among the remaining slots directly
+                    if self.dense:
+                        remaining = [s for s in set(self.free) if not self.is_taken(s)
+                                     and s not in blocked_free and s not in chosen]
+                        picked.extend(random.sample(remaining, count - len(picked)))
+                    else:
+                        picked.extend(self._scan_free_slots(blocked_free | chosen, count - len(picked)))
+                    break
+                continue
+            misses = 0
+            picked.append(slot)
+            chosen.add(slot)
+        return picked
+
+class SnAllocator:
+    """Hand out random unminted serial numbers and reserve them for a while.
+
+    Minted SNs are tracked per collection in memory and synced incrementally from the
+    items table. Mints waiting in the mempool and live reservations are read inside the
+    same write transaction that stores the new reservations, so concurrent minters, also
+    in other worker processes, never receive the same SN.
+    """
+
+    def __init__(self, ttl: int = RESERVATION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._collections: Dict[int, Tuple[Tuple[str, ...], CollectionSlots]] = {}
+        self._table_ready = False
+
+    @staticmethod
+    def ensure_table(conn: sqlite3.Connection) -> None:
+        conn.execute('''CREATE TABLE IF NOT EXISTS sn_reservations (
+                        collection_id INTEGER,
+                        sn TEXT,
+                        reserved_at REAL,
+                        expires_at REAL,
+                        PRIMARY KEY (collection_id, sn)
+                        )''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_sn_reservations_expires ON sn_reservations (expires_at)')
+
+    def _slots(self, conn: sqlite3.Connection, collection_id: int) -> CollectionSlots:
+        range_values = tuple(row[0] for row in conn.execute(
+            'SELECT range_value FROM serial_ranges WHERE collection_id = ? ORDER BY range_index', (collection_id,)))
+        cached = self._collections.get(collection_id)
+        if cached and cached[0] == range_values and cached[1].sync(conn):
+            return cached[1]
+        slots = CollectionSlots(collection_id, SerialSpace(list(range_values)))
+        slots.sync(conn)
+        self._collections[collection_id] = (range_values, slots)
+        return slots
+
+    def reserve(self, conn: sqlite3.Connection, collection_id: int, count: int = 1) -> Tuple[List[str], float]:
+        """Reserve ``count`` random free SNs atomically; returns (SNs, expiry as a unix time).
+
+        Raises SoldOut when fewer than ``count`` SNs are neither minted, pending nor reserved.
+        """
+        conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+        with self._lock:
+            if not self._table_ready:
+                # Once per process rather than a schema write on every reservation
+                self.ensure_table(conn)
+                conn.commit()
+                self._table_ready = True
+            now = time.time()
+            expires_at = now + self.ttl
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                slots = self._slots(conn, collection_id)
+                conn.execute('DELETE FROM sn_reservations WHERE expires_at <= ?', (now,))
+                held = conn.execute('''SELECT sn FROM sn_reservations WHERE collection_id = ?
+                                       UNION SELECT sn FROM pending_mints WHERE collection_id = ?''',
+                                    (collection_id, collection_id)).fetchall()
+                blocked = {slot for slot in (slots.space.sn_to_slot(sn) for sn, in held if sn is not None)
+                           if slot is not None}
+                sns = [slots.space.slot_to_sn(slot) for slot in slots.pick(count, blocked)]
+                conn.executemany('INSERT INTO sn_reservations (collection_id, sn, reserved_at, expires_at) VALUES (?, ?, ?, ?)',
+                                 [(collection_id, sn, now, expires_at) for sn in sns])
+                conn.commit()
+            except BaseException as e:
+                conn.rollback()
+                if isinstance(e, sqlite3.OperationalError):
+                    # E.g. a database restored without the table, create it again on the next reservation
+                    self._table_ready = False
+                raise
+        return sns, expires_at
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The indexer modules import each other as top-level modules, as when run from rc001/
+for path in (ROOT, os.path.join(ROOT, 'rc001'), os.path.join(ROOT, 'rc001', 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from blk_reader import BlockFileReader, MissingBlockError, read_block_file_record
+from raw_block import double_sha256
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'blk')
+
+with open(os.path.join(FIXTURES, 'chains.json')) as f:
+    CHAINS = json.load(f)
+
+def block_hash(raw: bytes) -> str:
+    return double_sha256(raw[:80])[::-1].hex()
+
+def read_chain(name, start_height=0, end_height=None):
+    with BlockFileReader(os.path.join(FIXTURES, name), 'DOGE') as reader:
+        return [(height, block_hash(raw)) for height, raw in reader.iter_blocks(start_height, end_height)]
+
+def test_iter_blocks_follows_longest_branch():
+    assert read_chain('fork') == list(enumerate(CHAINS['fork']))
+
+def test_iter_blocks_skips_stale_blocks():
+    with BlockFileReader(os.path.join(FIXTURES, 'fork'), 'DOGE') as reader:
+        assert reader.block_count == len(CHAINS['fork']) + len(CHAINS['fork_stale'])
+        hashes = {block_hash(raw) for _, raw in reader.iter_blocks()}
+    assert hashes.isdisjoint(CHAINS['fork_stale'])
+
+def test_iter_blocks_height_range():
+    assert read_chain('fork', 3, 5) == [(height, CHAINS['fork'][height]) for height in range(3, 6)]
+    assert read_chain('fork', 6) == [(6, CHAINS['fork'][6]), (7, CHAINS['fork'][7])]
+
+def test_iter_locations_matches_iter_blocks():
+    with BlockFileReader(os.path.join(FIXTURES, 'fork'), 'DOGE') as reader:
+        blocks = list(reader.iter_blocks(2))
+        locations = list(reader.iter_locations(2))
+    assert [height for height, _ in locations] == [height for height, _ in blocks]
+    for (_, (path, offset, size)), (_, raw) in zip(locations, blocks):
+        assert os.path.basename(path) in ('blk00000.dat', 'blk00001.dat')
+        assert read_block_file_record(path, offset, size) == raw
+
+def test_chain_ending_before_end_height_raises():
+    with pytest.raises(MissingBlockError):
+        read_chain('fork', 0, 8)
+
+def test_gap_raises_after_last_reachable_block():
+    with BlockFileReader(os.path.join(FIXTURES, 'gap'), 'DOGE') as reader:
+        seen = []
+        with pytest.raises(MissingBlockError):
+            for height, raw in reader.iter_blocks():
+                seen.append((height, block_hash(raw)))
+    assert seen == list(enumerate(CHAINS['gap']))
+
+def test_gap_beyond_end_height_is_not_an_error():
+    assert read_chain('gap', 0, 4) == list(enumerate(CHAINS['gap']))
+    with pytest.raises(MissingBlockError):
+        read_chain('gap', 0, 5)
+    with BlockFileReader(os.path.join(FIXTURES, 'gap'), 'DOGE') as reader:
+        with pytest.raises(MissingBlockError):
+            list(reader.iter_locations(3))
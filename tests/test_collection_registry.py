@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from collection_registry import SerialNumberValidator, CollectionRegistry
+
+def registry_with(ranges):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE collections (collection_id INTEGER PRIMARY KEY, coin_ticker TEXT, sanitized_name TEXT, '
+                 'mint_address TEXT, mint_price INTEGER, parent_inscription_id TEXT)')
+    conn.execute('CREATE TABLE serial_ranges (collection_id INTEGER, range_index INTEGER, range_value TEXT)')
+    conn.execute("INSERT INTO collections VALUES (1, 'DOGE', 'Test', 'D8mint', 100000, 'parenti0')")
+    conn.executemany('INSERT INTO serial_ranges VALUES (1, ?, ?)', list(enumerate(ranges)))
+    registry = CollectionRegistry()
+    registry.load(conn)
+    return registry.get('DOGE', 'Test').validator
+
+@pytest.mark.parametrize('ranges, sn, valid', [
+    (['000001-010000'], '5', True),
+    (['000001-010000'], '010001', False),
+    (['01-10'], '7', True),
+    (['01-10'], '11', False),
+    (['01-10', '00-99'], '0599', True),
+    (['01-10', '00-99'], '1100', False),
+    (['01-10', '00-99'], '010203', False),
+])
+def test_serial_number_rules(ranges, sn, valid):
+    assert registry_with(ranges).is_valid(sn) is valid
+
+@pytest.mark.parametrize('ranges', [
+    ['01-10', '0099'],
+    ['01-10', None],
+    ['01-10', 5],
+    ['0110'],
+    [None],
+    [42],
+])
+def test_malformed_deploy_range_rejects_mints(ranges):
+    validator = registry_with(ranges)
+    for sn in ('0101', '0150', '000001'):
+        assert validator.is_valid(sn) is False
+
+def test_malformed_segment_only_rejects_its_segment():
+    validator = SerialNumberValidator([(0, '01-10'), (1, 'bad')])
+    assert validator.is_valid('05') is True
+    assert validator.is_valid('0505') is False
@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+
+import raw_block
+from raw_block import (NETWORKS, decode_block, decode_rc001_candidate, decode_script_pubkey, decode_transaction,
+                       double_sha256, hash160)
+from fake_node import decode_verbose_block
+from rc001_html import read_rc001_document
+from synthetic_blocks import ChainBuilder, generate_chain, mint_html, p2pkh_script, varint
+
+@pytest.fixture(scope='module')
+def chain():
+    return generate_chain(12, plain_per_block=20, collections=2, burst_every=5, burst_size=10)
+
+def document_fields(doc):
+    return None if doc is None else (doc.op, doc.sn, doc.title, doc.script_src, doc.json_data, doc.body)
+
+def test_raw_mode_matches_verbose_mode(chain):
+    previous_hash = '00' * 32
+    for block in chain:
+        raw = decode_block(block['raw'], 'DOGE', block['height'])
+        verbose = decode_verbose_block(block['raw'], 'DOGE', block['height'], 2)
+        assert raw['hash'] == verbose['hash'] == block['hash']
+        assert raw['previousblockhash'] == verbose['previousblockhash'] == previous_hash
+        assert raw['nTx'] == verbose['nTx'] == len(verbose['tx'])
+        # Raw mode keeps exactly the transactions verbose mode finds an rc001 document in, decoded the same way
+        rc001_txs = [tx for tx in verbose['tx'] if read_rc001_document(tx)]
+        assert raw['tx'] == rc001_txs
+        assert ([document_fields(read_rc001_document(tx)) for tx in raw['tx']]
+                == [document_fields(read_rc001_document(tx)) for tx in rc001_txs])
+        previous_hash = block['hash']
+    assert sum(len(decode_block(block['raw'], 'DOGE', 0)['tx']) for block in chain) == 1 * 2 + 10 * 3 + 2 * 10
+
+def test_bytes_and_hex_input_agree(chain):
+    block = chain[5]
+    assert decode_block(bytes.fromhex(block['raw']), 'DOGE', 5) == decode_block(block['raw'], 'DOGE', 5)
+
+def test_candidate_filter_skips_other_inscriptions():
+    builder = ChainBuilder(seed=1)
+    plain = builder.plain()
+    image = builder.inscription(b'\x89PNG' + b'\x00' * 300, [])
+    text = builder.inscription(b'<html><title>plain page</title></html>', [])
+    mint = builder.inscription(mint_html('Bench0', '000001', 'ab' * 32 + 'i0'), [])
+    raw, _ = builder.block('00' * 32, [builder.coinbase(1), plain, image, text, mint])
+    block = decode_block(raw, 'DOGE', 1)
+    assert block['nTx'] == 5
+    assert [tx['txid'] for tx in block['tx']] == [double_sha256(mint)[::-1].hex()]
+    assert decode_rc001_candidate(plain.hex(), 'DOGE') is None
+    assert decode_rc001_candidate(mint.hex(), 'DOGE')['txid'] == double_sha256(mint)[::-1].hex()
+
+def test_segwit_txid_excludes_witness():
+    legacy_body = varint(1) + b'\x11' * 32 + struct.pack('<I', 0) + varint(0) + b'\xff\xff\xff\xff'
+    legacy_body += varint(1) + struct.pack('<q', 5000) + varint(22) + b'\x00\x14' + b'\x22' * 20
+    legacy = struct.pack('<i', 2) + legacy_body + b'\x00\x00\x00\x00'
+    witness = varint(2) + varint(3) + b'sig' + varint(2) + b'pk'
+    segwit = struct.pack('<i', 2) + b'\x00\x01' + legacy_body + witness + b'\x00\x00\x00\x00'
+    tx = decode_transaction(segwit, 0, 'DGB')
+    assert tx['txid'] == double_sha256(legacy)[::-1].hex()
+    assert tx['vout'][0]['scriptPubKey']['type'] == 'witness_v0_keyhash'
+    assert tx['vout'][0]['scriptPubKey']['addresses'][0].startswith('dgb1q')
+
+PUBKEY = bytes.fromhex('0250863ad64a87ae8a2fe83c1af1a8403cb53f53e486d8511dad8a04887e5b2352')
+
+@pytest.mark.skipif(hash160(b'') is None, reason="OpenSSL without ripemd160")
+def test_script_pubkey_addresses(monkeypatch):
+    # Known Bitcoin vector, with Bitcoin's address versions
+    monkeypatch.setitem(NETWORKS, 'BTC', {'pubkeyhash': 0x00, 'scripthash': 0x05})
+    address = '1PMycacnJaSqwwJqjawXBErnLsZ7RkXUAs'
+    assert decode_script_pubkey(p2pkh_script(hash160(PUBKEY)), 'BTC')['addresses'] == [address]
+    assert decode_script_pubkey(bytes([33]) + PUBKEY + b'\xac', 'BTC')['addresses'] == [address]
+    # Bare multisig lists every key's P2PKH address, as verbose getblock does
+    other = b'\x03' + bytes(range(32))
+    multisig = b'\x51' + bytes([33]) + PUBKEY + bytes([33]) + other + b'\x52\xae'
+    script_pubkey = decode_script_pubkey(multisig, 'BTC')
+    assert script_pubkey['type'] == 'multisig' and script_pubkey['reqSigs'] == 1
+    assert script_pubkey['addresses'] == [address, raw_block.base58check_encode(0, hash160(other))]
+    # Keys failing bitcoind's prefix check are left out
+    invalid = b'\x05' + bytes(32)
+    script_pubkey = decode_script_pubkey(b'\x51' + bytes([33]) + invalid + bytes([33]) + PUBKEY + b'\x52\xae', 'BTC')
+    assert script_pubkey['addresses'] == [address]
+    assert decode_script_pubkey(b'\x6a\x04test', 'BTC') == {'hex': '6a0474657374', 'type': 'nulldata'}
+    assert decode_script_pubkey(b'\x51\x21' + PUBKEY + b'\x53\xae', 'BTC')['type'] == 'nonstandard'
@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+from flask import Flask, jsonify
+
+from routes.rc001_cache import ResponseCache
+
+@pytest.fixture
+def client(tmp_path):
+    database_file = str(tmp_path / 'all_collections.db')
+    conn = sqlite3.connect(database_file)
+    conn.execute('CREATE TABLE index_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)')
+    conn.execute('INSERT INTO index_version VALUES (1, 0)')
+    conn.commit()
+    cache = ResponseCache(database_file)
+    app = Flask(__name__)
+
+    @app.route('/items')
+    @cache.cached
+    def items():
+        return jsonify({"items": ['x' * 40] * 100})
+
+    yield app.test_client()
+    conn.close()
+
+def test_gzip_and_identity_bodies_have_distinct_etags(client):
+    gzipped = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/items')
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in plain.headers
+    assert gzipped.headers['ETag'] != plain.headers['ETag']
+    assert gzipped.headers['Vary'] == plain.headers['Vary'] == 'Accept-Encoding'
+
+def test_etag_revalidates_only_its_own_encoding(client):
+    gzip_etag = client.get('/items', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    plain_etag = client.get('/items').headers['ETag']
+    assert client.get('/items', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag}).status_code == 304
+    assert client.get('/items', headers={'If-None-Match': plain_etag}).status_code == 304
+    assert client.get('/items', headers={'If-None-Match': gzip_etag}).status_code == 200
+    assert client.get('/items', headers={'Accept-Encoding': 'gzip', 'If-None-Match': plain_etag}).status_code == 200
@@ -0,0 +1,48 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from rc001_html import extract_rc001_fields, parse_rc001_document, _document_from_soup
+from synthetic_blocks import deploy_html, mint_html
+
+def fields(doc):
+    return doc.op, doc.sn, doc.title, doc.script_src, doc.json_data
+
+def soup_fields(html_text):
+    return fields(_document_from_soup(BeautifulSoup(html_text, 'html.parser')))
+
+HEAD = '<meta name="p" content="rc001">'
+
+DOCUMENTS = [
+    mint_html('Bench0', '000123', 'ab' * 32 + 'i0').decode(),
+    deploy_html('Bench1', 'DMintAddress', 'cd' * 32 + 'i0').decode(),
+    f'<html><head>{HEAD}<META NAME="op" CONTENT="mint"><META name="sn" content=\'0102\'><TITLE>Upper</TITLE></head></html>',
+    f'<html><head>{HEAD}<meta name=op content=mint><meta name=sn content=0304><title>Unquoted</title></head></html>',
+    f'<html><head>{HEAD}<meta name="op" content="mint"><title>Fish &amp; Chips &lt;3</title></head></html>',
+    f'<html><head>{HEAD}<meta data-x="a>b" name="op" content="mint"><title>Gt in attribute</title></head></html>',
+    f'<html><head>{HEAD}<meta name="op" content="mint"></head><body>No title</body></html>',
+    f'<html><head>{HEAD}<title></title><meta name="sn" content="01"></head></html>',
+    f'<html><head>{HEAD}<title>First</title><title>Second</title><meta name="op" content="a"><meta name="op" content="b"></head></html>',
+    f'<html><head>{HEAD}<script>var x = "<title>not it</title>";</script><title>Real</title></head></html>',
+    f'<html><head>{HEAD}<script src="/content/first"></script><script src="/content/second"></script></head></html>',
+    f'<html><head>{HEAD}<script type="application/json" id="json-data">{{"sn": [{{"range": "01-10"}}]}}</script></head></html>',
+    f'<html><head>{HEAD}<script type="application/json" id="other">{{}}</script><script id="json-data" type="application/json"></script></head></html>',
+    f'<html><head>{HEAD}<meta name="sn" content="&#48;&#49;"><title>\n  Spaced  \n</title></head></html>',
+]
+
+@pytest.mark.parametrize('html_text', DOCUMENTS)
+def test_extractor_matches_beautifulsoup(html_text):
+    doc = extract_rc001_fields(html_text)
+    assert doc is not None
+    assert fields(doc) == soup_fields(html_text)
+
+FALLBACK_DOCUMENTS = [
+    f'<html><head>{HEAD}<!-- <title>Commented</title> --><title>Real</title></head></html>',
+    f'<html><head>{HEAD}<title>Unterminated</head></html>',
+    f'<html><head>{HEAD}<title>Markup <b>inside</b></title></head></html>',
+    f'<html><head>{HEAD}<script src="/content/x">never closed</head></html>',
+]
+
+@pytest.mark.parametrize('html_text', FALLBACK_DOCUMENTS)
+def test_unreadable_documents_fall_back_to_beautifulsoup(html_text):
+    assert extract_rc001_fields(html_text) is None
+    assert fields(parse_rc001_document(html_text)) == soup_fields(html_text)
@@ -0,0 +1,66 @@
+import pytest
+
+from bench_inscription_parser import inscription_script, legacy_extract, native_extract, push, push_number
+from script_parser import iter_script_ops, decode_script_num, extract_inscription, script_to_asm
+
+MINT = (b'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="p" content="rc001">'
+        b'<meta name="op" content="mint"><meta name="sn" content="010203"><title>Collection</title></head>'
+        b'<body><script src="/content/' + b'a' * 64 + b'i0"></script></body></html>')
+
+def test_iter_script_ops_push_sizes():
+    script = (push(b'ab') + b'\x4c\x50' + b'x' * 0x50 + b'\x4d\x00\x01' + b'y' * 256
+              + b'\x4e\x03\x00\x00\x00zzz' + b'\x51\xac')
+    ops = [(opcode, None if data is None else bytes(data)) for opcode, data in iter_script_ops(script)]
+    assert ops == [(2, b'ab'), (0x4c, b'x' * 0x50), (0x4d, b'y' * 256), (0x4e, b'zzz'), (0x51, None), (0xac, None)]
+
+@pytest.mark.parametrize('script', [b'\x05abc', b'\x4c', b'\x4d\x01', b'\x4e\x01\x00', b'\x4c\x05ab'])
+def test_iter_script_ops_truncated(script):
+    with pytest.raises(ValueError):
+        list(iter_script_ops(script))
+
+@pytest.mark.parametrize('data, value', [(b'', 0), (b'\x01', 1), (b'\x81', -1), (b'\xff\x00', 255),
+                                         (b'\x00\x80', -0), (b'\xe8\x03', 1000), (b'\xe8\x83', -1000)])
+def test_decode_script_num(data, value):
+    assert decode_script_num(data) == value
+
+@pytest.mark.parametrize('body', [MINT, b'<html>' + b'x' * 5000 + b'</html>', b'<p>hi</p>'])
+def test_extract_inscription_matches_asm_path(body):
+    script = inscription_script(b'text/html;charset=utf-8', body)
+    extracted, content_type = extract_inscription(script)
+    assert bytes(extracted) == body
+    assert content_type == b'text/html;charset=utf-8'
+    assert legacy_extract(script_to_asm(script)) == native_extract(script.hex()) == body.decode()
+
+def test_extract_inscription_large_countdown():
+    # More than 16 chunks: countdowns above 16 are pushed as data, not OP_n
+    body = bytes(range(256)) * 20
+    extracted, _ = extract_inscription(inscription_script(b'image/png', body, chunk_size=100))
+    assert bytes(extracted) == body
+
+def test_extract_inscription_rejects_other_scripts():
+    assert extract_inscription(push(b'\x30' * 71) + push(b'\x02' * 33)) == (None, None)
+    assert extract_inscription(push(b'ord') + push(b'x' * 10)) == (None, None)
+    assert extract_inscription(push(b'ord') + push_number(1)) == (None, None)
+    assert extract_inscription(b'') == (None, None)
+
+def test_extract_inscription_stops_at_malformed_trailer():
+    script = push(b'ord') + push_number(1) + push(b'text/plain') + push_number(0) + push(b'hello') + b'\x4d\xff'
+    body, content_type = extract_inscription(script)
+    assert bytes(body) == b'hello' and content_type == b'text/plain'
+
+def test_extract_complete_inscription():
+    body = bytes(range(256)) * 20
+    script = inscription_script(b'image/png', body, chunk_size=100)
+    extracted, content_type = extract_inscription(script, complete=True)
+    assert bytes(extracted) == body and content_type == b'image/png'
+    single = push(b'ord') + push_number(1) + push(b'text/plain') + push_number(0) + push(b'hello')
+    assert bytes(extract_inscription(single, complete=True)[0]) == b'hello'
+
+def test_extract_complete_inscription_rejects_prefix():
+    # The first transaction of an inscription continued in later ones ends on countdown 1
+    prefix = (push(b'ord') + push_number(3) + push(b'text/plain') + push_number(2) + push(b'aa')
+              + push_number(1) + push(b'bb') + push(b'\x30' * 71))
+    body, _ = extract_inscription(prefix)
+    assert bytes(body) == b'aabb'
+    assert extract_inscription(prefix, complete=True) == (None, None)
+    assert extract_inscription(push(b'ord') + push_number(1) + push(b'text/plain'), complete=True) == (None, None)
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import routes.sn_allocator as sn_allocator
+from routes.sn_allocator import SerialSpace, CollectionSlots, SnAllocator, SoldOut
+
+def make_db(path, ranges, minted=(), pending=()):
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    conn.execute('CREATE TABLE serial_ranges (collection_id INTEGER, range_index INTEGER, range_value TEXT)')
+    conn.execute('CREATE TABLE items (item_id INTEGER PRIMARY KEY AUTOINCREMENT, collection_id INTEGER, sn TEXT)')
+    conn.execute('CREATE TABLE collection_stats (collection_id INTEGER PRIMARY KEY, minted_count INTEGER)')
+    conn.execute('CREATE TABLE pending_mints (txid TEXT PRIMARY KEY, collection_id INTEGER, sn TEXT)')
+    conn.executemany('INSERT INTO serial_ranges VALUES (1, ?, ?)', list(enumerate(ranges)))
+    conn.executemany('INSERT INTO items (collection_id, sn) VALUES (1, ?)', [(sn,) for sn in minted])
+    conn.execute('INSERT INTO collection_stats VALUES (1, ?)', (len(minted),))
+    conn.executemany('INSERT INTO pending_mints VALUES (?, 1, ?)', [(f'tx{sn}', sn) for sn in pending])
+    return conn
+
+@pytest.mark.parametrize('ranges, sns', [
+    (['000100-000500'], ['000100', '000250', '000500']),
+    (['01-10', '01-05'], ['0101', '0705', '1003']),
+    (['1-9'], ['01', '05', '09']),
+])
+def test_serial_space_round_trip(ranges, sns):
+    space = SerialSpace(ranges)
+    for sn in sns:
+        assert space.slot_to_sn(space.sn_to_slot(sn)) == sn
+    assert len({space.slot_to_sn(slot) for slot in range(space.total)}) == space.total
+    assert space.sn_to_slot('99999999') is None
+
+def test_reserve_skips_minted_pending_and_reserved(tmp_path):
+    conn = make_db(tmp_path / 'db.sqlite', ['01-03', '01-02'], minted=['0101', '0202'], pending=['0301'])
+    allocator = SnAllocator()
+    first, _ = allocator.reserve(conn, 1, 2)
+    second, _ = allocator.reserve(conn, 1, 1)
+    assert len(set(first + second)) == 3
+    assert set(first + second) == {'0102', '0201', '0302'}
+    with pytest.raises(SoldOut) as excinfo:
+        allocator.reserve(conn, 1, 1)
+    assert excinfo.value.available == 0
+
+def test_expired_reservations_are_handed_out_again(tmp_path):
+    conn = make_db(tmp_path / 'db.sqlite', ['01-02'])
+    allocator = SnAllocator(ttl=-1)
+    assert len(allocator.reserve(conn, 1, 2)[0]) == 2
+    assert len(allocator.reserve(conn, 1, 2)[0]) == 2
+
+def test_reservation_table_is_created_once(tmp_path):
+    conn = make_db(tmp_path / 'db.sqlite', ['000001-000100'])
+    statements = []
+    conn.set_trace_callback(statements.append)
+    allocator = SnAllocator()
+    for _ in range(3):
+        allocator.reserve(conn, 1, 1)
+    assert sum('CREATE TABLE' in statement for statement in statements) == 1
+
+def test_sparse_space_falls_back_to_a_scan(monkeypatch):
+    monkeypatch.setattr(sn_allocator, 'DENSE_SLOT_LIMIT', 0)
+    monkeypatch.setattr(sn_allocator, 'MAX_SPARSE_PROBES', 0)
+    slots = CollectionSlots(1, SerialSpace(['000001-001000']))
+    assert not slots.dense
+    free = {7, 500, 999}
+    for slot in range(1000):
+        if slot not in free:
+            slots.mark(slot)
+    assert slots.free_count == 3
+    assert set(slots.pick(3, set())) == free
+    assert slots.pick(1, {7, 500}) == [999]
+    with pytest.raises(SoldOut):
+        slots.pick(2, {7, 500})